@@ -0,0 +1,181 @@
+"""
+Benchmarks of the preference chain engine on synthetic graphs.
+
+Usage:
+    python benchmarks/bench_preference_chain.py --sizes 10 100 1000 10000 --output results.json
+
+For every graph family and size, each stage of the engine is run once for its
+wall time and once under tracemalloc for its peak memory. A stage that exceeds
+the time budget is not run again for the larger sizes of the same family.
+"""
+
+import argparse
+import gc
+import json
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+from datetime import UTC, datetime
+from itertools import islice
+from pathlib import Path
+from typing import Any
+
+import yaml
+from graphs import FAMILIES
+from rich.console import Console
+from rich.table import Table
+
+from pyscaf import __version__
+from pyscaf.preference_chain import CircularDependencyError, best_execution_order
+from pyscaf.preference_chain.chain import (
+    build_chains,
+    compute_all_resolution_pathes,
+    compute_best_resolution_path,
+    compute_path_score,
+    extend_nodes,
+)
+from pyscaf.preference_chain.dependency_loader import load_and_complete_dependencies
+
+console = Console()
+
+DEFAULT_SIZES = [10, 100, 1000, 10000]
+
+
+def measure(func: Callable[[], Any], with_memory: bool) -> tuple[Any, dict[str, float | int | None]]:
+    """Run func for its wall time, then again under tracemalloc for its peak memory."""
+    gc.collect()
+    start = time.perf_counter()
+    result = func()
+    seconds = time.perf_counter() - start
+    peak = None
+    if with_memory:
+        gc.collect()
+        tracemalloc.start()
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return result, {"seconds": seconds, "peak_bytes": peak}
+
+
+def bench_graph(
+    family: str, size: int, max_paths: int, with_memory: bool, skipped: set[str], time_budget: float
+) -> dict[str, Any]:
+    """Benchmark every stage of the engine on one generated graph."""
+    entries = FAMILIES[family](size)
+    result: dict[str, Any] = {"family": family, "size": size, "nodes": len(entries), "stages": {}}
+    stages = result["stages"]
+
+    def run(stage: str, func: Callable[[], Any]) -> Any:
+        if stage in skipped:
+            stages[stage] = {"skipped": True}
+            return None
+        value, metrics = measure(func, with_memory)
+        stages[stage] = metrics
+        if metrics["seconds"] > time_budget:
+            skipped.add(stage)
+        return value
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        yaml_path = Path(tmpdir) / f"{family}_{size}.yaml"
+        yaml_path.write_text(yaml.safe_dump(entries, default_flow_style=False))
+        nodes = run("load_and_complete_dependencies", lambda: load_and_complete_dependencies(str(yaml_path)))
+    if nodes is None:
+        return result
+
+    try:
+        extended = run("extend_nodes", lambda: extend_nodes(nodes))
+        if extended is None:
+            return result
+        chains = run("build_chains", lambda: build_chains(extend_nodes(nodes)))
+        if chains is None:
+            return result
+        result["chains"] = len(chains)
+
+        best_path = run("compute_best_resolution_path", lambda: compute_best_resolution_path(chains))
+        if best_path is not None:
+            result["best_score"] = run("compute_path_score", lambda: compute_path_score(best_path))
+
+        paths = run(
+            "compute_all_resolution_pathes",
+            lambda: sum(1 for _ in islice(compute_all_resolution_pathes(chains), max_paths + 1)),
+        )
+        if paths is not None:
+            result["candidate_paths"] = min(paths, max_paths)
+            result["candidate_paths_capped"] = paths > max_paths
+
+        run("best_execution_order", lambda: best_execution_order(nodes))
+    except CircularDependencyError as e:
+        result["error"] = str(e)
+    return result
+
+
+def print_summary(results: list[dict[str, Any]]) -> None:
+    stage_names = list(dict.fromkeys(stage for result in results for stage in result["stages"]))
+    table = Table(title="preference_chain benchmarks (seconds)")
+    table.add_column("family")
+    table.add_column("nodes", justify="right")
+    table.add_column("chains", justify="right")
+    table.add_column("paths", justify="right")
+    for stage in stage_names:
+        table.add_column(stage, justify="right")
+    for result in results:
+        paths = result.get("candidate_paths")
+        paths_cell = "-" if paths is None else f"{paths}{'+' if result.get('candidate_paths_capped') else ''}"
+        cells = []
+        for stage in stage_names:
+            metrics = result["stages"].get(stage)
+            if metrics is None:
+                cells.append("-")
+            elif metrics.get("skipped"):
+                cells.append("skipped")
+            else:
+                cells.append(f"{metrics['seconds']:.4f}")
+        table.add_row(result["family"], str(result["nodes"]), str(result.get("chains", "-")), paths_cell, *cells)
+    console.print(table)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Graph sizes (nodes)")
+    parser.add_argument("--families", nargs="+", choices=list(FAMILIES), default=list(FAMILIES))
+    parser.add_argument("--max-paths", type=int, default=10000, help="Stop counting candidate paths after this")
+    parser.add_argument("--time-budget", type=float, default=30.0, help="Seconds after which a stage stops growing")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc runs")
+    parser.add_argument("--output", type=Path, help="Write the results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    # Deep chains are processed recursively by some stages
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 4 * max(args.sizes) + 100))
+
+    results = []
+    for family in args.families:
+        skipped: set[str] = set()
+        for size in sorted(args.sizes):
+            console.print(f"[bold blue]Benchmarking {family} ({size} nodes)...[/bold blue]")
+            results.append(bench_graph(family, size, args.max_paths, not args.no_memory, skipped, args.time_budget))
+
+    print_summary(results)
+
+    if args.output:
+        report = {
+            "pyscaf_version": __version__,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "date": datetime.now(UTC).isoformat(),
+            "parameters": {
+                "sizes": sorted(args.sizes),
+                "families": args.families,
+                "max_paths": args.max_paths,
+                "time_budget": args.time_budget,
+            },
+            "results": results,
+        }
+        args.output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        console.print(f"[bold green]Results written to {args.output}[/bold green]")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Synthetic dependency graph families for the preference chain benchmarks.
+
+Every family returns a list of entries shaped like the YAML files of
+tests/preference_chain/test_data ({"id": ..., "depends": [...], "after": ...}),
+so a generated graph can be dumped and loaded with load_and_complete_dependencies.
+"""
+
+import math
+import random
+from collections.abc import Callable
+
+
+def linear(size: int) -> list[dict]:
+    """n0 -> n1 -> ... -> n{size-1}."""
+    entries = [{"id": "n0"}]
+    for i in range(1, size):
+        entries.append({"id": f"n{i}", "depends": [f"n{i - 1}"]})
+    return entries
+
+
+def diamond(size: int) -> list[dict]:
+    """Stacked diamonds: top -> left, right -> bottom, each bottom being the next top."""
+    entries = [{"id": "d0_top"}]
+    top = "d0_top"
+    i = 0
+    while len(entries) + 3 <= size:
+        left, right, bottom = f"d{i}_left", f"d{i}_right", f"d{i + 1}_top"
+        entries.append({"id": left, "depends": [top]})
+        entries.append({"id": right, "depends": [top]})
+        entries.append({"id": bottom, "depends": [left, right], "after": left})
+        top = bottom
+        i += 1
+    return entries
+
+
+def fan_out(size: int) -> list[dict]:
+    """One root and size - 1 children depending on it."""
+    entries = [{"id": "root"}]
+    for i in range(1, size):
+        entries.append({"id": f"child{i}", "depends": ["root"]})
+    return entries
+
+
+def multiple_roots(size: int) -> list[dict]:
+    """About sqrt(size) independent roots, each followed by a linear chain."""
+    roots = max(1, math.isqrt(size))
+    entries = []
+    for i in range(size):
+        root, position = i % roots, i // roots
+        node_id = f"r{root}_{position}"
+        if position == 0:
+            entries.append({"id": node_id})
+        else:
+            entries.append({"id": node_id, "depends": [f"r{root}_{position - 1}"]})
+    return entries
+
+
+def random_dag(size: int, seed: int = 0) -> list[dict]:
+    """Each node depends on up to three earlier nodes and prefers to run after one of them."""
+    rng = random.Random(seed)
+    ids = [f"n{i}" for i in range(size)]
+    entries = []
+    for i, node_id in enumerate(ids):
+        # Pick dependencies among the closest previous nodes, like real plugin layers
+        window = ids[max(0, i - 50) : i]
+        depends = rng.sample(window, k=min(len(window), rng.choice([0, 1, 1, 2, 3])))
+        entry: dict = {"id": node_id}
+        if depends:
+            entry["depends"] = depends
+            entry["after"] = rng.choice(depends)
+        entries.append(entry)
+    rng.shuffle(entries)
+    return entries
+
+
+FAMILIES: dict[str, Callable[[int], list[dict]]] = {
+    "linear": linear,
+    "diamond": diamond,
+    "fan_out": fan_out,
+    "multiple_roots": multiple_roots,
+    "random_dag": random_dag,
+}
@@ -2,18 +2,22 @@
 Action classes for project scaffolding.
 """
 
-import importlib
 import logging
-import os
-import pkgutil
 from collections.abc import Callable
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 from pydantic import BaseModel
 
-from pyscaf.tools.format_toml import format_toml
-from pyscaf.tools.toml_merge import merge_toml_files
+from pyscaf.tools.resources import list_resource_dir, read_resource, read_resource_dir
+
+if TYPE_CHECKING:
+    from rich.console import Console
+
+    from pyscaf.actions.execution import ExecutionContext
+    from pyscaf.actions.install import InstallNeeds
+    from pyscaf.tools.assets import AssetFile
+    from pyscaf.tools.templates import TemplateContent
 
 logger = logging.getLogger(__name__)
 
@@ -144,16 +148,96 @@ class Action:
         if hasattr(cls, "depends") and len(cls.depends) > 1 and not getattr(cls, "run_preferably_after", None):
             raise ValueError(f"Action '{cls.__name__}' has multiple depends but no run_preferably_after")
 
-    def __init__(self, project_path: str | Path):
+    def __init__(self, project_path: str | Path, execution: "ExecutionContext | None" = None):
+        """
+        Args:
+            project_path: Root directory of the generated project
+            execution: Execution context shared by the actions of the project (a private one by default)
+        """
+        from pyscaf.actions.execution import ExecutionContext
+
         self.project_path = Path(project_path)
+        self.execution = execution if execution is not None else ExecutionContext(self.project_path)
+
+    @property
+    def console(self) -> "Console":
+        """Console of the execution context."""
+        return self.execution.console
+
+    def resource(self, path: str) -> str | None:
+        """
+        Text of a file of the action's package (template, README.md...), read once per process.
+
+        Args:
+            path: Path of the file in the package, "/"-separated
+
+        Returns:
+            The text of the file, None if the action has no such file
+        """
+        return read_resource(self.__class__.__module__, path)
+
+    def resource_dir(self, path: str, suffix: str = "") -> tuple[tuple[str, str], ...]:
+        """(name, text) of the files of a directory of the action's package, read once per process."""
+        return read_resource_dir(self.__class__.__module__, path, suffix)
+
+    def template(self, path: str, **context: Any) -> "TemplateContent":
+        """
+        Skeleton content rendered from a Jinja template of the action's package.
+
+        The template is rendered when the skeleton is written, streamed into the file;
+        it is compiled once per process (and its bytecode cached across processes).
+
+        Args:
+            path: Path of the template in the package, "/"-separated
+            **context: Variables of the template (all required: an undefined one raises)
+        """
+        from pyscaf.tools.templates import TemplateContent
+
+        return TemplateContent(name=f"{self.__class__.__module__}:{path}", context=context)
+
+    def asset(self, path: str) -> "AssetFile":
+        """
+        Skeleton content copied as is from a file of the action's package (binary file, dataset...).
+
+        The file is copied when the skeleton is written, without being read by pyscaf
+        (see AssetFile); it is hardlinked instead with the link_assets option.
+
+        Args:
+            path: Path of the file in the package, "/"-separated
+        """
+        from pyscaf.tools.assets import AssetFile
 
-    def skeleton(self, context: dict) -> dict[Path, str | None]:
+        return AssetFile(package=self.__class__.__module__, path=path)
+
+    def asset_dir(
+        self, path: str, target: str | Path, suffix: str = "", recursive: bool = True
+    ) -> dict[Path, "AssetFile"]:
+        """
+        Skeleton entries copying a directory of the action's package as is (see asset()).
+
+        Args:
+            path: Path of the directory in the package, "/"-separated
+            target: Directory of the project receiving its files
+            suffix: Suffix of the files to copy (e.g. ".py"), all the files by default
+            recursive: Whether to copy the subdirectories too (except __pycache__)
+
+        Returns:
+            The project path of each file, mapped to its asset (empty if there is no such directory)
+        """
+        return {
+            Path(target, name): self.asset(f"{path}/{name}")
+            for name in list_resource_dir(self.__class__.__module__, path, suffix, recursive)
+        }
+
+    def skeleton(self, context: dict) -> dict[Path, "str | TemplateContent | AssetFile | None"]:
         """
         Define the filesystem skeleton for this action, using the provided context.
 
         Returns a dictionary mapping paths to create to their content:
         - If the value is None, a directory is created
         - If the value is a string, a file is created with that content
+        - If the value is a TemplateContent (see template()), a file is created with its render
+        - If the value is an AssetFile (see asset() and asset_dir()), a package file is copied
 
         Returns:
             Dictionary mapping paths to content
@@ -165,19 +249,17 @@ class Action:
     def init(self, context: dict) -> None:
         """
         Default implementation: merges config.toml from the concrete action's directory into pyproject.toml in the project root (if it exists).
+
+        The merge happens in the pyproject document shared by the actions (self.execution.pyproject),
+        which the ActionManager writes once at the end of the init phase.
         """
-        # Find the module where the concrete action is defined
-        module = importlib.import_module(self.__class__.__module__)
-        module_file = module.__file__
-        if not module_file:
-            raise RuntimeError(f"Module {module} has no __file__ attribute")
-        action_dir = Path(module_file).parent
-        config_path = action_dir / "config.toml"
-        pyproject_path = self.project_path / "pyproject.toml"
-        if config_path.exists():
-            merge_toml_files(input_path=config_path, output_path=pyproject_path)
-            format_toml(pyproject_path)
-            print(f"[INFO] Merged {config_path} into {pyproject_path}")
+        # config.toml of the package where the concrete action is defined
+        config = self.resource("config.toml")
+        if config is not None:
+            name = f"{self.__class__.__module__.rsplit('.', 1)[-1]}/config.toml"
+            pyproject = self.execution.pyproject
+            pyproject.merge_text(config, name)
+            self.console.print(f"[INFO] Merged {name} into {pyproject.path}")
 
     def install(self, context: dict) -> None:
         """
@@ -190,39 +272,36 @@ class Action:
         # Override in subclasses if needed
         return None
 
+    def install_needs(self, context: dict) -> "InstallNeeds":
+        """
+        Declare what this action needs from the install phase.
+
+        The dependency groups of every active action are installed by a single uv sync;
+        the commands run afterwards, with the venv interpreter for python commands (see
+        InstallPlanner). Prefer this to running `uv run` from install().
+
+        Returns:
+            The dependency groups and commands of this action (none by default)
+        """
+        from pyscaf.actions.install import InstallNeeds
+
+        return InstallNeeds()
+
     def create_skeleton(self, context: dict) -> set[Path]:
         """
         Create the filesystem skeleton for this action using the provided context.
 
+        The ActionManager stages the skeletons of all the actions and writes them at once
+        (see SkeletonStage); this writes the skeleton of this action alone.
+
         Returns:
             Set of paths created
         """
-        created_paths = set()
-        skeleton = self.skeleton(context)
-
-        for path, content in skeleton.items():
-            full_path = self.project_path / path
-
-            # Create parent directories if they don't exist
-            full_path.parent.mkdir(parents=True, exist_ok=True)
-
-            if content is None:
-                # Create directory
-                full_path.mkdir(exist_ok=True)
-            else:
-                # Create file with content or append if exists
-                if full_path.exists():
-                    # Append content to existing file
-                    print(f"Appending content to {full_path}")
-                    with open(full_path, "a") as f:
-                        f.write("\n" + content)
-                else:
-                    # Create new file with content
-                    full_path.write_text(content)
-
-            created_paths.add(full_path)
+        from pyscaf.tools.skeleton_stage import SkeletonStage
 
-        return created_paths
+        stage = SkeletonStage(self.project_path, link_assets=bool(context.get("link_assets")))
+        stage.add_skeleton(self.skeleton(context))
+        return stage.flush()
 
     def activate(self, context: dict) -> bool:
         """
@@ -231,20 +310,37 @@ class Action:
         """
         return True
 
+    def resources(self, phase: str, context: dict) -> set[str]:
+        """
+        Return the shared resources (files, directories, tools state...) used by a phase of this action.
+
+        Actions of the same phase run concurrently unless one depends on the other or
+        they share a resource; "*" conflicts with every other action. Defaults:
+        - init: "pyproject.toml" for the default init() (config.toml merge), "*" when overridden
+        - install: nothing for the default install(), "*" when overridden
+        Override in subclasses to declare narrower resources. The skeletons are not
+        scheduled: they are staged together and written in a single pass.
+
+        Args:
+            phase: "init" or "install"
+            context: The project context
+        """
+        from pyscaf.actions.scheduler import EXCLUSIVE
+
+        # The phases are named after the methods implementing them
+        if getattr(type(self), phase) is not getattr(Action, phase):
+            return {EXCLUSIVE}
+        return {"pyproject.toml"} if phase == "init" else set()
+
 
 def discover_actions():
     """
-    Dynamically discover all Action subclasses in the actions package (excluding base/manager/pycache).
+    Return all Action subclasses of the actions package (excluding base/manager/pycache).
+
+    Discovery is delegated to the process-wide registry, so the action modules are
+    scanned at most once per process (and not at all when its manifest is valid).
     Returns a list of Action classes.
     """
-    actions: list[type[Action]] = []
-    actions_dir = os.path.dirname(__file__)
-    for _, module_name, _ in pkgutil.iter_modules([actions_dir]):
-        if module_name in ("base", "manager", "__pycache__"):
-            continue
-        mod = importlib.import_module(f"pyscaf.actions.{module_name}")
-        for attr in dir(mod):
-            obj = getattr(mod, attr)
-            if isinstance(obj, type) and issubclass(obj, Action) and obj is not Action:
-                actions.append(obj)
-    return actions
+    from pyscaf.actions.registry import get_registry
+
+    return get_registry().action_classes()
@@ -2,24 +2,24 @@
 Poetry initialization actions.
 """
 
-import os
+import re
 import subprocess
 from pathlib import Path
 
-import tomli
-import tomli_w
-from rich.console import Console
+import tomlkit
 
 from pyscaf.actions import Action, CLIOption
-
-console = Console()
+from pyscaf.actions.install import DEFAULT_GROUP, InstallCommand, InstallNeeds
+from pyscaf.tools.templates import TemplateContent
+from pyscaf.tools.tracing import span
 
 
 def get_local_git_author():
     """Get the author name from the local git config."""
     try:
-        git_name = subprocess.check_output(["git", "config", "user.name"]).decode().strip()
-        git_email = subprocess.check_output(["git", "config", "user.email"]).decode().strip()
+        with span("git config", "subprocess", command="git config user.name / user.email"):
+            git_name = subprocess.check_output(["git", "config", "user.name"]).decode().strip()
+            git_email = subprocess.check_output(["git", "config", "user.email"]).decode().strip()
         default_author = f"{git_name} <{git_email}>"
     except subprocess.CalledProcessError:
         default_author = ""
@@ -41,10 +41,16 @@ class CoreAction(Action):
         ),
     ]
 
-    def __init__(self, project_path):
-        super().__init__(project_path)
+    def __init__(self, project_path, execution=None):
+        super().__init__(project_path, execution)
+
+    def resources(self, phase: str, context: dict) -> set[str]:
+        if phase == "install":
+            # config.toml merge, then the planner's uv sync (the VSCode extension is installed for the user)
+            return {"pyproject.toml", "uv.lock", ".venv"}
+        return super().resources(phase, context)
 
-    def skeleton(self, context: dict) -> dict[Path, str | None]:
+    def skeleton(self, context: dict) -> dict[Path, str | TemplateContent | None]:
         """
         Define the filesystem skeleton for Core initialization.
 
@@ -55,17 +61,15 @@ class CoreAction(Action):
         currated_projet_name = project_name.replace("-", "_")
 
         # Read uv documentation
-        uv_doc_path = Path(__file__).parent / "README.md"
-        uv_doc = uv_doc_path.read_text() if uv_doc_path.exists() else ""
+        uv_doc = self.resource("README.md") or ""
 
         # Add default ruff settings for VSCode
-        vscode_settings_path = Path(__file__).parent / "default_settings.json"
-        vscode_settings = vscode_settings_path.read_text() if vscode_settings_path.exists() else ""
+        vscode_settings = self.resource("default_settings.json") or ""
         # Return skeleton dictionary
         skeleton = {
-            Path("README.md"): (f"# {project_name}\n\nA Python project created with pyscaf\n\n{uv_doc}\n"),
-            Path(f"src/{currated_projet_name}/__init__.py"): (
-                f'"""\n{project_name} package.\n"""\n\n__version__ = "0.0.0"\n'
+            Path("README.md"): self.template("template_README.md.jinja", project_name=project_name, uv_doc=uv_doc),
+            Path(f"src/{currated_projet_name}/__init__.py"): self.template(
+                "template_package_init.py.jinja", project_name=project_name
             ),
             Path(".vscode/settings.json"): vscode_settings if vscode_settings else None,
         }
@@ -77,103 +81,84 @@ class CoreAction(Action):
 
         This will run 'poetry init' in non-interactive mode.
         """
-        console.print("[bold blue]Initializing core project...[/bold blue]")
+        self.console.print("[bold blue]Initializing core project...[/bold blue]")
 
         try:
-            # Change to project directory
-            os.chdir(self.project_path)
-
-            # Use subprocess.call to pass control to the terminal
-            result = subprocess.call(
-                [
-                    "uv",
-                    "init",
-                    "--bare",
-                    "--lib",
-                    "--no-workspace",
-                    "--author-from",
-                    "none",
-                ],
-                # No redirection,
-                # allows full terminal interaction
-                stdin=None,
-                stdout=None,
-                stderr=None,
-            )
-
-            project_name = context.get("project_name", "myproject")
-            currated_projet_name = project_name.replace("-", "_")
-
-            # Ajout dynamique de la clé authors dans [project] du pyproject.toml
-            pyproject_path = Path("pyproject.toml")
-            if pyproject_path.exists():
-                with pyproject_path.open("rb") as f:
-                    pyproject_data = tomli.load(f)
+            if context.get("resume") and self.execution.pyproject.path.exists():
+                # Resumed creation: uv init already ran (it refuses to run again)
+                result = 0
+            else:
+                # Run in the project directory, without redirection (full terminal interaction)
+                result = self.execution.run(
+                    [
+                        "uv",
+                        "init",
+                        "--bare",
+                        "--lib",
+                        "--no-workspace",
+                        "--author-from",
+                        "none",
+                    ]
+                )
+
+            # Ajout dynamique de la clé authors dans [project] du pyproject.toml (in the shared document)
+            pyproject = self.execution.pyproject
+            if pyproject.path.exists():
                 try:
-                    # Ensure project properties exists
-                    if "project" not in pyproject_data:
-                        pyproject_data["project"] = {}
-                    if "authors" not in pyproject_data["project"]:
-                        pyproject_data["project"]["authors"] = []
-                    
-                    author = context.get("author", "")
-                    if author:
-                        import re
-                        match = re.match(r"(?P<name>[^<]+)\s*<(?P<email>[^>]+)>", author)
-                        if match:
-                            pyproject_data["project"]["authors"].append({"name": match.group("name").strip(), "email": match.group("email").strip()})
-                        else:
-                            pyproject_data["project"]["authors"].append({"name": author.strip()})
-                            
-                    with pyproject_path.open("wb") as f:
-                        f.write(tomli_w.dumps(pyproject_data).encode("utf-8"))
-                    console.print(
-                        "[bold green]Added authors configuration in pyproject.toml[/bold green]"
-                    )
+                    with pyproject.edit() as pyproject_data:
+                        # Ensure project properties exists
+                        if "project" not in pyproject_data:
+                            pyproject_data["project"] = tomlkit.table()
+                        if "authors" not in pyproject_data["project"]:
+                            pyproject_data["project"]["authors"] = tomlkit.array()
+
+                        author = context.get("author", "")
+                        if author:
+                            match = re.match(r"(?P<name>[^<]+)\s*<(?P<email>[^>]+)>", author)
+                            inline_author = tomlkit.inline_table()
+                            if match:
+                                inline_author["name"] = match.group("name").strip()
+                                inline_author["email"] = match.group("email").strip()
+                            else:
+                                inline_author["name"] = author.strip()
+                            if inline_author not in pyproject_data["project"]["authors"]:
+                                pyproject_data["project"]["authors"].append(inline_author)
+
+                    self.console.print("[bold green]Added authors configuration in pyproject.toml[/bold green]")
                 except Exception as e:
-                    console.print(f"[bold yellow]Section [project] not found or error: {e}[/bold yellow]")
+                    self.console.print(f"[bold yellow]Section [project] not found or error: {e}[/bold yellow]")
             else:
-                console.print("[bold yellow]pyproject.toml not found after uv init.[/bold yellow]")
+                self.console.print("[bold yellow]pyproject.toml not found after uv init.[/bold yellow]")
 
             if result == 0:
-                console.print("[bold green]uv initialization successful![/bold green]")
+                self.console.print("[bold green]uv initialization successful![/bold green]")
             else:
-                console.print(f"[bold yellow]uv init exited with code {result}[/bold yellow]")
+                self.console.print(f"[bold yellow]uv init exited with code {result}[/bold yellow]")
 
         except FileNotFoundError:
-            console.print("[bold yellow]uv not found. Please install it first.[/bold yellow]")
+            self.console.print("[bold yellow]uv not found. Please install it first.[/bold yellow]")
 
     def install(self, context: dict) -> None:
         """
-        Install dependencies with uv.
+        Write the ruff configuration before uv reads pyproject.toml.
 
-        This will run 'uv sync' to install all dependencies.
+        The environment itself is installed by the install planner (one uv sync for all the actions).
         """
+        # The ruff configuration is merged now, and written before uv reads pyproject.toml
         super().init(context)
-
-        console.print("[bold blue]Installing dependencies with uv...[/bold blue]")
-        try:
-            # Ensure we're in the right directory
-            os.chdir(self.project_path)
-
-            # Run uv sync
-            console.print("[bold cyan]Running uv sync...[/bold cyan]")
-            result = subprocess.call(["uv", "sync"], stdin=None, stdout=None, stderr=None)
-
-            if result == 0:
-                console.print("[bold green]uv dependencies installed successfully![/bold green]")
-            else:
-                console.print(f"[bold yellow]uv sync exited with code {result}[/bold yellow]")
-
-        except FileNotFoundError:
-            console.print("[bold yellow]uv not found. Please install it first.[/bold yellow]")
-            console.print("https://docs.astral.sh/uv/getting-started/installation")
-            return
-
-        # Separate block for VSCode Ruff extension installation
-        try:
-            console.print("[bold cyan]Installing VSCode Ruff extension...[/bold cyan]")
-            subprocess.call(["code", "--install-extension", "charliermarsh.ruff", "--force"])
-        except FileNotFoundError:
-            console.print("[bold yellow]VSCode not found. Please install it first:[/bold yellow]")
-            console.print("https://code.visualstudio.com/download")
+        self.execution.pyproject.save()
+
+    def install_needs(self, context: dict) -> InstallNeeds:
+        """Install the default dependency group, then the VSCode Ruff extension."""
+        return InstallNeeds(
+            groups={DEFAULT_GROUP},
+            commands=[
+                InstallCommand(
+                    args=["code", "--install-extension", "charliermarsh.ruff", "--force"],
+                    python=False,
+                    description="Installing VSCode Ruff extension",
+                    missing_hint="https://code.visualstudio.com/download",
+                    optional=True,
+                )
+            ],
+        )
@@ -1,6 +1,7 @@
 from pathlib import Path
 
 from pyscaf.actions import Action, ChoiceOption, CLIOption
+from pyscaf.tools.assets import AssetFile
 
 DOC_CHOICES = [
     ChoiceOption(key="none", display="None (no documentation)", value=None),
@@ -24,12 +25,12 @@ class DocumentationAction(Action):
         ),
     ]
 
-    def __init__(self, project_path):
-        super().__init__(project_path)
+    def __init__(self, project_path, execution=None):
+        super().__init__(project_path, execution)
 
-    def skeleton(self, context: dict) -> dict[Path, str | None]:
+    def skeleton(self, context: dict) -> dict[Path, str | AssetFile | None]:
         doc_key = context.get("documentation", "none")  # Get the key (e.g., "none", "pdoc")
-        print(f"Documentation key: {doc_key}")
+        self.console.print(f"Documentation key: {doc_key}")
 
         # Convert key to value using DOC_CHOICES directly
         doc_choice = None
@@ -37,27 +38,24 @@ class DocumentationAction(Action):
             if choice.key == doc_key:
                 doc_choice = choice.value
                 break
-        print(f"Documentation choice value: {doc_choice}")
+        self.console.print(f"Documentation choice value: {doc_choice}")
 
         skeleton = {}
         if doc_choice == "pdoc":
             # Read documentation README
-            doc_readme_path = Path(__file__).parent / "README.md"
-            doc_readme = doc_readme_path.read_text() if doc_readme_path.exists() else ""
+            doc_readme = self.resource("README.md") or ""
 
             skeleton[Path("README.md")] = doc_readme
 
             # Copy scripts from the source
-            scripts_dir = Path(__file__).parent / "scripts"
-            if scripts_dir.exists():
+            scripts = self.asset_dir("scripts", "src/pyscaf/documentation/scripts", ".py", recursive=False)
+            if scripts:
                 # Add __init__.py for pyscaf directory in src
                 skeleton[Path("src/pyscaf/__init__.py")] = ""
                 skeleton[Path("src/pyscaf/documentation/__init__.py")] = ""
                 skeleton[Path("src/pyscaf/documentation/scripts/__init__.py")] = ""
 
-                for script_file in scripts_dir.glob("*.py"):
-                    script_content = script_file.read_text()
-                    skeleton[Path(f"src/pyscaf/documentation/scripts/{script_file.name}")] = script_content
+                skeleton.update(scripts)
         # If doc_choice is None, do not add anything
         return skeleton
 
@@ -67,3 +65,8 @@ class DocumentationAction(Action):
             return
         
         super().init(context)
+
+    def resources(self, phase: str, context: dict) -> set[str]:
+        if phase == "init":
+            return {"pyproject.toml"}
+        return super().resources(phase, context)
@@ -0,0 +1,150 @@
+"""
+Execution context shared by the actions of one project generation.
+"""
+
+import logging
+import os
+import subprocess
+import threading
+from collections.abc import Iterator, Mapping, Sequence
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO, TYPE_CHECKING
+
+from rich.console import Console
+
+from pyscaf.tools.runner import CommandResult, CommandRunner
+from pyscaf.tools.tracing import span
+
+if TYPE_CHECKING:
+    from pyscaf.tools.pyproject_session import PyprojectSession
+
+logger = logging.getLogger(__name__)
+
+
+def _command_name(args: Sequence[str]) -> str:
+    """Short name of a command, for the timings (e.g. "uv sync", "python -m pytest")."""
+    words = 3 if len(args) > 2 and args[1] == "-m" else 2
+    return " ".join([Path(args[0]).name, *args[1:words]])
+
+
+class ExecutionContext:
+    """
+    Where and how the actions of a project run, without touching process-wide state.
+
+    The actions never change the working directory of the process: commands run with
+    cwd= set to the project root (or a directory inside it), with the environment of
+    the context. Several projects can therefore be generated in the same process,
+    and the actions of a phase can run concurrently. The commands go through a
+    CommandRunner, which bounds how many run at once and kills those that hang.
+    """
+
+    def __init__(
+        self,
+        project_path: str | Path,
+        env: Mapping[str, str] | None = None,
+        console: Console | None = None,
+        log: IO[str] | None = None,
+        runner: CommandRunner | None = None,
+    ):
+        """
+        Args:
+            project_path: Root directory of the generated project
+            env: Environment of the commands (defaults to a copy of os.environ)
+            console: Console the actions print to (defaults to a new rich Console)
+            log: File receiving the output of the commands, which then get no stdin
+                (defaults to the terminal, for interactive commands)
+            runner: Runner of the commands (defaults to a runner without timeout)
+        """
+        self.project_path = Path(project_path)
+        self.env = dict(os.environ if env is None else env)
+        # The commands run in the project's own venv, not in the one pyscaf may be running in
+        # (uv warns when VIRTUAL_ENV points elsewhere)
+        self.env.pop("VIRTUAL_ENV", None)
+        self.console = console if console is not None else Console()
+        self.log = log
+        self.runner = runner if runner is not None else CommandRunner()
+        self._pyproject: PyprojectSession | None = None
+        self._tracked = threading.local()
+
+    @property
+    def pyproject(self) -> "PyprojectSession":
+        """The pyproject.toml document shared by the actions (saved by the ActionManager after the init phase)."""
+        if self._pyproject is None:
+            # tomlkit is only imported by the projects that edit pyproject.toml
+            from pyscaf.tools.pyproject_session import PyprojectSession
+
+            self._pyproject = PyprojectSession(self.path("pyproject.toml"))
+        return self._pyproject
+
+    @contextmanager
+    def track_failures(self, enabled: bool = True) -> Iterator[list[CommandResult]]:
+        """
+        Collect the failed commands (non-zero exit code) run by the current thread within the block.
+
+        The ActionManager wraps each step with it: a step whose commands failed is not
+        recorded as completed in the project journal.
+
+        Args:
+            enabled: False to run best-effort commands: their failures are collected by no
+                block, not even the enclosing one (the yielded list stays empty)
+        """
+        failures: list[CommandResult] = []
+        previous = getattr(self._tracked, "failures", None)
+        self._tracked.failures = failures if enabled else None
+        try:
+            yield failures
+        finally:
+            self._tracked.failures = previous
+
+    def path(self, *parts: str | Path) -> Path:
+        """Return a path inside the project."""
+        return self.project_path.joinpath(*parts)
+
+    def run(
+        self,
+        args: Sequence[str],
+        cwd: str | Path | None = None,
+        env: Mapping[str, str] | None = None,
+        timeout: float | None = None,
+    ) -> int:
+        """
+        Run a command in the project and return its exit code.
+
+        Standard streams are inherited, so the command can interact with the terminal,
+        unless the context has a log file: the output is then captured into it.
+
+        Args:
+            args: Command and its arguments
+            cwd: Working directory, relative to the project root (defaults to the root)
+            env: Variables added to (or overriding) the context environment
+            timeout: Timeout in seconds, overriding the runner's default
+
+        Returns:
+            The exit code of the command (TIMEOUT_EXIT_CODE if it was killed after its timeout)
+
+        Raises:
+            FileNotFoundError: If the command is not installed
+        """
+        workdir = self.path(cwd) if cwd is not None else self.project_path
+        command_env = {**self.env, **env} if env else self.env
+        logger.debug(f"Running {' '.join(args)} in {workdir}")
+        with span(_command_name(args), "subprocess", command=" ".join(args), cwd=workdir):
+            if self.log is not None:
+                # Keep the order of what was already printed to the log
+                self.log.flush()
+            result = self.runner.run(
+                args,
+                cwd=workdir,
+                env=command_env,
+                timeout=timeout,
+                stdin=None if self.log is None else subprocess.DEVNULL,
+                output=self.log,
+                capture=self.log is not None,
+            )
+        if result.timed_out:
+            self.console.print(f"[bold red]{' '.join(args)} timed out after {result.duration:.0f}s[/bold red]")
+        failures = getattr(self._tracked, "failures", None)
+        if failures is not None and not result.ok:
+            failures.append(result)
+        return result.returncode
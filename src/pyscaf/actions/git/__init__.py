@@ -2,15 +2,14 @@
 Git initialization actions.
 """
 
-import os
 import re
-import subprocess
 from pathlib import Path
 
 import questionary
 from rich.console import Console
 
 from pyscaf.actions import Action, ChoiceOption, CLIOption
+from pyscaf.tools.git_bootstrap import add_remote, stage_project
 
 console = Console()
 
@@ -67,12 +66,18 @@ class GitAction(Action):
         ),
     ]  # Add Git-specific options if needed
 
-    def __init__(self, project_path):
-        super().__init__(project_path)
+    def __init__(self, project_path, execution=None):
+        super().__init__(project_path, execution)
 
     def activate(self, context: dict) -> bool:
         return context.get("versionning") is None or context.get("versionning", True)
 
+    def resources(self, phase: str, context: dict) -> set[str]:
+        if phase == "init":
+            return {".git"}
+        # git add + commit of the whole project in install: nothing else may run meanwhile
+        return super().resources(phase, context)
+
     def skeleton(self, context: dict) -> dict[Path, str | None]:
         """
         Define the filesystem skeleton for Git initialization.
@@ -81,12 +86,10 @@ class GitAction(Action):
             Dictionary mapping paths to content
         """
         # Read Git documentation
-        git_doc_path = Path(__file__).parent / "README.md"
-        git_doc = git_doc_path.read_text() if git_doc_path.exists() else ""
+        git_doc = self.resource("README.md") or ""
 
         # Python & uv .gitignore content
-        gitignore_path = Path(__file__).parent / "template.gitignore"
-        gitignore_content = gitignore_path.read_text() if gitignore_path.exists() else ""
+        gitignore_content = self.resource("template.gitignore") or ""
 
         # Return skeleton dictionary
         return {
@@ -100,33 +103,23 @@ class GitAction(Action):
 
         This will initialize a Git repository and optionally add a remote.
         """
-        console.print("[bold blue]Initializing Git repository...[/bold blue]")
+        self.console.print("[bold blue]Initializing Git repository...[/bold blue]")
 
         try:
-            # Change to project directory
-            os.chdir(self.project_path)
-
-            # Initialize Git repository
-            console.print("[bold cyan]Running git init...[/bold cyan]")
-
-            # Use subprocess.call to run git commands
-            result = subprocess.call(
-                ["git", "init"],
-                stdin=None,
-                stdout=None,
-                stderr=None,
-            )
+            # Initialize Git repository in the project directory
+            self.console.print("[bold cyan]Running git init...[/bold cyan]")
+            result = self.execution.run(["git", "init"])
 
             if result == 0:
-                console.print("[bold green]Git repository initialized successfully![/bold green]")
+                self.console.print("[bold green]Git repository initialized successfully![/bold green]")
 
                 # Configure remote repository if URL is provided
                 self._configure_remote(context)
             else:
-                console.print(f"[bold yellow]Git init exited with code {result}[/bold yellow]")
+                self.console.print(f"[bold yellow]Git init exited with code {result}[/bold yellow]")
 
         except FileNotFoundError:
-            console.print("[bold yellow]Git not found. Please install it first.[/bold yellow]")
+            self.console.print("[bold yellow]Git not found. Please install it first.[/bold yellow]")
 
     def _configure_remote(self, context: dict) -> None:
         """Configure remote repository."""
@@ -141,37 +134,30 @@ class GitAction(Action):
             ).ask()
 
         if remote_url:
-            # Add remote
-            result = subprocess.call(
-                ["git", "remote", "add", "origin", remote_url],
-                stdin=None,
-                stdout=None,
-                stderr=None,
-            )
+            # Add remote (written directly in the new repository's config when possible)
+            if add_remote(self.project_path, "origin", remote_url):
+                result = 0
+            else:
+                result = self.execution.run(["git", "remote", "add", "origin", remote_url])
 
             if result == 0:
-                console.print(f"[bold green]Remote repository configured: {remote_url}[/bold green]")
+                self.console.print(f"[bold green]Remote repository configured: {remote_url}[/bold green]")
         else:
-            console.print("[bold blue]No remote URL provided. You can add it later with:[/bold blue]")
-            console.print("  git remote add origin <your-repository-url>")
+            self.console.print("[bold blue]No remote URL provided. You can add it later with:[/bold blue]")
+            self.console.print("  git remote add origin <your-repository-url>")
 
     def install(self, context: dict) -> None:
         """
-        No additional installation steps needed for Git.
+        Create the initial commit with every file of the project.
+
+        The index is written by stage_project() (one pass over the tree, without entering
+        the ignored directories such as .venv); `git add .` is the fallback when the
+        configuration of git may store the files differently.
         """
-        console.print("[bold blue]Setting up Git for the project...[/bold blue]")
+        self.console.print("[bold blue]Setting up Git for the project...[/bold blue]")
         # Add files to repository
-        subprocess.call(
-            ["git", "add", "."],
-            stdin=None,
-            stdout=None,
-            stderr=None,
-        )
+        if stage_project(self.project_path, self.execution.env) is None:
+            self.execution.run(["git", "add", "."])
 
         # Initial commit
-        subprocess.call(
-            ["git", "commit", "-m", "feat: Initial commit"],
-            stdin=None,
-            stdout=None,
-            stderr=None,
-        )
+        self.execution.run(["git", "commit", "-m", "feat: Initial commit"])
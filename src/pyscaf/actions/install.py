@@ -0,0 +1,204 @@
+"""
+Install phase planning: one environment sync, then the actions' commands against the venv interpreter.
+"""
+
+import logging
+import os
+import shutil
+import threading
+from contextlib import nullcontext
+from pathlib import Path
+
+from pydantic import BaseModel
+
+from pyscaf.actions.execution import ExecutionContext
+from pyscaf.tools.env_cache import EnvironmentCache, dependency_key
+from pyscaf.tools.tracing import span
+
+logger = logging.getLogger(__name__)
+
+# Dependency group uv sync installs without being asked
+DEFAULT_GROUP = "dev"
+
+
+class InstallCommand(BaseModel):
+    """A command an action runs once the environment is installed."""
+
+    args: list[str]
+    python: bool = True  # args are arguments of the project's venv interpreter (instead of `uv run python`)
+    description: str = ""
+    validation: bool = False  # when it fails, the next commands of the action are skipped
+    optional: bool = False  # best effort: when it fails, a warning is printed but the step does not fail
+    missing_hint: str | None = None  # printed when the command is not installed
+
+    @property
+    def label(self) -> str:
+        return self.description or " ".join(self.args)
+
+
+class InstallNeeds(BaseModel):
+    """What an action needs from the install phase."""
+
+    groups: set[str] = set()  # dependency groups of pyproject.toml to install
+    commands: list[InstallCommand] = []  # run in order, after the environment is synced
+
+    @property
+    def needs_environment(self) -> bool:
+        return bool(self.groups) or any(command.python for command in self.commands)
+
+
+class InstallPlanner:
+    """
+    Collects the install needs of the active actions and resolves the environment once.
+
+    Before the install phase, the ActionManager adds the needs of every active action:
+    the single `uv sync` then installs all the requested groups at once. The first
+    action step needing the environment runs that sync (the other ones wait for it);
+    each action's commands then run directly with the venv interpreter, so no
+    `uv run` re-checks the environment. The commands of independent actions run
+    concurrently, as their install steps do.
+
+    With an EnvironmentCache, a project whose dependencies were already resolved gets
+    the cached uv.lock and venv before the sync, which then only installs the project.
+    """
+
+    def __init__(self, execution: ExecutionContext, cache: EnvironmentCache | None = None):
+        """
+        Args:
+            execution: Execution context of the project
+            cache: Cache of resolved environments to restore from and populate (None: always resolve)
+        """
+        self.execution = execution
+        self.cache = cache
+        self._needs: dict[str, InstallNeeds] = {}
+        self._sync_lock = threading.Lock()
+        self._sync_result: int | None = None
+        # Actions whose commands did not all run (no environment, failed validation)
+        self.incomplete: set[str] = set()
+
+    @property
+    def groups(self) -> set[str]:
+        return {group for needs in self._needs.values() for group in needs.groups}
+
+    def add(self, action_id: str, needs: InstallNeeds) -> None:
+        self._needs[action_id] = needs
+
+    def sync_args(self) -> list[str]:
+        """The uv sync command installing every requested group."""
+        args = ["uv", "sync"]
+        for group in sorted(self.groups - {DEFAULT_GROUP}):
+            args += ["--group", group]
+        return args
+
+    @property
+    def venv(self) -> Path:
+        """The project's venv (UV_PROJECT_ENVIRONMENT or .venv)."""
+        return self.execution.path(self.execution.env.get("UV_PROJECT_ENVIRONMENT", ".venv"))
+
+    @property
+    def python(self) -> Path:
+        """Interpreter of the project's venv."""
+        if os.name == "nt":
+            return self.venv / "Scripts" / "python.exe"
+        return self.venv / "bin" / "python"
+
+    def sync(self) -> int:
+        """
+        Install the environment, once: later calls return the exit code of the first one.
+
+        Returns:
+            The exit code of uv sync (127 if uv is not installed)
+        """
+        with self._sync_lock:
+            if self._sync_result is None:
+                console = self.execution.console
+                console.print("[bold blue]Installing dependencies with uv...[/bold blue]")
+                try:
+                    self._sync_result = self._sync()
+                except FileNotFoundError:
+                    console.print("[bold yellow]uv not found. Please install it first.[/bold yellow]")
+                    console.print("https://docs.astral.sh/uv/getting-started/installation")
+                    self._sync_result = 127
+                else:
+                    if self._sync_result == 0:
+                        console.print("[bold green]uv dependencies installed successfully![/bold green]")
+                    else:
+                        console.print(f"[bold yellow]uv sync exited with code {self._sync_result}[/bold yellow]")
+            return self._sync_result
+
+    def _sync(self) -> int:
+        """Run uv sync, from the cached environment when there is one."""
+        args = self.sync_args()
+        console = self.execution.console
+        if self.cache is None or self.venv.exists():
+            console.print(f"[bold cyan]Running {' '.join(args)}...[/bold cyan]")
+            return self.execution.run(args)
+
+        project = self.execution.pyproject.document.get("project", {})
+        key = dependency_key(self.execution.pyproject.document, self.groups)
+        # The first project of a key resolves it while the others wait, then they all restore it
+        with self.cache.lock(key):
+            with span("restore environment", "cache", key=key):
+                restored = self.cache.restore(
+                    key, self.execution.project_path, self.venv, project.get("name", ""), project.get("version")
+                )
+            if not restored:
+                console.print(f"[bold cyan]Running {' '.join(args)}...[/bold cyan]")
+                result = self.execution.run(args)
+                if result == 0:
+                    with span("store environment", "cache", key=key):
+                        self.cache.store(key, self.execution.project_path, self.venv)
+                return result
+
+        console.print(f"[bold cyan]Environment restored from the cache, running {' '.join(args)}...[/bold cyan]")
+        result = self.execution.run(args)
+        if result != 0:
+            # E.g. the interpreter of the template was removed: resolve the environment from scratch
+            console.print("[bold yellow]The cached environment could not be used, resolving it again[/bold yellow]")
+            shutil.rmtree(self.venv, ignore_errors=True)
+            self.execution.path("uv.lock").unlink(missing_ok=True)
+            result = self.execution.run(args)
+        return result
+
+    def run(self, action_id: str) -> list[int]:
+        """
+        Run the commands of an action (after syncing the environment if it needs it).
+
+        Returns:
+            The exit code of each command run (skipped commands are not listed)
+        """
+        needs = self._needs.get(action_id)
+        if needs is None:
+            return []
+        console = self.execution.console
+        synced = self.sync() == 0 if needs.needs_environment else True
+        codes: list[int] = []
+        for command in needs.commands:
+            if command.python:
+                if not synced or not self.python.exists():
+                    console.print(f"[bold yellow]No project environment: skipping {command.label}[/bold yellow]")
+                    self.incomplete.add(action_id)
+                    continue
+                args = [str(self.python), *command.args]
+            else:
+                args = list(command.args)
+            console.print(f"[bold cyan]{command.label}...[/bold cyan]")
+            try:
+                # The failure of a best-effort command does not fail the step
+                with self.execution.track_failures(enabled=False) if command.optional else nullcontext():
+                    code = self.execution.run(args)
+            except FileNotFoundError:
+                console.print(f"[bold yellow]{args[0]} not found. Please install it first.[/bold yellow]")
+                if command.missing_hint:
+                    console.print(command.missing_hint)
+                code = 127
+            codes.append(code)
+            if code == 0:
+                console.print(f"[bold green]{command.label}: done[/bold green]")
+            else:
+                console.print(f"[bold yellow]{command.label} exited with code {code}[/bold yellow]")
+                if command.validation:
+                    logger.debug(f"Validation of {action_id} failed, skipping its next commands")
+                    self.incomplete.add(action_id)
+                    break
+        return codes
@@ -0,0 +1,183 @@
+"""
+Journal of a project creation (.pyscaf/state.json), to resume it after a failure.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from collections.abc import Callable, Mapping, Sequence
+from pathlib import Path
+from typing import Any
+
+from pydantic import BaseModel, ValidationError
+
+from pyscaf import __version__
+from pyscaf.actions import Action
+from pyscaf.actions.snapshot import RUNTIME_KEYS, action_files
+from pyscaf.tools.snapshot_cache import snapshot_key
+
+logger = logging.getLogger(__name__)
+
+JOURNAL_PATH = Path(".pyscaf") / "state.json"
+
+# Bump when the journal layout changes so that old journals are ignored
+JOURNAL_FORMAT = 1
+
+# Called with (phase, action id, "completed" or "failed") each time a step is recorded
+StepListener = Callable[[str, str, str], None]
+
+
+class StepRecord(BaseModel):
+    """A step (phase of an action) that completed: no error, no failed command."""
+
+    phase: str
+    action: str
+    inputs: str  # step_inputs() of the action when the step ran
+    duration: float  # seconds
+    finished: float  # time.time()
+
+
+class FailedStep(BaseModel):
+    """A step whose commands failed (or that raised) during the last run."""
+
+    phase: str
+    action: str
+    commands: list[str] = []  # failed commands, with their exit code
+    error: str | None = None
+
+
+class JournalState(BaseModel):
+    """Content of .pyscaf/state.json."""
+
+    format: int = JOURNAL_FORMAT
+    version: str = __version__
+    context: dict[str, Any] = {}  # context of the creation, without its runtime-only keys
+    steps: list[StepRecord] = []
+    failed: list[FailedStep] = []
+
+
+def persistent_context(context: Mapping[str, Any]) -> dict[str, Any]:
+    """The part of a context that defines the project (what a resumed run reuses)."""
+    return {key: value for key, value in context.items() if key not in RUNTIME_KEYS}
+
+
+def step_inputs(context: Mapping[str, Any], action_cls: type[Action]) -> str:
+    """Hash of what the steps of an action depend on: the project context and the files of the action."""
+    return snapshot_key({"context": persistent_context(context), "files": action_files(action_cls)})
+
+
+def describe_steps(steps: Sequence[FailedStep]) -> str:
+    """The failed steps, as "action (phase)", comma-separated."""
+    return ", ".join(f"{step.action} ({step.phase})" for step in steps)
+
+
+class StepsFailedError(RuntimeError):
+    """Raised at the end of a project creation in which some steps failed (see ProjectJournal.fail)."""
+
+    def __init__(self, failed: Sequence[FailedStep]):
+        self.failed = list(failed)
+        super().__init__(f"Some steps failed: {describe_steps(self.failed)}")
+
+
+class ProjectJournal:
+    """
+    Completed steps of a project creation, written to .pyscaf/state.json as they complete.
+
+    The ActionManager records each (phase, action) step once it completed without an
+    error or a failed command, with the hash of its inputs. A resumed run loads the
+    journal and skips the steps recorded with unchanged inputs, so that it continues
+    from the failure point. Every change is written at once (atomically): the journal
+    stays usable whenever the creation stops. It is discarded once the creation succeeded.
+
+    The .pyscaf directory ignores itself (its own .gitignore), whichever actions run.
+    """
+
+    def __init__(self, project_path: str | Path, listener: StepListener | None = None):
+        """
+        Args:
+            project_path: Root directory of the project
+            listener: Called each time a step is recorded (e.g. to report the progress of the creation)
+        """
+        self.path = Path(project_path) / JOURNAL_PATH
+        self.state = JournalState()
+        self.listener = listener
+        self._lock = threading.Lock()
+        self._created = False  # .pyscaf and its .gitignore exist
+
+    @classmethod
+    def read(cls, project_path: str | Path) -> JournalState | None:
+        """The journal of a project, None if it has none (or an unreadable one)."""
+        path = Path(project_path) / JOURNAL_PATH
+        try:
+            state = JournalState.model_validate_json(path.read_bytes())
+        except (OSError, ValidationError):
+            return None
+        return state if state.format == JOURNAL_FORMAT else None
+
+    def load(self) -> bool:
+        """Load the journal from disk (to resume), keeping its completed steps."""
+        state = self.read(self.path.parent.parent)
+        if state is None:
+            return False
+        self.state = state.model_copy(update={"failed": []})
+        return True
+
+    def start(self, context: Mapping[str, Any]) -> None:
+        """Record the context of this run."""
+        with self._lock:
+            self.state.context = persistent_context(context)
+            self.state.version = __version__
+            self._save()
+
+    def record(self, phase: str, action_id: str) -> StepRecord | None:
+        """The completed record of a step, if any (whatever its inputs)."""
+        return next(
+            (step for step in self.state.steps if step.phase == phase and step.action == action_id),
+            None,
+        )
+
+    def done(self, phase: str, action_id: str, inputs: str) -> bool:
+        """Whether the step completed with the same inputs."""
+        record = self.record(phase, action_id)
+        return record is not None and record.inputs == inputs
+
+    def complete(self, phase: str, action_id: str, inputs: str, duration: float) -> None:
+        """Record a completed step."""
+        with self._lock:
+            self.state.steps = [s for s in self.state.steps if (s.phase, s.action) != (phase, action_id)]
+            self.state.steps.append(
+                StepRecord(phase=phase, action=action_id, inputs=inputs, duration=duration, finished=time.time())
+            )
+            self._save()
+        if self.listener is not None:
+            self.listener(phase, action_id, "completed")
+
+    def fail(self, phase: str, action_id: str, commands: Sequence[str] = (), error: str | None = None) -> None:
+        """Record a failed step (it runs again when the creation is resumed)."""
+        with self._lock:
+            self.state.failed.append(FailedStep(phase=phase, action=action_id, commands=list(commands), error=error))
+            self._save()
+        if self.listener is not None:
+            self.listener(phase, action_id, "failed")
+
+    def discard(self) -> None:
+        """Remove the journal (and the .pyscaf directory, unless something else was put in it)."""
+        with self._lock:
+            self.path.unlink(missing_ok=True)
+            (self.path.parent / ".gitignore").unlink(missing_ok=True)
+            try:
+                self.path.parent.rmdir()
+            except OSError:
+                pass
+            self._created = False
+
+    def _save(self) -> None:
+        if not self._created:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            (self.path.parent / ".gitignore").write_text("*\n", encoding="utf-8")
+            self._created = True
+        tmp = self.path.with_name(f".{self.path.name}.tmp")
+        tmp.write_text(json.dumps(self.state.model_dump(), indent=2, default=str) + "\n", encoding="utf-8")
+        os.replace(tmp, self.path)
@@ -2,18 +2,15 @@
 Jupyter initialization actions.
 """
 
-import os
-import subprocess
 from pathlib import Path
 from typing import Dict, Optional
 
 import tomli
 import tomli_w
-from rich.console import Console
 
 from pyscaf.actions import Action, CLIOption
-
-console = Console()
+from pyscaf.actions.install import InstallCommand, InstallNeeds
+from pyscaf.tools.templates import TemplateContent
 
 
 class JupyterAction(Action):
@@ -31,13 +28,19 @@ class JupyterAction(Action):
         ),
     ]  # Add Jupyter-specific options if needed
 
-    def __init__(self, project_path):
-        super().__init__(project_path)
+    def __init__(self, project_path, execution=None):
+        super().__init__(project_path, execution)
 
     def activate(self, context: dict) -> bool:
         return context.get("jupyter") is None or context.get("jupyter", True)
 
-    def skeleton(self, context: dict) -> dict[Path, str | None]:
+    def resources(self, phase: str, context: dict) -> set[str]:
+        if phase == "install":
+            # Only the user's kernel specs are ours (the environment is synced once, before)
+            return {"jupyter-kernels"}
+        return super().resources(phase, context)
+
+    def skeleton(self, context: dict) -> dict[Path, str | TemplateContent | None]:
         """
         Define the filesystem skeleton for Jupyter notebook support.
 
@@ -47,16 +50,12 @@ class JupyterAction(Action):
         project_name = context.get("project_name", "myproject")
 
         # Read Jupyter documentation
-        jupyter_doc_path = Path(__file__).parent / "README.md"
-        jupyter_doc = jupyter_doc_path.read_text() if jupyter_doc_path.exists() else ""
+        jupyter_doc = self.resource("README.md") or ""
 
         # Create a README for notebooks
-        notebook_readme = f"""# {project_name} - Notebooks
-
-This directory contains Jupyter notebooks for the {project_name} project.
-
-{jupyter_doc}
-"""
+        notebook_readme = self.template(
+            "template_notebooks_README.md.jinja", project_name=project_name, jupyter_doc=jupyter_doc
+        )
 
         # Ajout conditionnel du .gitignore si git est activé
         skeleton = {
@@ -64,60 +63,26 @@ This directory contains Jupyter notebooks for the {project_name} project.
             Path("notebooks/README.md"): notebook_readme,
         }
         if context.get("versionning"):
-            gitignore_path = Path(__file__).parent / "template.gitignore"
-            gitignore_content = gitignore_path.read_text() if gitignore_path.exists() else ""
-            skeleton[Path(".gitignore")] = gitignore_content
+            skeleton[Path(".gitignore")] = self.resource("template.gitignore") or ""
         return skeleton
 
-    def install(self, context: dict) -> None:
-        """
-        Set up the Jupyter kernel for the project.
-
-        This will create a Jupyter kernel specific to this project.
-        """
-        console.print("[bold blue]Setting up Jupyter kernel for the project...[/bold blue]")
-
-        try:
-            # Ensure we're in the right directory
-            os.chdir(self.project_path)
-
-            # Create a Jupyter kernel for this project
-            console.print("[bold cyan]Creating Jupyter kernel for this project...[/bold cyan]")
-
-            project_name = context.get("project_name", "myproject")
-
-            # Remove VIRTUAL_ENV from environment to avoid uv warnings when running inside another venv
-            env = os.environ.copy()
-            env.pop("VIRTUAL_ENV", None)
-
-            # Run the ipykernel installation via uv
-            result = subprocess.call(
-                [
-                    "uv",
-                    "run",
-                    "python",
-                    "-m",
-                    "ipykernel",
-                    "install",
-                    "--user",
-                    "--name",
-                    project_name,
-                    "--display-name",
-                    f"{project_name} (uv)",
-                ],
-                env=env,
-                stdin=None,
-                stdout=None,
-                stderr=None,
-            )
-
-            if result == 0:
-                console.print("[bold green]Jupyter kernel created successfully![/bold green]")
-                console.print(
-                    f"[bold green]You can now use the '{project_name} (uv)' kernel in Jupyter.[/bold green]"
+    def install_needs(self, context: dict) -> InstallNeeds:
+        """Create a Jupyter kernel specific to this project (with the venv interpreter)."""
+        project_name = context.get("project_name", "myproject")
+        return InstallNeeds(
+            commands=[
+                InstallCommand(
+                    args=[
+                        "-m",
+                        "ipykernel",
+                        "install",
+                        "--user",
+                        "--name",
+                        project_name,
+                        "--display-name",
+                        f"{project_name} (uv)",
+                    ],
+                    description=f"Creating Jupyter kernel '{project_name} (uv)'",
                 )
-            else:
-                console.print(f"[bold yellow]Jupyter kernel creation exited with code {result}[/bold yellow]")
-
-        except FileNotFoundError:
-            console.print("[bold yellow]uv or Jupyter not found. Make sure they are installed.[/bold yellow]")
+            ]
+        )
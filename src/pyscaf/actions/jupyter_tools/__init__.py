@@ -2,20 +2,16 @@
 jupyter tools initialization actions.
 """
 
-import os
-import subprocess
 from pathlib import Path
 from typing import Dict, Optional
 
 import tomli
 import tomli_w
-from rich.console import Console
 
 from pyscaf.actions import Action, CLIOption
+from pyscaf.tools.assets import AssetFile
 from pyscaf.tools.toml_merge import merge_toml_files
 
-console = Console()
-
 
 class JupyterToolsAction(Action):
     """Action to provide Jupyter notebook manipulation tools."""
@@ -32,15 +28,20 @@ class JupyterToolsAction(Action):
         ),
     ]
 
-    def __init__(self, project_path):
-        super().__init__(project_path)
+    def __init__(self, project_path, execution=None):
+        super().__init__(project_path, execution)
 
     def activate(self, context: dict) -> bool:
         return (
             context.get("jupyter", True) and context.get("jupyter_tools") is None or context.get("jupyter_tools", True)
         )
 
-    def skeleton(self, context: dict) -> dict[Path, str | None]:
+    def resources(self, phase: str, context: dict) -> set[str]:
+        if phase == "install":
+            return {"tools"}
+        return super().resources(phase, context)
+
+    def skeleton(self, context: dict) -> dict[Path, str | AssetFile | None]:
         """
         Define the filesystem skeleton for Jupyter tools.
 
@@ -49,14 +50,12 @@ class JupyterToolsAction(Action):
         """
 
         # Read configuration file
-        config_path = Path(__file__).parent / "config.toml"
-        readme_path = Path(__file__).parent / "README.md"
-        readme_content = readme_path.read_text() if readme_path.exists() else ""
-        config_content = config_path.read_text() if config_path.exists() else ""
+        readme_content = self.resource("README.md") or ""
+        config_content = self.resource("config.toml")
 
         # Parse config.toml to get directory paths
         config_dirs = []
-        if config_path.exists():
+        if config_content is not None:
             try:
                 config_data = tomli.loads(config_content)
                 if (
@@ -70,10 +69,10 @@ class JupyterToolsAction(Action):
                         if isinstance(value, str) and ("dir" in key or "directory" in key):
                             config_dirs.append(Path(value))
             except Exception as e:
-                console.print(f"[bold yellow]Warning: Could not parse config.toml: {e}[/bold yellow]")
+                self.console.print(f"[bold yellow]Warning: Could not parse config.toml: {e}[/bold yellow]")
 
         # Copy scripts from the source
-        scripts_dir = Path(__file__).parent / "scripts"
+        scripts = self.asset_dir("scripts", "src/pyscaf/jupyter_tools/scripts", ".py", recursive=False)
 
         skeleton = {
             Path("src/pyscaf/jupyter_tools"): None,  # Create tools directory
@@ -85,15 +84,13 @@ class JupyterToolsAction(Action):
             skeleton[dir_path] = None  # Create directory
 
         # Add all script files
-        if scripts_dir.exists():
+        if scripts:
             # Add __init__.py for pyscaf directory in src
             skeleton[Path("src/pyscaf/__init__.py")] = ""
             skeleton[Path("src/pyscaf/jupyter_tools/__init__.py")] = ""
             skeleton[Path("src/pyscaf/jupyter_tools/scripts/__init__.py")] = ""
 
-            for script_file in scripts_dir.glob("*.py"):
-                script_content = script_file.read_text()
-                skeleton[Path(f"src/pyscaf/jupyter_tools/scripts/{script_file.name}")] = script_content
+            skeleton.update(scripts)
 
         return skeleton
 
@@ -103,26 +100,23 @@ class JupyterToolsAction(Action):
 
         This will make the tools executable and create convenience scripts.
         """
-        console.print("[bold blue]Setting up Jupyter tools...[/bold blue]")
+        self.console.print("[bold blue]Setting up Jupyter tools...[/bold blue]")
 
         try:
-            # Ensure we're in the right directory
-            os.chdir(self.project_path)
-
             # Make tools executable (on Unix-like systems)
-            tools_dir = Path("tools")
+            tools_dir = self.execution.path("tools")
             if tools_dir.exists():
                 for script_file in tools_dir.glob("*.py"):
                     try:
                         # Make executable on Unix-like systems
                         script_file.chmod(0o755)
-                        console.print(f"[bold green]Made {script_file.name} executable[/bold green]")
+                        self.console.print(f"[bold green]Made {script_file.name} executable[/bold green]")
                     except OSError:
                         # On Windows, this will fail but that's okay
                         pass
 
-            console.print("[bold green]Jupyter tools setup complete![/bold green]")
-            console.print("[bold blue]You can now use the tools in the tools/ directory.[/bold blue]")
+            self.console.print("[bold green]Jupyter tools setup complete![/bold green]")
+            self.console.print("[bold blue]You can now use the tools in the tools/ directory.[/bold blue]")
 
         except Exception as e:
-            console.print(f"[bold yellow]Error setting up Jupyter tools: {e}[/bold yellow]")
+            self.console.print(f"[bold yellow]Error setting up Jupyter tools: {e}[/bold yellow]")
@@ -52,8 +52,8 @@ class LicenseAction(Action):
         ),
     ]
 
-    def __init__(self, project_path):
-        super().__init__(project_path)
+    def __init__(self, project_path, execution=None):
+        super().__init__(project_path, execution)
 
     def skeleton(self, context: dict) -> dict[Path, str | None]:
         license_key = context.get("license", "mit")  # Get the key (e.g., "mit")
@@ -68,8 +68,7 @@ class LicenseAction(Action):
         skeleton = {}
         if license_choice:
             # Read the selected license template
-            license_template_path = Path(__file__).parent / license_choice
-            if license_template_path.exists():
-                license_content = license_template_path.read_text()
+            license_content = self.resource(license_choice)
+            if license_content is not None:
                 skeleton[Path("LICENSE")] = license_content
         return skeleton
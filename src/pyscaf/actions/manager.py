@@ -2,113 +2,187 @@
 Project action manager module.
 """
 
+import io
 import logging
+import shutil
+import time
+from collections.abc import Mapping
 from pathlib import Path
-from typing import Any
+from typing import IO, Any
 
 import questionary
 from rich.console import Console
 
-from pyscaf.actions import Action, discover_actions
+from pyscaf.actions import Action
 from pyscaf.actions.cli_option_to_key import cli_option_to_key
+from pyscaf.actions.execution import ExecutionContext
+from pyscaf.actions.install import InstallPlanner
+from pyscaf.actions.journal import (
+    ProjectJournal,
+    StepListener,
+    StepsFailedError,
+    describe_steps,
+    step_inputs,
+)
+from pyscaf.actions.registry import action_id_for, get_registry
+from pyscaf.actions.scheduler import DEFAULT_JOBS, PhaseScheduler, PhaseTask
+from pyscaf.actions.snapshot import placeholder_context, placeholder_values, project_snapshot_key, project_values
 from pyscaf.preference_chain import (
     CircularDependencyError,
     build_chains,
-    compute_all_resolution_pathes,
-    compute_path_score,
+    compute_best_resolution_path,
     extend_nodes,
 )
-from pyscaf.preference_chain.model import Node
+from pyscaf.preference_chain.model import ExtendedNode
+from pyscaf.tools.env_cache import EnvironmentCache
+from pyscaf.tools.runner import CommandResult, CommandRunner
+from pyscaf.tools.skeleton_stage import SkeletonStage
+from pyscaf.tools.snapshot_cache import SnapshotCache
+from pyscaf.tools.tracing import span
 
 console = Console()
 logger = logging.getLogger(__name__)
 
 
+def determine_action_order() -> list[str]:
+    """
+    Return the ids of all the registered actions in optimal execution order (preference chain logic).
+
+    Raises:
+        CircularDependencyError: If no order satisfies the dependencies of the actions
+    """
+    # Describe all available actions (from the registry, without importing them)
+    registry = get_registry()
+
+    # Build nodes for the new preference chain logic (entries are already validated)
+    nodes = []
+    known_ids = set()
+
+    for entry in registry.entries():
+        node = ExtendedNode(id=entry.id, depends=set(entry.depends), after=entry.run_preferably_after)
+        nodes.append(node)
+        known_ids.add(entry.id)
+
+    logger.debug(f"Created {len(nodes)} action nodes")
+
+    # Use the new preference chain logic to determine optimal execution order
+    extended_dependencies = extend_nodes(nodes)
+    clusters = build_chains(extended_dependencies)
+
+    logger.debug(f"Built {len(clusters)} chains from actions")
+
+    # Find the best resolution path (highest score, first in permutation order)
+    best_path = compute_best_resolution_path(clusters)
+
+    if best_path is None:
+        # No valid resolution path found - this indicates a serious dependency issue
+        action_ids = [node.id for node in nodes]
+        error_msg = (
+            f"No valid resolution path found for actions: {action_ids}. "
+            "This indicates circular dependencies or unsatisfiable constraints between actions."
+        )
+        logger.error(error_msg)
+        raise CircularDependencyError(error_msg)
+
+    # Extract the final execution order from the best path
+    order = [action_id for chain in best_path for action_id in chain.ids]
+
+    logger.debug(f"Final action execution order: {order}")
+
+    return [action_id for action_id in order if action_id in known_ids]
+
+
+def _jobs(context: dict[str, Any]) -> int:
+    """Number of actions (and commands) run concurrently."""
+    # Questions may be asked during the phases: keep them on the main thread
+    return 1 if context.get("interactive") else context.get("jobs") or DEFAULT_JOBS
+
+
+def _failed_commands(failures: list[CommandResult]) -> list[str]:
+    """The failed commands of a step, as recorded in the journal."""
+    return [f"{' '.join(result.args)} (exit {result.returncode})" for result in failures]
+
+
 class ActionManager:
     """Manager for all project actions."""
 
-    def __init__(self, project_name: str | Path, context: dict[str, Any]):
+    def __init__(
+        self,
+        project_name: str | Path,
+        context: dict[str, Any],
+        env: Mapping[str, str] | None = None,
+        output: Console | None = None,
+        order: list[str] | None = None,
+        log: IO[str] | None = None,
+        on_step: StepListener | None = None,
+    ):
         """
         Initialize the action manager.
 
         Args:
-            project_name: Name of the project to create
+            project_name: Name of the project to create (relative to the current directory, or absolute)
             context: Project context
+            env: Environment of the commands run by the actions (defaults to a copy of os.environ)
+            output: Console the manager and the actions print to (defaults to the console of this module)
+            order: Execution order of the actions, when already computed (e.g. once for a whole batch)
+            log: File receiving the output of the commands run by the actions (defaults to the terminal)
+            on_step: Called with (phase, action id, "completed" or "failed") as the steps are journaled
         """
         self.project_path = Path.cwd() / project_name
-        console.print(f"[bold green]Project path: [/bold green]{self.project_path}")
+        # Everything the actions need to run (no os.chdir: several projects can be built in one process)
+        runner = CommandRunner(jobs=_jobs(context), timeout=context.get("command_timeout"))
+        self.execution = ExecutionContext(self.project_path, env=env, console=output or console, log=log, runner=runner)
+        self.console = self.execution.console
+        self.console.print(f"[bold green]Project path: [/bold green]{self.project_path}")
         self.context = context
-        self.actions: list[Action] = []
+        self.journal = ProjectJournal(self.project_path, listener=on_step)
+        self.order: list[str] = []
+        self._instances: dict[str, Action] = {}
+        self._inputs: dict[str, str] = {}  # action id -> step_inputs(), computed once per run
 
         # Determine which actions to include based on configuration
-        self._determine_actions()
+        if order is None:
+            self._determine_actions()
+        else:
+            self.order = list(order)
 
     def _determine_actions(self) -> None:
         """Determine which actions to include based on configuration using the new preference chain logic."""
-        # Discover all available Action classes
-        action_classes = discover_actions()
-
-        # Build Node objects for the new preference chain logic
-        nodes = []
-        action_class_by_id = {}
-
-        for action_cls in action_classes:
-            action_id = action_cls.__name__.replace("Action", "").lower()
-            depends = getattr(action_cls, "depends", set())
-            after = getattr(action_cls, "run_preferably_after", None)
-
-            # Create Node object
-            node = Node(id=action_id, depends=depends, after=after)
-            nodes.append(node)
-            action_class_by_id[action_id] = action_cls
-
-        logger.debug(f"Created {len(nodes)} action nodes")
-
-        # Use the new preference chain logic to determine optimal execution order
-        extended_dependencies = extend_nodes(nodes)
-        clusters = build_chains(extended_dependencies)
+        # Actions are instantiated lazily, in this order (see iter_actions)
+        with span("ordering", "manager"):
+            self.order = determine_action_order()
 
-        logger.debug(f"Built {len(clusters)} chains from actions")
-
-        # Compute all possible resolution paths
-        all_resolution_paths = list(compute_all_resolution_pathes(clusters))
-
-        if not all_resolution_paths:
-            # No valid resolution path found - this indicates a serious dependency issue
-            action_ids = [node.id for node in nodes]
-            error_msg = (
-                f"No valid resolution path found for actions: {action_ids}. "
-                "This indicates circular dependencies or unsatisfiable constraints between actions."
-            )
-            logger.error(error_msg)
-            raise CircularDependencyError(error_msg)
-
-        logger.debug(f"Found {len(all_resolution_paths)} resolution paths for actions")
-
-        # Sort paths by score (best score first)
-        all_resolution_paths.sort(key=lambda path: -compute_path_score(list(path)))
-
-        # Extract the final execution order from the best path
-        best_path = all_resolution_paths[0]
-        order = [action_id for chain in best_path for action_id in chain.ids]
-
-        logger.debug(f"Final action execution order: {order}")
+    def iter_actions(self):
+        """
+        Yield the actions in optimal order.
 
-        # Instantiate actions in the optimal order
-        self.actions = [
-            action_class_by_id[action_id](self.project_path) for action_id in order if action_id in action_class_by_id
-        ]
+        Each action module is only imported when its action is reached, i.e. right
+        before its activate() is evaluated.
+        """
+        registry = get_registry()
+        for action_id in self.order:
+            if action_id not in self._instances:
+                with span(action_id, "import"):
+                    self._instances[action_id] = registry.load(action_id)(self.project_path, self.execution)
+            yield self._instances[action_id]
+
+    @property
+    def actions(self) -> list[Action]:
+        """All the actions in optimal order (imports every action module)."""
+        return list(self.iter_actions())
 
     def run_postfill_hooks(self, context: dict) -> dict:
         """Run all postfill hooks for actions in optimal order."""
-        for action in self.actions:
-            if action.activate(context):
-                for opt in action.cli_options:
-                    context_key = cli_option_to_key(opt)
-                    if context.get(context_key) is None:
-                        continue
-                    if opt.postfill_hook:
-                        context = opt.postfill_hook(context)
+        with span("postfill hooks", "manager"):
+            for action in self.iter_actions():
+                if action.activate(context):
+                    for opt in action.cli_options:
+                        context_key = cli_option_to_key(opt)
+                        if context.get(context_key) is None:
+                            continue
+                        if opt.postfill_hook:
+                            with span(opt.name, "postfill", action=action.__class__.__name__):
+                                context = opt.postfill_hook(context)
         return context
 
     def ask_interactive_questions(self, context: dict) -> dict:
@@ -117,7 +191,7 @@ class ActionManager:
         Only asks if action.activate(context) is True.
         Skips questions for which a value is already present in the context (e.g. provided via CLI).
         """
-        for action in self.actions:
+        for action in self.iter_actions():
             if action.activate(context):
                 for opt in action.cli_options:
                     context_key = cli_option_to_key(opt)
@@ -169,39 +243,267 @@ class ActionManager:
                         context = opt.postfill_hook(context)
         return context
 
-    def create_project(self) -> None:
-        """Create the project structure and initialize it."""
-        # Create project directory if it doesn't exist
-        self.project_path.mkdir(parents=True, exist_ok=True)
+    def _depends_closure(self) -> dict[str, set[str]]:
+        """Map every action id to the ids of all the actions it depends on, directly or not."""
+        direct = {entry.id: set(entry.depends) for entry in get_registry().entries()}
+        closure: dict[str, set[str]] = {}
+
+        def _collect(action_id: str) -> set[str]:
+            if action_id not in closure:
+                closure[action_id] = set()
+                for dep in direct.get(action_id, set()):
+                    closure[action_id] |= {dep} | _collect(dep)
+            return closure[action_id]
+
+        for action_id in direct:
+            _collect(action_id)
+        return closure
+
+    def _step_inputs(self, action_id: str, action_cls: type[Action]) -> str:
+        """The step_inputs() of an action, computed (files listed and hashed) once for all its steps."""
+        if action_id not in self._inputs:
+            self._inputs[action_id] = step_inputs(self.context, action_cls)
+        return self._inputs[action_id]
+
+    def _create_skeletons(self, jobs: int) -> None:
+        """
+        Stage the skeletons of every active action, then write them in a single pass.
 
-        console.print(f"[bold green]Creating project at: [/bold green]{self.project_path}")
+        Files targeted by several actions (README.md, .gitignore...) are assembled in
+        memory, so each file is written and each directory created only once.
 
-        # First pass: Create all skeletons
-        for action in self.actions:
+        The skeletons recorded in the journal are not created again, even if their inputs
+        changed: the files may have been edited since (a warning is printed instead).
+        """
+        stage = SkeletonStage(self.project_path, link_assets=bool(self.context.get("link_assets")))
+        created: list[tuple[str, str, float]] = []
+        for action_id, action in zip(self.order, self.iter_actions(), strict=True):
+            name = action.__class__.__name__
             if not action.activate(self.context):
-                print(f"Skipping {action.__class__.__name__}")
+                self.console.print(f"Skipping {name}")
+                continue
+            inputs = self._step_inputs(action_id, type(action))
+            record = self.journal.record("skeleton", action_id)
+            if record is not None:
+                if record.inputs != inputs:
+                    self.console.print(
+                        f"[bold yellow]{name}: options or templates changed since its skeleton was created "
+                        "(delete the project to regenerate it)[/bold yellow]"
+                    )
+                self.console.print(f"Skipping {name} (skeleton already created)")
                 continue
-            action_name = action.__class__.__name__
-            console.print(f"[bold blue]Creating skeleton for: [/bold blue]{action_name}")
-            action.create_skeleton(self.context)
+            self.console.print(f"[bold blue]Creating skeleton for: [/bold blue]{name}")
+            start = time.perf_counter()
+            with span(action_id_for(type(action)), "skeleton"):
+                if type(action).create_skeleton is not Action.create_skeleton:
+                    # Custom skeleton creation: it sees the files of the previous actions on disk
+                    with span("flush", "skeleton"):
+                        stage.flush(jobs)
+                    action.create_skeleton(self.context)
+                else:
+                    stage.add_skeleton(action.skeleton(self.context))
+            created.append((action_id, inputs, time.perf_counter() - start))
+        with span("flush", "skeleton"):
+            stage.flush(jobs)
+        for action_id, inputs, duration in created:
+            self.journal.complete("skeleton", action_id, inputs, duration)
+
+    def _restore_snapshot(self) -> bool:
+        """
+        Restore the skeleton and init output from the snapshot cache (built on a miss).
+
+        On a miss, a project with placeholder values (see pyscaf.actions.snapshot) is
+        generated without install and stored; the project is then restored from it, with
+        its own name, author and remote substituted. The snapshot of a key is built once,
+        under its exclusive lock: the other projects of a batch wait for it. They restore
+        it concurrently, under the shared lock (which keeps it from being evicted meanwhile).
 
-        # Second pass: Initialize all actions
-        for action in self.actions:
+        Returns:
+            Whether the project was restored (False: generate it, e.g. when steps of the
+            snapshot build failed)
+        """
+        values = project_values(self.context, self.project_path)
+        if values is None or any(self.project_path.iterdir()):
+            logger.debug("Snapshot cache not applicable to this project")
+            return False
+        active = [
+            (action_id, type(action))
+            for action_id, action in zip(self.order, self.iter_actions(), strict=True)
+            if action.activate(self.context)
+        ]
+        key = project_snapshot_key(self.context, active, values, self.execution.env)
+        cache = SnapshotCache()
+        with span("snapshot", "cache", key=key):
+            with cache.lock(key, shared=True):
+                restored = cache.restore(key, self.project_path, values.model_dump())
+            if not restored:
+                with cache.lock(key):
+                    if cache.entry(key) is None:
+                        self.console.print("[bold blue]Building the project snapshot...[/bold blue]")
+                        build_path = cache.build_path(key)
+                        placeholders = placeholder_values(values, build_path)
+                        builder = ActionManager(
+                            placeholders.project_path,
+                            placeholder_context(self.context, placeholders),
+                            env=self.execution.env,
+                            output=Console(file=io.StringIO()),
+                            order=self.order,
+                            log=self.execution.log or io.StringIO(),
+                        )
+                        try:
+                            builder.create_project()  # Its journal is discarded once it succeeded
+                        except StepsFailedError:
+                            # Nothing to store: the project is generated, its own steps failing in its journal
+                            shutil.rmtree(build_path, ignore_errors=True)
+                            return False
+                        cache.store(key, placeholders.project_path, placeholders.placeholders())
+                with cache.lock(key, shared=True):
+                    restored = cache.restore(key, self.project_path, values.model_dump())
+            cache.evict(keep=key)
+        if restored:
+            self.console.print("[bold green]Project restored from the snapshot cache[/bold green]")
+            for action_id, action_cls in active:
+                inputs = self._step_inputs(action_id, action_cls)
+                self.journal.complete("skeleton", action_id, inputs, 0.0)
+                self.journal.complete("init", action_id, inputs, 0.0)
+        return restored
+
+    def _plan_install(self) -> InstallPlanner:
+        """Collect the install needs of every active action (the groups they need are synced at once)."""
+        cache = EnvironmentCache() if self.context.get("env_cache") else None
+        planner = InstallPlanner(self.execution, cache=cache)
+        for action_id, action in zip(self.order, self.iter_actions(), strict=True):
+            if action.activate(self.context):
+                planner.add(action_id, action.install_needs(self.context))
+        return planner
+
+    def _run_phase(
+        self,
+        phase: str,
+        message: str,
+        scheduler: PhaseScheduler,
+        completed: list[tuple[str, str, float]] | None = None,
+    ) -> None:
+        """
+        Run one phase (init or install) for every active action, independent actions concurrently.
+
+        In the install phase, the step of an action is its install() followed by its planned
+        commands (the first step needing the environment syncs it, for all the actions).
+
+        The steps the journal records as done with the same inputs are skipped. A step that
+        raises, or whose commands fail, is recorded as failed; the others are recorded as
+        completed, or appended to `completed` when their output is not on disk yet (the
+        caller records them once it is).
+        """
+        depends = self._depends_closure()
+        planner = self._plan_install() if phase == "install" else None
+        tasks = []
+        for action_id, action in zip(self.order, self.iter_actions(), strict=True):
             if not action.activate(self.context):
                 continue
-            action_name = action.__class__.__name__
-            console.print(f"[bold blue]Initializing: [/bold blue]{action_name}")
-            action.init(self.context)
-
-        # Third pass: Install dependencies if not skipped
-        if not self.context.get("no_install", False):
-            for action in self.actions:
-                if not action.activate(self.context):
-                    continue
-                action_name = action.__class__.__name__
-                console.print(f"[bold blue]Installing dependencies for: [/bold blue]{action_name}")
-                action.install(self.context)
-        else:
-            console.print("[bold yellow]Skipping installation.[/bold yellow]")
+            inputs = self._step_inputs(action_id, type(action))
+            if self.journal.done(phase, action_id, inputs):
+                self.console.print(f"Skipping {action.__class__.__name__} ({phase} already done)")
+                continue
+
+            def _run(action: Action = action, action_id: str = action_id, inputs: str = inputs) -> None:
+                self.console.print(f"[bold blue]{message}: [/bold blue]{action.__class__.__name__}")
+                start = time.perf_counter()
+                with self.execution.track_failures() as failures:
+                    try:
+                        with span(action_id, phase):
+                            getattr(action, phase)(self.context)
+                            if planner is not None:
+                                planner.run(action_id)
+                    except Exception as e:
+                        self.journal.fail(
+                            phase, action_id, _failed_commands(failures), error=f"{type(e).__name__}: {e}"
+                        )
+                        raise
+                if failures or (planner is not None and action_id in planner.incomplete):
+                    self.journal.fail(phase, action_id, _failed_commands(failures))
+                elif completed is not None:
+                    completed.append((action_id, inputs, time.perf_counter() - start))
+                else:
+                    self.journal.complete(phase, action_id, inputs, time.perf_counter() - start)
+
+            tasks.append(
+                PhaseTask(
+                    id=action_id,
+                    depends=depends.get(action_id, set()),
+                    resources=action.resources(phase, self.context),
+                    run=_run,
+                )
+            )
+        with span(phase, "phase", actions=len(tasks)):
+            scheduler.run(tasks)
+
+    def create_project(self) -> None:
+        """
+        Create the project structure and initialize it.
+
+        The three phases (skeleton, init, install) run one after the other. The skeletons
+        are staged in memory and written in a single pass; inside the init and install
+        phases, the actions that neither depend on each other nor share a resource run
+        concurrently on up to context["jobs"] threads (one in interactive mode). With
+        context["snapshot_cache"], the output of the skeleton and init phases is restored
+        from the snapshot cache instead.
+
+        The completed steps are journaled in .pyscaf/state.json, removed once the creation
+        succeeded. With context["resume"], the steps the journal records as done (with
+        unchanged inputs) are skipped, so the creation continues from where it failed. The
+        install phase does not run when steps failed before it.
+
+        Raises:
+            StepsFailedError: If some steps failed (a step raising, or running a command that
+                failed), once the phases ran; the --resume hint is printed first
+        """
+        # Create project directory if it doesn't exist
+        self.project_path.mkdir(parents=True, exist_ok=True)
 
-        console.print("[bold green]Project creation complete![/bold green]")
+        self.console.print(f"[bold green]Creating project at: [/bold green]{self.project_path}")
+
+        jobs = _jobs(self.context)
+        scheduler = PhaseScheduler(jobs)
+        resume = bool(self.context.get("resume")) and self.journal.load()
+
+        try:
+            # The snapshot cache stands for the first two passes (not in interactive mode: init may ask questions)
+            use_snapshot = self.context.get("snapshot_cache") and not self.context.get("interactive") and not resume
+            restored = use_snapshot and self._restore_snapshot()
+            self.journal.start(self.context)
+            if not restored:
+                # First pass: Create all skeletons
+                with span("skeleton", "phase"):
+                    self._create_skeletons(jobs)
+
+                # Second pass: Initialize all actions, then write their pyproject.toml contributions at once
+                initialized: list[tuple[str, str, float]] = []
+                try:
+                    self._run_phase("init", "Initializing", scheduler, initialized)
+                finally:
+                    self.execution.pyproject.save()
+                    for action_id, inputs, duration in initialized:
+                        self.journal.complete("init", action_id, inputs, duration)
+
+            # Third pass: Install dependencies if not skipped
+            if self.journal.state.failed:
+                # Installing a half-initialized project would only fail further: resume it once fixed
+                self.console.print("[bold yellow]Skipping installation: some steps failed.[/bold yellow]")
+            elif not self.context.get("no_install", False):
+                self._run_phase("install", "Installing dependencies for", scheduler)
+            else:
+                self.console.print("[bold yellow]Skipping installation.[/bold yellow]")
+        finally:
+            if self.journal.state.failed:
+                steps = describe_steps(self.journal.state.failed)
+                name = self.context.get("project_name") or self.project_path.name
+                self.console.print(
+                    f"[bold yellow]Some steps failed: {steps}. Fix the problem, then run "
+                    f"'pyscaf init --resume {name}' to continue.[/bold yellow]"
+                )
+
+        if self.journal.state.failed:
+            raise StepsFailedError(self.journal.state.failed)
+        self.journal.discard()
+        self.console.print("[bold green]Project creation complete![/bold green]")
@@ -0,0 +1,219 @@
+"""
+Action registry: discovers actions once per process and persists a manifest.
+"""
+
+import importlib
+import json
+import logging
+import os
+import pkgutil
+import time
+from pathlib import Path
+from typing import Any
+
+from pydantic import BaseModel, ValidationError
+
+from pyscaf import __version__
+from pyscaf.actions import Action, CLIOption
+from pyscaf.tools.cache_dir import get_cache_dir
+from pyscaf.tools.tracing import Span
+
+logger = logging.getLogger(__name__)
+
+# Bump when the manifest layout changes so that old manifests are ignored
+MANIFEST_FORMAT = 1
+MANIFEST_FILENAME = "action_manifest.json"
+
+# Modules of the actions package that never hold actions
+SKIPPED_MODULES = (
+    "base",
+    "execution",
+    "install",
+    "journal",
+    "manager",
+    "registry",
+    "scheduler",
+    "snapshot",
+    "__pycache__",
+)
+
+
+def action_id_for(action_cls: type[Action]) -> str:
+    """Return the identifier of an action class (e.g. GitAction -> "git")."""
+    return action_cls.__name__.replace("Action", "").lower()
+
+
+def _serialize_option(opt: CLIOption) -> dict[str, Any]:
+    """Dump a CLI option to JSON-compatible data, dropping the callables it may hold."""
+    data = opt.model_copy(update={"postfill_hook": None}).model_dump(mode="json", exclude={"default"})
+    data["default"] = None if callable(opt.default) else opt.default
+    return data
+
+
+class ActionEntry(BaseModel):
+    """Import-free description of an action, as stored in the manifest."""
+
+    id: str
+    module: str
+    class_name: str
+    depends: set[str] = set()
+    run_preferably_after: str | None = None
+    cli_options: list[CLIOption] = []
+    # Names of the options whose default or postfill hook is a callable (only available on the class)
+    dynamic_options: list[str] = []
+
+    @classmethod
+    def from_class(cls, action_cls: type[Action]) -> "ActionEntry":
+        options = getattr(action_cls, "cli_options", [])
+        return cls(
+            id=action_id_for(action_cls),
+            module=action_cls.__module__,
+            class_name=action_cls.__name__,
+            depends=set(getattr(action_cls, "depends", set())),
+            run_preferably_after=getattr(action_cls, "run_preferably_after", None),
+            cli_options=[CLIOption(**_serialize_option(opt)) for opt in options],
+            dynamic_options=[opt.name for opt in options if callable(opt.default) or opt.postfill_hook],
+        )
+
+    def load(self) -> type[Action]:
+        """Import the module of this action and return its class."""
+        module = importlib.import_module(self.module)
+        return getattr(module, self.class_name)
+
+
+class ActionRegistry:
+    """
+    Discovers the actions of a package once and caches the result.
+
+    The first discovery of a process reads the persistent manifest if it is still
+    valid (same pyscaf version and same action module mtimes); otherwise it imports
+    every action module, then rewrites the manifest for the next process.
+    """
+
+    def __init__(
+        self,
+        package: str = "pyscaf.actions",
+        package_dir: str | Path | None = None,
+        manifest_path: str | Path | None = None,
+    ):
+        self.package = package
+        self.package_dir = Path(package_dir) if package_dir else Path(__file__).parent
+        self.manifest_path = Path(manifest_path) if manifest_path else get_cache_dir(MANIFEST_FILENAME)
+        self._entries: list[ActionEntry] | None = None
+        self._classes: dict[str, type[Action]] = {}
+        # Timing of the discovery, which usually happens before any tracer exists (while parsing the command line)
+        self.discovery: Span | None = None
+
+    def _module_files(self) -> dict[str, Path]:
+        """Map every candidate action module name to its source file."""
+        files = {"__init__": self.package_dir / "__init__.py"}
+        for _, module_name, is_pkg in pkgutil.iter_modules([str(self.package_dir)]):
+            if module_name in SKIPPED_MODULES:
+                continue
+            files[module_name] = (
+                self.package_dir / module_name / "__init__.py" if is_pkg else self.package_dir / f"{module_name}.py"
+            )
+        return files
+
+    def _fingerprint(self) -> dict[str, int]:
+        fingerprint = {}
+        for module_name, path in self._module_files().items():
+            try:
+                fingerprint[module_name] = os.stat(path).st_mtime_ns
+            except OSError:
+                fingerprint[module_name] = 0
+        return fingerprint
+
+    def _scan(self) -> list[ActionEntry]:
+        """Import every action module and describe the Action subclasses it defines."""
+        entries = []
+        for module_name in self._module_files():
+            if module_name == "__init__":
+                continue
+            mod = importlib.import_module(f"{self.package}.{module_name}")
+            for attr in dir(mod):
+                obj = getattr(mod, attr)
+                if isinstance(obj, type) and issubclass(obj, Action) and obj is not Action:
+                    entry = ActionEntry.from_class(obj)
+                    entries.append(entry)
+                    self._classes[entry.id] = obj
+        logger.debug(f"Scanned {len(entries)} actions in {self.package_dir}")
+        return entries
+
+    def _read_manifest(self, fingerprint: dict[str, int]) -> list[ActionEntry] | None:
+        try:
+            data = json.loads(self.manifest_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if (
+            data.get("format") != MANIFEST_FORMAT
+            or data.get("version") != __version__
+            or data.get("package") != self.package
+            or data.get("fingerprint") != fingerprint
+        ):
+            logger.debug(f"Action manifest {self.manifest_path} is stale")
+            return None
+        try:
+            return [ActionEntry.model_validate(entry) for entry in data["actions"]]
+        except (KeyError, ValidationError) as e:
+            logger.debug(f"Invalid action manifest {self.manifest_path}: {e}")
+            return None
+
+    def _write_manifest(self, fingerprint: dict[str, int], entries: list[ActionEntry]) -> None:
+        data = {
+            "format": MANIFEST_FORMAT,
+            "version": __version__,
+            "package": self.package,
+            "fingerprint": fingerprint,
+            "actions": [entry.model_dump(mode="json") for entry in entries],
+        }
+        try:
+            self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+            # Write then rename so that concurrent pyscaf processes never read a partial manifest
+            tmp_path = self.manifest_path.with_name(f"{self.manifest_path.name}.{os.getpid()}.tmp")
+            tmp_path.write_text(json.dumps(data, indent=2), encoding="utf-8")
+            os.replace(tmp_path, self.manifest_path)
+        except OSError as e:
+            logger.debug(f"Could not write action manifest {self.manifest_path}: {e}")
+
+    def entries(self) -> list[ActionEntry]:
+        """Return the description of every available action (discovered once)."""
+        if self._entries is None:
+            start = time.perf_counter()
+            fingerprint = self._fingerprint()
+            entries = self._read_manifest(fingerprint)
+            source = "manifest"
+            if entries is None:
+                entries = self._scan()
+                self._write_manifest(fingerprint, entries)
+                source = "scan"
+            self._entries = entries
+            self.discovery = Span.measured("discovery", "registry", start, source=source, actions=len(entries))
+        return self._entries
+
+    def get_entry(self, action_id: str) -> ActionEntry:
+        for entry in self.entries():
+            if entry.id == action_id:
+                return entry
+        raise KeyError(f"Unknown action '{action_id}'")
+
+    def load(self, action_id: str) -> type[Action]:
+        """Return the class of an action, importing its module on first use."""
+        if action_id not in self._classes:
+            self._classes[action_id] = self.get_entry(action_id).load()
+        return self._classes[action_id]
+
+    def action_classes(self) -> list[type[Action]]:
+        """Return every Action class, importing all action modules."""
+        return [self.load(entry.id) for entry in self.entries()]
+
+
+_registry: ActionRegistry | None = None
+
+
+def get_registry() -> ActionRegistry:
+    """Return the process-wide action registry."""
+    global _registry
+    if _registry is None:
+        _registry = ActionRegistry()
+    return _registry
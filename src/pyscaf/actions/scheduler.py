@@ -0,0 +1,95 @@
+"""
+Concurrent execution of the actions of one phase (skeleton, init or install).
+"""
+
+import logging
+from collections.abc import Callable
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+# Resource name conflicting with every other task of the phase
+EXCLUSIVE = "*"
+
+# Worker threads used when --jobs is not given (the phases mostly wait on subprocesses)
+DEFAULT_JOBS = 4
+
+
+class PhaseTask(BaseModel):
+    """One action's step in a phase."""
+
+    id: str  # action id
+    depends: set[str] = set()  # action ids this action depends on (transitively)
+    resources: set[str] = set()  # shared resources (files, directories...) used by the step
+    run: Callable[[], None]
+
+    def conflicts_with(self, other: "PhaseTask") -> bool:
+        """Whether the two steps must not run at the same time."""
+        if EXCLUSIVE in self.resources or EXCLUSIVE in other.resources:
+            return True
+        return not self.resources.isdisjoint(other.resources)
+
+
+class PhaseScheduler:
+    """
+    Run the tasks of a phase on a bounded thread pool.
+
+    The tasks are given in the preference order. A task starts once every earlier
+    task it depends on, or shares a resource with, is finished: dependencies and
+    writes to shared files keep the order of a serial run, independent tasks overlap.
+    The call returns when the whole phase is done (the phases are barriers).
+    """
+
+    def __init__(self, jobs: int = DEFAULT_JOBS):
+        self.jobs = max(1, jobs)
+
+    @staticmethod
+    def predecessors(tasks: list[PhaseTask]) -> list[set[int]]:
+        """predecessors[j]: indexes of the earlier tasks task j has to wait for."""
+        return [
+            {i for i in range(j) if tasks[i].id in task.depends or tasks[i].conflicts_with(task)}
+            for j, task in enumerate(tasks)
+        ]
+
+    def run(self, tasks: list[PhaseTask]) -> None:
+        """
+        Run the tasks, then re-raise the first error, if any.
+
+        After an error no new task is started; the running ones are waited for.
+        With a single job, the tasks run one after the other on the calling thread.
+        """
+        if self.jobs == 1:
+            for task in tasks:
+                task.run()
+            return
+
+        predecessors = self.predecessors(tasks)
+        pending = list(range(len(tasks)))
+        done: set[int] = set()
+        error: BaseException | None = None
+
+        with ThreadPoolExecutor(max_workers=self.jobs, thread_name_prefix="pyscaf-action") as executor:
+            running: dict[Future, int] = {}
+
+            def _submit_ready() -> None:
+                for index in list(pending):
+                    if predecessors[index] <= done:
+                        pending.remove(index)
+                        logger.debug(f"Starting {tasks[index].id}")
+                        running[executor.submit(tasks[index].run)] = index
+
+            _submit_ready()
+            while running:
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    index = running.pop(future)
+                    done.add(index)
+                    if future.exception() is not None and error is None:
+                        error = future.exception()
+                if error is None:
+                    _submit_ready()
+
+        if error is not None:
+            raise error
@@ -0,0 +1,181 @@
+"""
+Snapshots of generated projects: the per-project values of a context and the key of the tree it produces.
+"""
+
+import logging
+import os
+import re
+import shutil
+import sys
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any
+
+from pydantic import BaseModel
+
+from pyscaf import __version__
+from pyscaf.actions import Action
+from pyscaf.tools.snapshot_cache import snapshot_key
+
+logger = logging.getLogger(__name__)
+
+# Context keys that change how a project is generated, not what the skeleton and init phases produce
+RUNTIME_KEYS = {
+    "interactive",
+    "no_install",
+    "jobs",
+    "command_timeout",
+    "env_cache",
+    "snapshot_cache",
+    "link_assets",
+    "resume",
+}
+
+# Context keys whose values are substituted in a restored snapshot
+PER_PROJECT_KEYS = {"project_name", "author", "remote_url"}
+
+# Values written raw in TOML strings, git config and markdown: no quote, backslash or control character
+_PLAIN_VALUE = re.compile(r'[^"\\\x00-\x1f\x7f]+')
+
+# Same parsing of the author as CoreAction.init
+_AUTHOR = re.compile(r"(?P<name>[^<]+)\s*<(?P<email>[^>]+)>")
+
+# Commands whose installation changes what the init phase produces
+_TOOLS = ("uv", "git")
+
+# Configuration files read by git init
+_GIT_CONFIGS = ("~/.gitconfig", "~/.config/git/config")
+
+
+class ProjectValues(BaseModel):
+    """The values of a project that a snapshot holds as placeholders."""
+
+    project_name: str  # as given (README, notebooks/README.md)
+    curated_name: str  # package directory, src/<curated_name>
+    package_name: str  # normalized name, written by uv init in pyproject.toml
+    author_name: str | None = None
+    author_email: str | None = None
+    remote_url: str | None = None
+    project_path: str  # absolute path of the project
+
+    def shape(self) -> dict[str, bool]:
+        """Which optional values are set (the generated tree differs when they are not)."""
+        return {
+            "author_name": self.author_name is not None,
+            "author_email": self.author_email is not None,
+            "remote_url": self.remote_url is not None,
+        }
+
+    def placeholders(self) -> dict[str, str]:
+        """Value -> field name, for the values that are set (the placeholders, on placeholder values)."""
+        return {value: name for name, value in self.model_dump().items() if value is not None}
+
+
+def project_values(context: Mapping[str, Any], project_path: str | Path) -> ProjectValues | None:
+    """
+    The per-project values of a context.
+
+    Returns:
+        The values, None if a snapshot cannot stand for them (a project name with a
+        directory part, or values that would need escaping in the generated files)
+    """
+    name = context.get("project_name") or ""
+    if not name or Path(name).name != name:
+        return None
+    author = (context.get("author") or "").strip()
+    author_name = author_email = None
+    if author:
+        match = _AUTHOR.match(author)
+        author_name, author_email = (match["name"].strip(), match["email"].strip()) if match else (author, None)
+    values = ProjectValues(
+        project_name=name,
+        curated_name=name.replace("-", "_"),
+        package_name=re.sub(r"[-_.]+", "-", name).lower(),
+        author_name=author_name,
+        author_email=author_email,
+        remote_url=context.get("remote_url") or None,
+        project_path=str(Path(project_path).absolute()),
+    )
+    if not all(_PLAIN_VALUE.fullmatch(value) for value in values.model_dump().values() if value is not None):
+        return None
+    return values
+
+
+def placeholder_values(values: ProjectValues, project_path: Path) -> ProjectValues:
+    """Placeholder values with the same shape as a project's (all distinct, e.g. the three name forms)."""
+    return ProjectValues(
+        project_name="Pyscaf-Snapshot-Project",
+        curated_name="Pyscaf_Snapshot_Project",
+        package_name="pyscaf-snapshot-project",
+        author_name="Pyscaf Snapshot Author" if values.author_name is not None else None,
+        author_email="pyscaf-snapshot-author@example.invalid" if values.author_email is not None else None,
+        remote_url="https://example.invalid/pyscaf-snapshot-remote.git" if values.remote_url is not None else None,
+        project_path=str(project_path / "Pyscaf-Snapshot-Project"),
+    )
+
+
+def placeholder_context(context: Mapping[str, Any], placeholders: ProjectValues) -> dict[str, Any]:
+    """Context generating the placeholder project: the same options, with the placeholder values."""
+    author = placeholders.author_name or ""
+    if placeholders.author_email is not None:
+        author = f"{author} <{placeholders.author_email}>"
+    return {
+        **context,
+        "project_name": placeholders.project_name,
+        "author": author,
+        "remote_url": placeholders.remote_url,
+        "no_install": True,
+        "snapshot_cache": False,
+        "link_assets": False,  # A snapshot must not share its files with the pyscaf installation
+    }
+
+
+def action_files(action_cls: type[Action]) -> list[tuple[str, int, int]]:
+    """Stat of the files of an action (its module, templates, config.toml...)."""
+    module = Path(sys.modules[action_cls.__module__].__file__)
+    root = module.parent if module.name == "__init__.py" else module
+    paths = [root] if root.is_file() else [p for p in root.rglob("*") if p.is_file() and "__pycache__" not in p.parts]
+    files = []
+    for path in sorted(paths):
+        stat = path.stat()
+        files.append((path.relative_to(root.parent).as_posix(), stat.st_mtime_ns, stat.st_size))
+    return files
+
+
+def _tools(env: Mapping[str, str]) -> dict[str, Any]:
+    """The commands and configuration the init phase depends on (stats only: no command is run)."""
+    tools: dict[str, Any] = {}
+    for name in _TOOLS:
+        path = shutil.which(name, path=env.get("PATH"))
+        tools[name] = (path, os.stat(path).st_mtime_ns) if path else None
+    for config in _GIT_CONFIGS:
+        path = Path(config).expanduser()
+        tools[config] = path.stat().st_mtime_ns if path.exists() else None
+    return tools
+
+
+def project_snapshot_key(
+    context: Mapping[str, Any],
+    actions: list[tuple[str, type[Action]]],
+    values: ProjectValues,
+    env: Mapping[str, str],
+) -> str:
+    """
+    Key of the tree the skeleton and init phases produce for a context.
+
+    Args:
+        context: Project context
+        actions: Ids and classes of the active actions, in execution order
+        values: Per-project values of the context (only their shape is part of the key)
+        env: Environment of the commands
+    """
+    return snapshot_key(
+        {
+            "version": __version__,
+            "actions": [(action_id, action_files(action_cls)) for action_id, action_cls in actions],
+            "context": {k: v for k, v in context.items() if k not in RUNTIME_KEYS | PER_PROJECT_KEYS},
+            "shape": values.shape(),
+            "tools": _tools(env),
+            "env": {k: v for k, v in env.items() if k.startswith(("UV_", "GIT_")) or k == "PATH"},
+        }
+    )
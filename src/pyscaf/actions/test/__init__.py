@@ -2,15 +2,11 @@
 Test initialization actions using pytest.
 """
 
-import os
-import subprocess
 from pathlib import Path
 
-from rich.console import Console
-
 from pyscaf.actions import Action, CLIOption
-
-console = Console()
+from pyscaf.actions.install import InstallCommand, InstallNeeds
+from pyscaf.tools.templates import TemplateContent
 
 
 class TestAction(Action):
@@ -28,14 +24,20 @@ class TestAction(Action):
         ),
     ]
 
-    def __init__(self, project_path):
-        super().__init__(project_path)
+    def __init__(self, project_path, execution=None):
+        super().__init__(project_path, execution)
 
     def activate(self, context: dict) -> bool:
         """Activate this action only if testing is enabled."""
         return context.get("testing") is None or context.get("testing", True)
 
-    def skeleton(self, context: dict) -> dict[Path, str | None]:
+    def resources(self, phase: str, context: dict) -> set[str]:
+        if phase == "install":
+            # pytest writes its caches under tests/ (the environment is synced once, before)
+            return {"tests", ".pytest_cache"}
+        return super().resources(phase, context)
+
+    def skeleton(self, context: dict) -> dict[Path, str | TemplateContent | None]:
         """
         Define the filesystem skeleton for pytest initialization.
 
@@ -43,20 +45,15 @@ class TestAction(Action):
             Dictionary mapping paths to content
         """
         # Read pytest documentation
-        pytest_doc_path = Path(__file__).parent / "README.md"
-        pytest_doc = pytest_doc_path.read_text() if pytest_doc_path.exists() else ""
-
-        # Read test example template
-        test_example_path = Path(__file__).parent / "template_test_example.py"
-        test_example_template = test_example_path.read_text() if test_example_path.exists() else ""
+        pytest_doc = self.resource("README.md") or ""
 
         # Basic test example
         project_name = context.get("project_name", "myproject")
         curated_project_name = project_name.replace("-", "_")
 
-        # Format the test example with project variables
-        test_example = test_example_template.format(
-            project_name=project_name, curated_project_name=curated_project_name
+        # Test example rendered with the project variables
+        test_example = self.template(
+            "template_test_example.py.jinja", project_name=project_name, curated_project_name=curated_project_name
         )
 
         # Ajout conditionnel du .gitignore si git est activé
@@ -67,55 +64,18 @@ class TestAction(Action):
             Path("tests/README.md"): pytest_doc,
         }
         if context.get("versionning"):
-            gitignore_path = Path(__file__).parent / "template.gitignore"
-            gitignore_content = gitignore_path.read_text() if gitignore_path.exists() else ""
-            skeleton[Path(".gitignore")] = gitignore_content
+            skeleton[Path(".gitignore")] = self.resource("template.gitignore") or ""
         return skeleton
 
-    def install(self, context: dict) -> None:
-        """
-        Install test dependencies and run initial test.
-        """
-        console.print("[bold blue]Installing test dependencies...[/bold blue]")
-
-        try:
-            # Ensure we're in the right directory
-            os.chdir(self.project_path)
-
-            # Run a quick test to validate setup
-            console.print("[bold cyan]Running initial test validation...[/bold cyan]")
-            # Remove VIRTUAL_ENV from environment to avoid uv warnings when running inside another venv
-            env = os.environ.copy()
-            env.pop("VIRTUAL_ENV", None)
-
-            result = subprocess.call(
-                ["uv", "run", "pytest", "--version"],
-                env=env,
-                stdin=None,
-                stdout=None,
-                stderr=None,
-            )
-
-            if result == 0:
-                console.print("[bold green]Pytest setup validated successfully![/bold green]")
-
-                # Run the actual tests
-                console.print("[bold cyan]Running initial tests...[/bold cyan]")
-                test_result = subprocess.call(
-                    ["uv", "run", "pytest", "tests/", "-v"],
-                    env=env,
-                    stdin=None,
-                    stdout=None,
-                    stderr=None,
-                )
-
-                if test_result == 0:
-                    console.print("[bold green]All tests passed![/bold green]")
-                else:
-                    console.print(f"[bold yellow]Some tests failed (exit code {test_result})[/bold yellow]")
-            else:
-                console.print(f"[bold yellow]Pytest validation failed (exit code {result})[/bold yellow]")
-
-        except FileNotFoundError:
-            console.print("[bold yellow]uv not found. Please install it first.[/bold yellow]")
-            console.print("https://docs.astral.sh/uv/getting-started/installation")
+    def install_needs(self, context: dict) -> InstallNeeds:
+        """Validate the pytest setup, then run the initial tests (with the venv interpreter)."""
+        return InstallNeeds(
+            commands=[
+                InstallCommand(
+                    args=["-m", "pytest", "--version"], description="Validating pytest setup", validation=True
+                ),
+                InstallCommand(
+                    args=["-m", "pytest", "tests/", "-v"], description="Running initial tests", optional=True
+                ),
+            ]
+        )
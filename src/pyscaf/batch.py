@@ -0,0 +1,338 @@
+"""
+Batch generation: many projects from one manifest, in one pyscaf invocation.
+
+The manifest is a YAML, TOML or CSV file. Each project supplies its project_name
+plus option overrides (context keys, e.g. ``license`` or ``remote_url``):
+
+- YAML / TOML: either a list of projects, or a ``projects`` list with optional
+  ``defaults`` applied to every project::
+
+      [defaults]
+      license = "mit"
+
+      [[projects]]
+      project_name = "student-001"
+      author = "Ada <ada@example.org>"
+
+- CSV: a header row with ``project_name`` and one column per option; empty cells
+  keep the default, multiple choices are separated by ``;``.
+
+Action discovery, the execution order and the default context are computed once
+in the main process; the projects are then generated on a process pool.
+"""
+
+import csv
+import json
+import logging
+import os
+import time
+import tomllib
+from collections.abc import Iterable, Mapping
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any
+
+from pydantic import BaseModel
+
+from pyscaf.actions import CLIOption
+from pyscaf.actions.cli_option_to_key import cli_option_to_key
+from pyscaf.actions.journal import StepsFailedError, describe_steps
+from pyscaf.actions.manager import ActionManager
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_SUFFIXES = (".yaml", ".yml", ".toml", ".csv")
+
+TRUE_VALUES = {"1", "true", "yes", "y", "on"}
+FALSE_VALUES = {"0", "false", "no", "n", "off"}
+
+
+class BatchError(ValueError):
+    """Invalid batch manifest."""
+
+
+class BatchProject(BaseModel):
+    """One row of the manifest."""
+
+    project_name: str
+    options: dict[str, Any] = {}  # context key -> value
+
+
+class BatchResult(BaseModel):
+    """Outcome of the generation of one project."""
+
+    project_name: str
+    path: str
+    success: bool
+    duration: float  # seconds
+    log_path: str
+    error: str | None = None
+
+
+class BatchReport(BaseModel):
+    """Outcome of a whole batch."""
+
+    results: list[BatchResult]
+    duration: float  # wall-clock seconds
+    workers: int
+
+    @property
+    def failed(self) -> list[BatchResult]:
+        return [result for result in self.results if not result.success]
+
+
+def _read_rows(path: Path) -> list[dict[str, Any]]:
+    """Read the raw project rows of a manifest (defaults already applied)."""
+    suffix = path.suffix.lower()
+    if suffix == ".csv":
+        with path.open(newline="", encoding="utf-8") as f:
+            # Empty cells keep the default value
+            return [{key: value for key, value in row.items() if value not in ("", None)} for row in csv.DictReader(f)]
+
+    if suffix == ".toml":
+        data = tomllib.loads(path.read_text(encoding="utf-8"))
+    elif suffix in (".yaml", ".yml"):
+        try:
+            import yaml
+        except ImportError as e:
+            raise BatchError("Reading a YAML manifest requires PyYAML (pip install pyyaml)") from e
+        data = yaml.safe_load(path.read_text(encoding="utf-8"))
+    else:
+        raise BatchError(
+            f"Unsupported manifest format '{path.suffix}' (expected one of {', '.join(MANIFEST_SUFFIXES)})"
+        )
+
+    defaults: dict[str, Any] = {}
+    if isinstance(data, dict):
+        defaults = data.get("defaults") or {}
+        data = data.get("projects")
+    if not isinstance(data, list) or not all(isinstance(row, dict) for row in data):
+        raise BatchError(f"{path}: expected a list of projects (or a 'projects' list)")
+    return [{**defaults, **row} for row in data]
+
+
+def _coerce(opt: CLIOption, value: Any) -> Any:
+    """Convert a manifest value to what the CLI would have stored in the context for this option."""
+    key = cli_option_to_key(opt)
+    if opt.type == "bool":
+        if isinstance(value, bool):
+            return value
+        text = str(value).strip().lower()
+        if text in TRUE_VALUES | FALSE_VALUES:
+            return text in TRUE_VALUES
+        raise BatchError(f"Invalid boolean for '{key}': {value!r}")
+    if opt.type == "int":
+        try:
+            return int(value)
+        except (TypeError, ValueError) as e:
+            raise BatchError(f"Invalid integer for '{key}': {value!r}") from e
+    if opt.type == "choice" and opt.choices:
+        values = value if isinstance(value, list) else str(value).split(";") if opt.multiple else [value]
+        keys = {choice_key.lower(): choice_key for choice_key in opt.get_choice_keys()}
+        for item in values:
+            if str(item).strip().lower() not in keys:
+                raise BatchError(f"Invalid choice for '{key}': {item!r} (expected one of {', '.join(keys.values())})")
+        chosen = [keys[str(item).strip().lower()] for item in values]
+        return chosen if opt.multiple else chosen[0]
+    return str(value)
+
+
+def check_project_name(name: str) -> None:
+    """
+    Check that a project name is a plain directory name, so that the project stays in its output directory.
+
+    Raises:
+        BatchError: If the name is empty, contains a path separator or "..", or is not a directory name
+    """
+    separators = {"/", "\0", os.sep, os.altsep} - {None}
+    # Path().name also rejects ".", and the absolute and drive-relative names
+    if not name or ".." in name or any(separator in name for separator in separators) or Path(name).name != name:
+        raise BatchError(f"invalid project_name {name!r}: expected a plain directory name")
+
+
+def project_options(name: str, row: Mapping[str, Any], options: Mapping[str, CLIOption]) -> dict[str, Any]:
+    """
+    Validate the option overrides of a project and convert them to context values.
+
+    Args:
+        name: Name of the project (for the error messages)
+        row: Option overrides, keyed by context key or option name (e.g. "remote-url", "--remote-url")
+        options: Options of all the actions, by context key
+
+    Raises:
+        BatchError: If an option is unknown or a value invalid
+    """
+    row = {str(key).lstrip("-").replace("-", "_"): value for key, value in row.items()}
+    unknown = sorted(set(row) - set(options))
+    if unknown:
+        raise BatchError(f"unknown option(s) for '{name}': {', '.join(unknown)}")
+    return {key: _coerce(options[key], value) for key, value in row.items()}
+
+
+def load_manifest(path: str | Path, cli_options: Iterable[CLIOption]) -> list[BatchProject]:
+    """
+    Read a batch manifest and validate its values against the action options.
+
+    Args:
+        path: YAML, TOML or CSV manifest
+        cli_options: Options of all the actions (option names are matched by context key)
+
+    Raises:
+        BatchError: If the manifest is malformed, names an unknown option, repeats a project
+            or gives a project_name that is not a plain directory name
+    """
+    path = Path(path)
+    options = {cli_option_to_key(opt): opt for opt in cli_options}
+    projects = []
+    seen: set[str] = set()
+    for line, row in enumerate(_read_rows(path), start=1):
+        row = {str(key).lstrip("-").replace("-", "_"): value for key, value in row.items()}
+        name = str(row.pop("project_name", "") or "").strip()
+        if not name:
+            raise BatchError(f"{path}: project #{line} has no project_name")
+        if name in seen:
+            raise BatchError(f"{path}: duplicate project '{name}'")
+        seen.add(name)
+        try:
+            check_project_name(name)
+            projects.append(BatchProject(project_name=name, options=project_options(name, row, options)))
+        except BatchError as e:
+            raise BatchError(f"{path}: {e}") from e
+    return projects
+
+
+# Set in every worker process by _init_worker
+_worker_order: list[str] = []
+
+
+def _init_worker(order: list[str]) -> None:
+    """Share the execution order computed by the main process with a worker."""
+    global _worker_order
+    _worker_order = order
+
+
+def generate_project(
+    project: BatchProject,
+    base_context: dict[str, Any],
+    output_dir: Path,
+    log_dir: Path,
+    env: dict[str, str] | None = None,
+    order: list[str] | None = None,
+) -> BatchResult:
+    """
+    Generate one project; its output (and the output of its commands) goes to a log file.
+
+    Errors, and the steps the journal records as failed (e.g. a command exiting non-zero),
+    are reported in the result instead of being raised, so one failing project does not
+    stop the batch.
+    """
+    from rich.console import Console
+
+    project_path = output_dir / project.project_name
+    log_path = log_dir / f"{project.project_name}.log"
+    context = {**base_context, **project.options, "project_name": project.project_name}
+    start = time.perf_counter()
+    error = None
+    manager = None
+    try:
+        with log_path.open("w", encoding="utf-8") as log:
+            output = Console(file=log, width=120, force_terminal=False)
+            try:
+                manager = ActionManager(
+                    project_path, context, env=env, output=output, order=order or _worker_order or None, log=log
+                )
+                manager.context = manager.run_postfill_hooks(manager.context)
+                manager.create_project()
+            except StepsFailedError:
+                pass  # Reported from the journal below
+            except Exception as e:
+                logger.debug(f"Generation of {project.project_name} failed", exc_info=True)
+                output.print_exception()
+                error = f"{type(e).__name__}: {e}"
+    except OSError as e:
+        # The log could not be written
+        logger.debug(f"Log of {project.project_name} failed", exc_info=True)
+        error = f"{type(e).__name__}: {e}"
+    failed = manager.journal.state.failed if manager is not None else []
+    if failed:
+        steps = f"failed steps: {describe_steps(failed)}"
+        error = steps if error is None else f"{error} ({steps})"
+    return BatchResult(
+        project_name=project.project_name,
+        path=str(project_path),
+        success=error is None,
+        duration=time.perf_counter() - start,
+        log_path=str(log_path),
+        error=error,
+    )
+
+
+def run_batch(
+    projects: list[BatchProject],
+    base_context: dict[str, Any],
+    order: list[str],
+    output_dir: str | Path,
+    workers: int | None = None,
+    uv_cache_dir: str | Path | None = None,
+    log_dir: str | Path | None = None,
+    on_result=None,
+) -> BatchReport:
+    """
+    Generate the projects on a process pool.
+
+    Args:
+        projects: Projects of the manifest
+        base_context: Context shared by all the projects (defaults already filled)
+        order: Execution order of the actions, computed once
+        output_dir: Directory the projects are created in
+        workers: Number of worker processes (defaults to the CPU count)
+        uv_cache_dir: uv cache directory shared by all the projects (UV_CACHE_DIR)
+        log_dir: Directory of the per-project logs (defaults to <output_dir>/.pyscaf-batch)
+        on_result: Optional callback called with each BatchResult as soon as it is available
+    """
+    output_dir = Path(output_dir).resolve()
+    log_dir = Path(log_dir).resolve() if log_dir is not None else output_dir / ".pyscaf-batch"
+    log_dir.mkdir(parents=True, exist_ok=True)
+    env = None
+    if uv_cache_dir is not None:
+        env = {**os.environ, "UV_CACHE_DIR": str(Path(uv_cache_dir).resolve())}
+    workers = max(1, min(workers or os.cpu_count() or 1, len(projects) or 1))
+
+    start = time.perf_counter()
+    results: dict[str, BatchResult] = {}
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(order,)) as executor:
+        futures = {
+            executor.submit(generate_project, project, base_context, output_dir, log_dir, env): project
+            for project in projects
+        }
+        for future in as_completed(futures):
+            project = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                # The project could not be sent to a worker, or its worker died: the other projects go on
+                logger.debug(f"Generation of {project.project_name} failed", exc_info=True)
+                result = BatchResult(
+                    project_name=project.project_name,
+                    path=str(output_dir / project.project_name),
+                    success=False,
+                    duration=time.perf_counter() - start,
+                    log_path=str(log_dir / f"{project.project_name}.log"),
+                    error=f"{type(e).__name__}: {e}",
+                )
+            results[result.project_name] = result
+            if on_result is not None:
+                on_result(result)
+
+    return BatchReport(
+        results=[results[project.project_name] for project in projects],
+        duration=time.perf_counter() - start,
+        workers=workers,
+    )
+
+
+def write_report(report: BatchReport, path: str | Path) -> None:
+    """Write the report as JSON."""
+    data = report.model_dump(mode="json")
+    data["failed"] = len(report.failed)
+    Path(path).write_text(json.dumps(data, indent=2) + "\n", encoding="utf-8")
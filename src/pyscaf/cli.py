@@ -3,17 +3,17 @@ Command-line interface for pyscaf.
 """
 
 import sys
-from typing import Any, Type
+from pathlib import Path
+from typing import Any
 
 import click
 from rich.console import Console
 
 from pyscaf import __version__
-from pyscaf.actions import Action, discover_actions
-from pyscaf.actions.cli_option_to_key import cli_option_to_key
-from pyscaf.actions.manager import ActionManager
-from pyscaf.preference_chain import best_execution_order
-from pyscaf.preference_chain.model import Node
+
+# Action modules, the preference chain and their dependencies (pydantic, questionary,
+# tomlkit...) are imported inside the functions that need them: this keeps
+# `pyscaf --version` and `pyscaf --help` fast.
 
 console = Console()
 
@@ -27,27 +27,29 @@ def print_version(ctx, param, value):
 
 
 def collect_cli_options():
-    action_classes = discover_actions()
+    from pyscaf.actions.registry import get_registry
+    from pyscaf.preference_chain import best_execution_order
+    from pyscaf.preference_chain.model import Node
+
+    entries = get_registry().entries()
     deps = []
-    action_class_by_id: dict[str, Type[Action]] = {}
-    for action_cls in action_classes:
-        action_id = action_cls.__name__.replace("Action", "").lower()
-        depends = getattr(action_cls, "depends", set())
-        after = getattr(action_cls, "run_preferably_after", None)
+    entry_by_id = {}
+    for entry in entries:
+        depends = entry.depends
+        after = entry.run_preferably_after
 
         # If there are dependencies but no 'after' is specified, use the first dependency
         if depends and after is None:
             after = next(iter(depends))
 
         # Create Node object
-        node = Node(id=action_id, depends=depends, after=after)
+        node = Node(id=entry.id, depends=depends, after=after)
         deps.append(node)
-        action_class_by_id[action_id] = action_cls
+        entry_by_id[entry.id] = entry
     order = best_execution_order(deps)
     cli_options = []
     for action_id in order:
-        action_cls = action_class_by_id[action_id]
-        cli_options.extend(getattr(action_cls, "cli_options", []))
+        cli_options.extend(entry_by_id[action_id].cli_options)
     return cli_options
 
 
@@ -78,7 +80,7 @@ def fill_default_context(context: dict) -> dict:
     """
     Fill the context with default values from all actions.
 
-    This function discovers all actions and fills the context with their default values
+    This function uses the registry of all actions and fills the context with their default values
     for options that are not already set in the context.
 
     Args:
@@ -87,24 +89,30 @@ def fill_default_context(context: dict) -> dict:
     Returns:
         Updated context with default values filled in
     """
-    action_classes = discover_actions()
+    from pyscaf.actions.cli_option_to_key import cli_option_to_key
+    from pyscaf.actions.registry import get_registry
 
-    for action_cls in action_classes:
-        if hasattr(action_cls, "cli_options"):
-            for opt in action_cls.cli_options:
-                # Convert option name to context key
-                name = cli_option_to_key(opt)
+    registry = get_registry()
 
-                # Only set default if not already present in context
-                if name not in context or context[name] is None:
-                    context[name] = set_option_default(opt)
+    for entry in registry.entries():
+        for opt in entry.cli_options:
+            # Convert option name to context key
+            name = cli_option_to_key(opt)
+
+            # Only set default if not already present in context
+            if name not in context or context[name] is None:
+                if opt.name in entry.dynamic_options:
+                    # Callable defaults are not stored in the manifest: use the action class
+                    opt = next(o for o in registry.load(entry.id).cli_options if o.name == opt.name)
+                context[name] = set_option_default(opt)
 
     return context
 
 
-def add_dynamic_options(command):
-    cli_options = collect_cli_options()
-    for opt in reversed(cli_options):
+def build_dynamic_params() -> list[click.Option]:
+    """Build one Click option per action CLI option, in action execution order."""
+    params = []
+    for opt in collect_cli_options():
         param_decls = [opt.name]
         click_opts = {}
         # Type
@@ -132,7 +140,77 @@ def add_dynamic_options(command):
         # Required
         if opt.required:
             click_opts["required"] = True
-        command = click.option(*param_decls, **click_opts)(command)
+        params.append(click.Option(param_decls, **click_opts))
+    return params
+
+
+def print_timings(tracer) -> None:
+    """Print the time spent in every step recorded by a tracer, aggregated per step."""
+    from rich.table import Table
+
+    table = Table(title="pyscaf timings")
+    table.add_column("Category")
+    table.add_column("Step")
+    table.add_column("Count", justify="right")
+    table.add_column("Total (s)", justify="right")
+    table.add_column("Max (s)", justify="right")
+    for summary in tracer.summary():
+        table.add_row(summary.category, summary.name, str(summary.count), f"{summary.total:.3f}", f"{summary.max:.3f}")
+    console.print(table)
+
+
+class DynamicOptionsCommand(click.Command):
+    """
+    Click command whose action options are materialized on first use.
+
+    The options contributed by the actions are only built when Click needs the
+    parameters of this command (parsing its arguments, rendering its help or
+    completing it), so `pyscaf --version` and `pyscaf --help` never load them.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._dynamic_params_loaded = False
+
+    def get_params(self, ctx: click.Context) -> list[click.Parameter]:
+        if not self._dynamic_params_loaded:
+            self._dynamic_params_loaded = True
+            # Action options come first, as they did when they were added by decorators
+            self.params[:0] = build_dynamic_params()
+        return super().get_params(ctx)
+
+
+# Options of the generation runtime, shared by init, batch and serve (in their help order)
+RUNTIME_OPTIONS = [
+    click.option(
+        "--command-timeout",
+        type=click.FloatRange(min=0, min_open=True),
+        default=None,
+        help="Kill the external commands (uv, git...) still running after this many seconds.",
+    ),
+    click.option(
+        "--env-cache",
+        is_flag=True,
+        help="Reuse the uv.lock and .venv of an earlier project with the same dependencies (pyscaf cache).",
+    ),
+    click.option(
+        "--snapshot-cache",
+        is_flag=True,
+        help="Restore the generated files of an earlier project with the same options (pyscaf cache).",
+    ),
+    click.option(
+        "--link-assets",
+        is_flag=True,
+        help="Hardlink the asset files of the actions (scripts, datasets...) instead of copying them. "
+        "They are then the files of the pyscaf installation: replace them, never edit them in place.",
+    ),
+]
+
+
+def runtime_options(command):
+    """Add the runtime options (timeouts, caches, asset links) to a command."""
+    for option in reversed(RUNTIME_OPTIONS):
+        command = option(command)
     return command
 
 
@@ -149,8 +227,7 @@ def cli():
     pass
 
 
-@cli.command()
-@add_dynamic_options
+@cli.command(cls=DynamicOptionsCommand)
 @click.argument("project_name")
 @click.option(
     "--interactive",
@@ -158,24 +235,304 @@ def cli():
     help="Enable interactive mode (asks questions to the user).",
 )
 @click.option("--no-install", is_flag=True, help="Skip installation step.")
-def init(project_name, interactive, no_install, **kwargs):
+@click.option(
+    "--jobs",
+    "-j",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Maximum number of actions run concurrently within a phase (default: 4, 1 for a serial run).",
+)
+@click.option(
+    "--trace",
+    type=click.Path(dir_okay=False, path_type=Path),
+    default=None,
+    help="Write the timing of every step to this file, in Chrome trace-event format.",
+)
+@click.option("--timings", is_flag=True, help="Print the time spent in every step.")
+@runtime_options
+@click.option(
+    "--resume",
+    is_flag=True,
+    help="Resume an interrupted creation: skip the steps its .pyscaf/state.json records as done.",
+)
+def init(
+    project_name,
+    interactive,
+    no_install,
+    jobs,
+    trace,
+    timings,
+    command_timeout,
+    env_cache,
+    snapshot_cache,
+    link_assets,
+    resume,
+    **kwargs,
+):
     """
     Initialize a new customized project structure.
     """
+    from pyscaf.actions.journal import JOURNAL_PATH, ProjectJournal, StepsFailedError
+    from pyscaf.actions.manager import ActionManager
+    from pyscaf.actions.registry import get_registry
+    from pyscaf.tools.tracing import Tracer, span, tracing
+
     context = dict(kwargs)
+    if resume:
+        state = ProjectJournal.read(Path.cwd() / project_name)
+        if state is None:
+            raise click.UsageError(f"No journal to resume from: {Path(project_name) / JOURNAL_PATH} not found.")
+        # The options of the interrupted creation, unless given again on the command line
+        ctx = click.get_current_context()
+        context = {
+            **state.context,
+            **{
+                name: value
+                for name, value in kwargs.items()
+                if ctx.get_parameter_source(name) == click.core.ParameterSource.COMMANDLINE
+            },
+        }
     context["project_name"] = project_name
     context["interactive"] = interactive
     context["no_install"] = no_install
+    context["jobs"] = jobs
+    context["command_timeout"] = command_timeout
+    context["env_cache"] = env_cache
+    context["snapshot_cache"] = snapshot_cache
+    context["link_assets"] = link_assets
+    context["resume"] = resume
+
+    tracer = Tracer() if trace is not None or timings else None
+    if tracer is not None and get_registry().discovery is not None:
+        # The actions were discovered while the options of this command were built
+        tracer.add(get_registry().discovery)
+
+    try:
+        with tracing(tracer), span("pyscaf init", "cli", project=project_name):
+            if not interactive:
+                with span("default context", "cli"):
+                    context = fill_default_context(context)
+
+            manager = ActionManager(project_name, context)
+            context = manager.run_postfill_hooks(context)
+
+            if interactive:
+                with span("interactive questions", "cli"):
+                    context = manager.ask_interactive_questions(context)
+            manager.create_project()
+    except StepsFailedError:
+        # The failed steps and how to resume were printed: no traceback, but a failure exit status
+        sys.exit(1)
+    finally:
+        # Also when the generation failed: the spans show how far it went
+        if trace is not None:
+            tracer.write_chrome_trace(trace)
+            console.print(f"[bold green]Trace written to [/bold green]{trace}")
+        if timings:
+            print_timings(tracer)
+
+
+@cli.command()
+@click.argument("manifest", type=click.Path(exists=True, dir_okay=False, path_type=Path))
+@click.option(
+    "--workers",
+    "-w",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Number of projects generated in parallel (default: number of CPUs).",
+)
+@click.option(
+    "--output-dir",
+    "-o",
+    type=click.Path(file_okay=False, path_type=Path),
+    default=Path("."),
+    show_default=True,
+    help="Directory the projects are created in.",
+)
+@click.option("--no-install", is_flag=True, help="Skip installation step.")
+@click.option(
+    "--uv-cache-dir",
+    type=click.Path(file_okay=False, path_type=Path),
+    default=None,
+    help="uv cache directory shared by all the projects (UV_CACHE_DIR).",
+)
+@click.option(
+    "--log-dir",
+    type=click.Path(file_okay=False, path_type=Path),
+    default=None,
+    help="Directory of the per-project logs (default: <output-dir>/.pyscaf-batch).",
+)
+@click.option(
+    "--report",
+    type=click.Path(dir_okay=False, path_type=Path),
+    default=None,
+    help="Write the per-project success/timing report to this JSON file.",
+)
+@runtime_options
+def batch(
+    manifest,
+    workers,
+    output_dir,
+    no_install,
+    uv_cache_dir,
+    log_dir,
+    report,
+    command_timeout,
+    env_cache,
+    snapshot_cache,
+    link_assets,
+):
+    """
+    Generate every project of a YAML, TOML or CSV manifest.
+
+    Each row gives a project_name and option overrides (e.g. license, author).
+    """
+    from rich.table import Table
+
+    from pyscaf.actions.manager import determine_action_order
+    from pyscaf.actions.registry import get_registry
+    from pyscaf.batch import BatchError, load_manifest, run_batch, write_report
+
+    # Discovery, execution order and defaults are computed once for the whole batch
+    cli_options = [opt for entry in get_registry().entries() for opt in entry.cli_options]
+    try:
+        projects = load_manifest(manifest, cli_options)
+    except BatchError as e:
+        raise click.UsageError(str(e)) from e
+    order = determine_action_order()
+    base_context = fill_default_context(
+        {
+            "interactive": False,
+            "no_install": no_install,
+            "jobs": 1,
+            "command_timeout": command_timeout,
+            "env_cache": env_cache,
+            "snapshot_cache": snapshot_cache,
+            "link_assets": link_assets,
+        }
+    )
+
+    console.print(f"[bold green]Generating {len(projects)} projects in [/bold green]{output_dir.resolve()}")
+
+    def _print_result(result):
+        if result.success:
+            console.print(f"[green]✓[/green] {result.project_name} ({result.duration:.1f}s)")
+        else:
+            console.print(f"[red]✗[/red] {result.project_name}: {result.error} (log: {result.log_path})")
+
+    batch_report = run_batch(
+        projects,
+        base_context,
+        order,
+        output_dir,
+        workers=workers,
+        uv_cache_dir=uv_cache_dir,
+        log_dir=log_dir,
+        on_result=_print_result,
+    )
+
+    table = Table(title=f"pyscaf batch ({batch_report.workers} workers, {batch_report.duration:.1f}s)")
+    table.add_column("Project")
+    table.add_column("Status")
+    table.add_column("Time (s)", justify="right")
+    for result in batch_report.results:
+        status = "[green]ok[/green]" if result.success else "[red]failed[/red]"
+        table.add_row(result.project_name, status, f"{result.duration:.1f}")
+    console.print(table)
+
+    if report is not None:
+        write_report(batch_report, report)
+        console.print(f"[bold green]Report written to [/bold green]{report}")
+    if batch_report.failed:
+        console.print(f"[bold red]{len(batch_report.failed)} of {len(projects)} projects failed[/bold red]")
+        sys.exit(1)
 
-    if not interactive:
-        context = fill_default_context(context)
 
-    manager = ActionManager(project_name, context)
-    context = manager.run_postfill_hooks(context)
+@cli.command()
+@click.option(
+    "--socket",
+    "socket_path",
+    type=click.Path(dir_okay=False, path_type=Path),
+    required=True,
+    help="Unix socket to listen on (e.g. /run/pyscaf.sock); only the user running the server can connect.",
+)
+@click.option(
+    "--workers",
+    "-w",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Number of projects generated in parallel (default: number of CPUs).",
+)
+@click.option(
+    "--output-dir",
+    "-o",
+    type=click.Path(file_okay=False, path_type=Path),
+    default=Path("."),
+    show_default=True,
+    help="Directory the projects are created in (a request may give another one).",
+)
+@click.option("--no-install", is_flag=True, help="Skip installation step.")
+@click.option(
+    "--uv-cache-dir",
+    type=click.Path(file_okay=False, path_type=Path),
+    default=None,
+    help="uv cache directory shared by all the projects (UV_CACHE_DIR).",
+)
+@runtime_options
+def serve(
+    socket_path,
+    workers,
+    output_dir,
+    no_install,
+    uv_cache_dir,
+    command_timeout,
+    env_cache,
+    snapshot_cache,
+    link_assets,
+):
+    """
+    Serve project generation requests (JSON lines) on a unix socket.
 
-    if interactive:
-        context = manager.ask_interactive_questions(context)
-    manager.create_project()
+    Discovery, execution order, options and templates are loaded once; see src/pyscaf/serve.py for the protocol.
+    """
+    import os
+    import signal
+
+    from pyscaf.actions.manager import determine_action_order
+    from pyscaf.serve import ProjectServer, SocketServer
+
+    env = None
+    if uv_cache_dir is not None:
+        env = {**os.environ, "UV_CACHE_DIR": str(uv_cache_dir.resolve())}
+    base_context = fill_default_context(
+        {
+            "interactive": False,
+            "no_install": no_install,
+            "jobs": 1,
+            "command_timeout": command_timeout,
+            "env_cache": env_cache,
+            "snapshot_cache": snapshot_cache,
+            "link_assets": link_assets,
+        }
+    )
+    projects = ProjectServer(base_context, determine_action_order(), output_dir, workers=workers, env=env)
+    projects.warm_up()
+    try:
+        server = SocketServer(socket_path, projects)
+    except FileExistsError as e:
+        projects.close()
+        raise click.UsageError(str(e)) from e
+
+    # Stop on SIGTERM as on Ctrl+C: the running generations finish, the socket is removed
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    console.print(f"[bold green]pyscaf serving on [/bold green]{socket_path} (output: {projects.output_dir})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        console.print("[bold yellow]Stopping: waiting for the running generations...[/bold yellow]")
+    finally:
+        server.server_close()
+        projects.close()
 
 
 def main():
@@ -1,13 +1,14 @@
 import logging
-from typing import List
+from collections.abc import Iterator
+from itertools import islice
 
 from pyscaf.preference_chain.chain import (
     build_chains,
-    compute_all_resolution_pathes,
-    compute_path_score,
+    compute_best_resolution_path,
     extend_nodes,
+    iter_resolution_paths_by_score,
 )
-from pyscaf.preference_chain.model import Node
+from pyscaf.preference_chain.model import ExtendedNode, Node
 
 from .circular_dependency_error import CircularDependencyError
 from .dependency_loader import load_and_complete_dependencies
@@ -17,21 +18,16 @@ from .tree_walker import DependencyTreeWalker
 logger = logging.getLogger(__name__)
 
 
-def best_execution_order(nodes: List[Node]) -> List[str]:
+def _prepare_nodes(nodes: list[Node]) -> list[ExtendedNode]:
     """
-    Determine the best execution order using the preference chain logic.
-
-    Args:
-        nodes: List of Node objects with 'id', 'depends', and 'after' attributes
-
-    Returns:
-        List of node IDs in optimal execution order
+    Complete the 'after' of each node and convert them for the chain builder.
 
     Raises:
-        CircularDependencyError: If no valid resolution path can be found
+        ValueError: If a node's 'after' is not one of its dependencies
     """
     # Ensure all nodes have proper 'after' field set if they have dependencies
-    node_objects: List[Node] = []
+    # (the algorithm works on unvalidated ExtendedNode objects, the input is already validated)
+    node_objects: list[ExtendedNode] = []
     for node in nodes:
         # If node has dependencies but no 'after' is specified, use the first dependency
         if node.depends and node.after is None:
@@ -41,14 +37,80 @@ def best_execution_order(nodes: List[Node]) -> List[str]:
 
         # Validate that 'after' is in the dependencies if specified
         if after is not None and after not in node.depends:
-            raise ValueError(
-                f"Node '{node.id}' has 'after'='{after}' but it's not in depends={node.depends}"
-            )
+            raise ValueError(f"Node '{node.id}' has 'after'='{after}' but it's not in depends={node.depends}")
 
-        node_obj = Node(id=node.id, depends=node.depends, after=after)
+        node_obj = ExtendedNode(id=node.id, depends=set(node.depends), after=after)
         node_objects.append(node_obj)
 
     logger.debug(f"Processed {len(node_objects)} nodes")
+    return node_objects
+
+
+def _no_path_error(node_objects: list[ExtendedNode]) -> CircularDependencyError:
+    # No valid resolution path found - this indicates a serious dependency issue
+    node_ids = [node.id for node in node_objects]
+    error_msg = (
+        f"No valid resolution path found for nodes: {node_ids}. "
+        "This indicates circular dependencies or unsatisfiable constraints."
+    )
+    logger.error(error_msg)
+    return CircularDependencyError(error_msg)
+
+
+def iter_scored_execution_orders(nodes: list[Node]) -> Iterator[tuple[int, list[str]]]:
+    """
+    Yield (score, execution order) for every valid order, best first.
+
+    Same order and scores as iter_execution_orders(); see iter_resolution_paths_by_score.
+    """
+    node_objects = _prepare_nodes(nodes)
+    clusters = build_chains(extend_nodes(node_objects))
+    logger.debug(f"Built {len(clusters)} chains")
+
+    found = False
+    for score, path in iter_resolution_paths_by_score(clusters):
+        found = True
+        yield score, [node_id for chain in path for node_id in chain.ids]
+    if not found:
+        raise _no_path_error(node_objects)
+
+
+def iter_execution_orders(nodes: list[Node], k: int | None = None) -> Iterator[list[str]]:
+    """
+    Yield the valid execution orders in non-increasing score order.
+
+    Orders are computed lazily, best first: stopping early (or passing k) only costs
+    the search needed for the orders actually consumed. The first order is the one
+    best_execution_order returns.
+
+    Args:
+        nodes: List of Node objects with 'id', 'depends', and 'after' attributes
+        k: Maximum number of orders to yield (all of them when None)
+
+    Yields:
+        Lists of node IDs, one per execution order
+
+    Raises:
+        CircularDependencyError: If no valid resolution path can be found
+    """
+    for _, order in islice(iter_scored_execution_orders(nodes), k):
+        yield order
+
+
+def best_execution_order(nodes: list[Node]) -> list[str]:
+    """
+    Determine the best execution order using the preference chain logic.
+
+    Args:
+        nodes: List of Node objects with 'id', 'depends', and 'after' attributes
+
+    Returns:
+        List of node IDs in optimal execution order
+
+    Raises:
+        CircularDependencyError: If no valid resolution path can be found
+    """
+    node_objects = _prepare_nodes(nodes)
 
     # Use the new preference chain logic
     extended_dependencies = extend_nodes(node_objects)
@@ -56,26 +118,14 @@ def best_execution_order(nodes: List[Node]) -> List[str]:
 
     logger.debug(f"Built {len(clusters)} chains")
 
-    # Compute all possible resolution paths
-    all_resolution_paths = list(compute_all_resolution_pathes(clusters))
-
-    if not all_resolution_paths:
-        # No valid resolution path found - this indicates a serious dependency issue
-        node_ids = [node.id for node in node_objects]
-        error_msg = (
-            f"No valid resolution path found for nodes: {node_ids}. "
-            "This indicates circular dependencies or unsatisfiable constraints."
-        )
-        logger.error(error_msg)
-        raise CircularDependencyError(error_msg)
-
-    logger.debug(f"Found {len(all_resolution_paths)} resolution paths")
+    # Find the best resolution path (highest score, first in permutation order)
+    # without going through the frontier of iter_execution_orders
+    best_path = compute_best_resolution_path(clusters)
 
-    # Sort paths by score (best score first)
-    all_resolution_paths.sort(key=lambda path: -compute_path_score(list(path)))
+    if best_path is None:
+        raise _no_path_error(node_objects)
 
     # Extract the final execution order from the best path
-    best_path = all_resolution_paths[0]
     final_order = [node_id for chain in best_path for node_id in chain.ids]
 
     logger.debug(f"Best execution order: {final_order}")
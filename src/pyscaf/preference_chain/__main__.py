@@ -1,17 +1,31 @@
+import argparse
 import logging
 import os
-import sys
 
-from pyscaf.preference_chain import best_execution_order
+from pyscaf.preference_chain import best_execution_order, iter_scored_execution_orders
 
 from .dependency_loader import load_and_complete_dependencies
 
 logger = logging.getLogger(__name__)
 
 
+def print_top_orders(dependencies, k: int) -> None:
+    """Debug view: the k best execution orders with their score (only those are computed)."""
+    for rank, (score, order) in enumerate(iter_scored_execution_orders(dependencies), start=1):
+        print(f"#{rank} (score {score}): {' -> '.join(order)}")
+        if rank == k:
+            break
+
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m pyscaf.preference_chain")
+    parser.add_argument("yaml_path", nargs="?", help="Dependencies YAML file (default: the bundled dependencies.yaml)")
+    parser.add_argument("-v", action="store_true", help="Debug logging")
+    parser.add_argument("--top-k", type=int, metavar="K", help="Show the K best execution orders with their score")
+    args = parser.parse_args()
+
     logger = logging.getLogger(__name__)
-    if "-v" in sys.argv:
+    if args.v:
         logging.basicConfig(
             level=logging.DEBUG,
             format="%(levelname)s %(name)s::%(funcName)s: \n    %(message)s",
@@ -23,9 +37,12 @@ if __name__ == "__main__":
         )
 
     # Load and complete dependencies from YAML
-    yaml_path = os.path.join(os.path.dirname(__file__), "dependencies.yaml")
+    yaml_path = args.yaml_path or os.path.join(os.path.dirname(__file__), "dependencies.yaml")
     dependencies = load_and_complete_dependencies(yaml_path)
-    best_execution_order(dependencies)
+    if args.top_k:
+        print_top_orders(dependencies, args.top_k)
+    else:
+        best_execution_order(dependencies)
     # tree = DependencyTreeWalker(dependencies, "root")
     # extended_dependencies = extend_nodes(dependencies)
     # # for dep in extended_dependencies:
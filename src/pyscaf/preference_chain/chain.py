@@ -1,14 +1,16 @@
-import itertools
+import heapq
 import logging
 
 from pyscaf.preference_chain.model import ChainLink, ExtendedNode, Node
 
 from .circular_dependency_error import CircularDependencyError
+from .graph import ChainGraph
+from .search_budget_exceeded_error import SearchBudgetExceededError
 
 logger = logging.getLogger(__name__)
 
 
-def extend_nodes(tree: list[Node]) -> list[ExtendedNode]:
+def extend_nodes(tree: list[Node] | list[ExtendedNode]) -> list[ExtendedNode]:
     """
     Extends a list of Node objects into ExtendedNode objects by computing reverse dependencies.
 
@@ -16,45 +18,49 @@ def extend_nodes(tree: list[Node]) -> list[ExtendedNode]:
     This allows building a complete dependency graph with both forward and backward references.
 
     Args:
-        tree: List of Node objects representing the dependency tree
+        tree: List of Node (or ExtendedNode) objects representing the dependency tree
 
     Returns:
         List of ExtendedNode objects with populated referenced_by sets
     """
     extended_nodes: list[ExtendedNode] = []
+    nodes_by_id: dict[str, ExtendedNode] = {}
     for node in tree:
-        extended_nodes.append(
-            ExtendedNode(id=node.id, depends=node.depends, after=node.after)
-        )
+        extended_node = ExtendedNode(id=node.id, depends=set(node.depends), after=node.after)
+        extended_nodes.append(extended_node)
+        nodes_by_id.setdefault(node.id, extended_node)
     for node in extended_nodes:
         for id in node.depends:
-            found_node = next((x for x in extended_nodes if x.id == id), None)
+            found_node = nodes_by_id.get(id)
             if found_node:
                 found_node.referenced_by.add(node.id)
     return extended_nodes
 
 
-def update_chains(node: ExtendedNode, chains: list[ChainLink]):
-    for chain in chains:
+def _in_chain(node_ids: set[str], chain: ChainLink, graph: ChainGraph) -> bool:
+    """Whether every id of node_ids belongs to chain."""
+    return all(graph.chain_by_node_id.get(node_id) is chain for node_id in node_ids)
+
+
+def update_chains(node: ExtendedNode, graph: ChainGraph) -> ChainLink:
+    # Only the chains headed by the node or ending with its 'after' can take it
+    for chain in graph.candidates(node.id, node.after):
         # If the node is the after of a chain, append it to the chain
         # And set the after chain of the chain to the node's after
         if (
             chain.head is not None
             and node.id == chain.head.id  # node is at the head of the chain
-            and node.referenced_by.issubset(
-                chain.ids
-            )  # all the nodes that reference the node are in the chain
+            and _in_chain(node.referenced_by, chain, graph)  # all the nodes that reference the node are in the chain
             and (
-                set(node.external_dependencies).issubset(
+                node.external_dependencies.issubset(
                     chain.external_dependencies
                 )  # all the external dependencies of the node are in the chain's ones
-                or len(chain.external_dependencies)
-                == 0  # The chain has no external dependencies
+                or len(chain.external_dependencies) == 0  # The chain has no external dependencies
             )
         ):
-            logger.debug(f"HEAD updated chain {chain.ids} with {node.id}")
-            chain.head = node
-            chain.children.append(node)
+            logger.debug("HEAD updated chain %s with %s", chain.ids, node.id)
+            graph.set_head(chain, node)
+            graph.append(chain, node)
             return chain
         # If the node has it's dependance fulffiled by a chain, append it to the chain
         # A node is fulfilled by a chain if all of it's dependencies are in the chain
@@ -62,45 +68,48 @@ def update_chains(node: ExtendedNode, chains: list[ChainLink]):
         if (
             node.after is not None
             and node.after == chain.tail.id
-            and set(node.external_dependencies).issubset(chain.external_dependencies)
+            and node.external_dependencies.issubset(chain.external_dependencies)
             and len(chain.tail.referenced_by)
             <= 1  # The node is referenced by only one other node (after relation), or is a leaf node
         ):
-            logger.debug(f"QUEUED updated chain {chain.ids} with {node.id}")
-            chain.tail = node
-            chain.children.append(node)
+            logger.debug("QUEUED updated chain %s with %s", chain.ids, node.id)
+            graph.set_tail(chain, node)
+            graph.append(chain, node)
             return chain
 
     # If the node is not in a chain, create a new one
-    chain = ChainLink(children=[node], head=node, tail=node)
-    chains.append(chain)
-    return chain
+    return graph.add(node)
 
 
-def merge_chains(chain: ChainLink, chains: list[ChainLink]) -> ChainLink:
-    for other_chain in chains:
-        if chain == other_chain:
+def _fulfilled_by(chain: ChainLink, other_chain: ChainLink) -> bool:
+    """Whether the external dependencies of chain are all external dependencies or ids of other_chain."""
+    return all(
+        dep in other_chain.external_dependencies or dep in other_chain.id_set for dep in chain.external_dependencies
+    )
+
+
+def merge_chains(chain: ChainLink, graph: ChainGraph) -> ChainLink:
+    # Only the chains headed by the chain's tail or ending with its head's 'after' can be merged with it
+    for other_chain in graph.candidates(chain.tail.id, chain.head.after):
+        if other_chain is chain:
             continue
         # * other_chain --after--> chain
         # If the chain is the after of a chain, append it to the chain
         # And set the after other_chain of the other_chain to the chain's after
         if (
             chain.tail.id == other_chain.head.id  # chain is at the head of the chain
-            and chain.tail.referenced_by.issubset(
-                other_chain.ids
+            and _in_chain(
+                chain.tail.referenced_by, other_chain, graph
             )  # all the chains that reference the chain are in the chain
             and (
-                set(chain.external_dependencies).issubset(
-                    other_chain.external_dependencies.union(set(other_chain.ids))
-                )  # all the external dependencies of the chain are in the chain's ones
-                or len(other_chain.external_dependencies)
-                == 0  # The other_chain has no external dependencies
+                _fulfilled_by(chain, other_chain)  # all the external dependencies of the chain are in the chain's ones
+                or len(other_chain.external_dependencies) == 0  # The other_chain has no external dependencies
             )
         ):
-            logger.debug(f"HEAD merged chain {chain.ids} with {other_chain.ids}")
-            other_chain.head = chain.head
-            other_chain.children.extend(chain.children)
-            chains.remove(chain)
+            logger.debug("HEAD merged chain %s with %s", chain.ids, other_chain.ids)
+            graph.set_head(other_chain, chain.head)
+            graph.remove(chain)
+            graph.extend(other_chain, chain)
             return other_chain
         # * other_chain --after--> chain
         # If the chain has it's dependance fulffiled by a chain, append it to the chain
@@ -108,73 +117,397 @@ def merge_chains(chain: ChainLink, chains: list[ChainLink]) -> ChainLink:
         # Or if the other_chain has the same external dependencies as the chain
         if (
             chain.head.after == other_chain.tail.id
-            and set(chain.external_dependencies).issubset(
-                other_chain.external_dependencies.union(set(other_chain.ids))
-            )
+            and _fulfilled_by(chain, other_chain)
             and len(other_chain.tail.referenced_by)
             <= 1  # The chain is referenced by only one other chain (after relation), or is a leaf chain
         ):
-            logger.debug(f"QUEUED merged chain {other_chain.ids} with {chain.ids}\n")
-            other_chain.tail = chain.tail
-            other_chain.children.extend(chain.children)
-            chains.remove(chain)
+            logger.debug("QUEUED merged chain %s with %s\n", other_chain.ids, chain.ids)
+            graph.set_tail(other_chain, chain.tail)
+            graph.remove(chain)
+            graph.extend(other_chain, chain)
             return other_chain
-    logger.debug(f"no merge for {chain.ids}")
+    logger.debug("no merge for %s", chain.ids)
     return chain
 
 
 def build_chains(tree: list[ExtendedNode]) -> list[ChainLink]:
-    chains: list[ChainLink] = []
+    graph = ChainGraph()
     for node in tree:
-        logger.debug(f"Processing node {node}")
-        chain = update_chains(node, chains)
-        logger.debug(f"Chain (before merging): {chain.ids}")
-        chain = merge_chains(chain, chains)
+        logger.debug("Processing node %s", node)
+        chain = update_chains(node, graph)
+        logger.debug("Chain (before merging): %s", chain.ids)
+        chain = merge_chains(chain, graph)
 
-        if (
-            chain.tail.referenced_by is not None
-            and chain.head.id in chain.tail.referenced_by
-        ):
-            logger.debug(f"Chain (after merging): {chain.ids} is a loop")
+        if chain.tail.referenced_by is not None and chain.head.id in chain.tail.referenced_by:
+            logger.debug("Chain (after merging): %s is a loop", chain.ids)
             raise CircularDependencyError("Circular dependency detected")
         logger.debug(
-            f"Chain (after merging):"
-            f"Chain: {chain.ids} referenced by {chain.referenced_by}"
-            f"  depends on {chain.external_dependencies}\n",
+            "Chain (after merging):Chain: %s referenced by %s  depends on %s\n",
+            chain.ids,
+            chain.referenced_by,
+            chain.external_dependencies,
         )
 
-    return chains
+    return graph.chains
 
 
-def compute_all_resolution_pathes(chains: list[ChainLink]):
-    all_pathes: list[list[ChainLink]] = [
-        list(path) for path in itertools.permutations(chains)
+def _dependency_masks(chains: list[ChainLink]) -> list[int] | None:
+    """
+    Encode the dependencies of each chain as a bitmask of the chains that must precede it.
+
+    Returns None when a chain depends on an id that no chain provides (no valid path).
+    """
+    chain_index_by_id = {node_id: index for index, chain in enumerate(chains) for node_id in chain.ids}
+    masks = []
+    for chain in chains:
+        mask = 0
+        for dep in chain.depends:
+            if dep not in chain_index_by_id:
+                logger.debug(f"Chain {chain.ids} depends on unknown id {dep}")
+                return None
+            mask |= 1 << chain_index_by_id[dep]
+        masks.append(mask)
+    return masks
+
+
+def _bits(mask: int):
+    """Yield the indexes of the bits set in mask, lowest first."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def _dependent_indexes(dependency_masks: list[int]) -> list[list[int]]:
+    """dependents[i]: chains that directly depend on chain i."""
+    dependents: list[list[int]] = [[] for _ in dependency_masks]
+    for index, mask in enumerate(dependency_masks):
+        for other in _bits(mask):
+            dependents[other].append(index)
+    return dependents
+
+
+def _ancestor_masks(dependency_masks: list[int], dependents: list[list[int]]) -> tuple[list[int], list[int]] | None:
+    """
+    Close the dependency bitmasks transitively, in both directions.
+
+    Returns (ancestors, descendants): the chains that must run before, respectively
+    after, each chain. Returns None when the dependencies form a cycle (no valid path).
+    """
+    count = len(dependency_masks)
+    missing = [mask.bit_count() for mask in dependency_masks]
+    order = [index for index in range(count) if not missing[index]]
+    for index in order:  # topological order (Kahn), grows while iterating
+        for other in dependents[index]:
+            missing[other] -= 1
+            if not missing[other]:
+                order.append(other)
+    if len(order) < count:
+        return None
+    ancestors = [0] * count
+    for index in order:
+        for other in _bits(dependency_masks[index]):
+            ancestors[index] |= ancestors[other] | 1 << other
+    descendants = [0] * count
+    for index in reversed(order):
+        for other in dependents[index]:
+            descendants[index] |= descendants[other] | 1 << other
+    return ancestors, descendants
+
+
+def _preference_links(
+    chains: list[ChainLink], dependency_masks: list[int]
+) -> tuple[list[list[int]], list[list[int]]] | None:
+    """
+    Index the chains for the path searches.
+
+    Returns (dependents, predecessors), or None when the dependencies form a cycle:
+    - dependents[i]: chains that directly depend on chain i,
+    - predecessors[i]: chains whose tail is the 'after' of chain i's head (the "good" previous
+      chains). A link p -> i is dropped when the dependencies forbid it: i must run before p,
+      or some other chain has to run between them (it depends on p and i depends on it).
+    """
+    dependents = _dependent_indexes(dependency_masks)
+    closures = _ancestor_masks(dependency_masks, dependents)
+    if closures is None:
+        return None
+    ancestors, descendants = closures
+
+    chain_indexes_by_tail: dict[str, list[int]] = {}
+    for index, chain in enumerate(chains):
+        chain_indexes_by_tail.setdefault(chain.tail.id, []).append(index)
+    predecessors = [
+        [
+            other
+            for other in chain_indexes_by_tail.get(chain.head.after, [])
+            if other != index
+            and not ancestors[other] >> index & 1
+            and not ancestors[index] & ~(1 << other) & descendants[other]
+        ]
+        if chain.head.after is not None
+        else []
+        for index, chain in enumerate(chains)
     ]
+    return dependents, predecessors
 
-    # Filter valid paths: check head dependencies and external dependencies
-    valid_pathes: list[list[ChainLink]] = []
-    for path in all_pathes:
-        is_valid = True
-        for i, chain in enumerate(path):
-            # Get previous chains' ids
-            previous_ids = (
-                set().union(*(prev_chain.ids for prev_chain in path[:i]))
-                if i > 0
-                else set()
-            )
 
-            # Check dependencies
-            if not chain.depends.issubset(previous_ids):
-                logger.debug(
-                    f"Path rejected: chain {chain.ids} external deps {chain.external_dependencies} not in previous ids {previous_ids}"
-                )
-                is_valid = False
-                break
+def compute_all_resolution_pathes(chains: list[ChainLink]):
+    """
+    Yield every valid resolution path, in the order of itertools.permutations(chains).
 
-        if is_valid:
-            valid_pathes.append(path)
+    A path is valid when each chain only depends on ids of the chains placed before it.
+    Paths are built depth-first, so an invalid prefix discards all of its permutations
+    at once and nothing but the current path is kept in memory.
+    """
+    dependency_masks = _dependency_masks(chains)
+    if dependency_masks is None:
+        return
+    count = len(chains)
+    path: list[int] = []
+    # cursors[depth]: next chain index to try at this depth (explicit stack, no recursion limit)
+    cursors = [0]
+    placed = 0
+    while cursors:
+        if len(path) == count:
+            yield [chains[index] for index in path]
+        else:
+            index = cursors[-1]
+            while index < count and (placed >> index & 1 or dependency_masks[index] & ~placed):
+                index += 1
+            if index < count:
+                cursors[-1] = index + 1
+                path.append(index)
+                placed |= 1 << index
+                cursors.append(0)
+                continue
+        cursors.pop()
+        if path:
+            placed &= ~(1 << path.pop())
+
+
+def compute_best_resolution_path(chains: list[ChainLink], max_states: int | None = None) -> list[ChainLink] | None:
+    """
+    Return the best valid resolution path without enumerating permutations.
+
+    The result is the path that sorting compute_all_resolution_pathes(chains) by
+    compute_path_score would put first: the highest score and, among equal scores,
+    the first one in permutation order. Returns None if no valid path exists.
+
+    The score only counts "after" links between adjacent chains, so the search
+    looks for the maximum number of such links: for each target (from an upper
+    bound down to 0) a depth-first search explores chains in index order, pruned by
+    - the dependencies (bitmask of the chains already placed),
+    - an upper bound on the links still reachable (the number of distinct chains
+      that are still able to precede a chain wanting to follow them),
+    - a memo of the (placed chains, last chain) states that already failed to
+      reach a given number of links (dynamic programming over subsets).
+    The first target reached is the optimum, so the common cases (every preference
+    satisfiable) take a single greedy pass. The search is exact: it never settles for
+    a path that is not the best one.
+
+    Args:
+        chains: The chains to order
+        max_states: Maximum number of search states to explore (unbounded by default)
+
+    Raises:
+        SearchBudgetExceededError: If the search explored more than max_states states; the
+            error carries a greedy path (valid, not necessarily the best one), for callers
+            that explicitly accept it
+    """
+    count = len(chains)
+    if count == 0:
+        return []
+    dependency_masks = _dependency_masks(chains)
+    if dependency_masks is None:
+        return None
+
+    links = _preference_links(chains, dependency_masks)
+    if links is None:
+        return None
+    dependents, predecessors = links
+
+    # successor_counts[j]: unplaced chains that would score by following chain j
+    successor_counts = [0] * count
+    for preds in predecessors:
+        for other in preds:
+            successor_counts[other] += 1
+    # Upper bound of the links still reachable: distinct chains, either unplaced or last,
+    # that some unplaced chain wants to follow
+    initial_bound = sum(1 for successors in successor_counts if successors)
+
+    # failed[(placed, last)]: smallest number of additional links known to be unreachable
+    failed: dict[tuple[int, int], int] = {}
+    explored = 0
+
+    def _search(target: int) -> list[int] | None:
+        nonlocal explored
+        path: list[int] = []
+        cursors = [0]
+        placed = 0
+        last = -1
+        links = 0
+        bound = initial_bound
+        # ready: unplaced chains whose dependencies are all placed
+        ready = sum(1 << index for index in range(count) if not dependency_masks[index])
+        history: list[tuple[int, int, int, int]] = []  # (last, links, bound, ready) before each placement
+
+        def _place(index: int) -> None:
+            nonlocal placed, last, links, bound, ready
+            history.append((last, links, bound, ready))
+            if last in predecessors[index]:
+                links += 1
+            for other in predecessors[index]:
+                successor_counts[other] -= 1
+                if successor_counts[other] == 0 and (other == last or not placed >> other & 1):
+                    bound -= 1
+            if last >= 0 and successor_counts[last]:
+                bound -= 1
+            placed |= 1 << index
+            ready &= ~(1 << index)
+            for other in dependents[index]:
+                if not dependency_masks[other] & ~placed:
+                    ready |= 1 << other
+            last = index
+
+        def _unplace(index: int) -> None:
+            nonlocal placed, last, links, bound, ready
+            for other in predecessors[index]:
+                successor_counts[other] += 1
+            placed &= ~(1 << index)
+            last, links, bound, ready = history.pop()
 
-    return valid_pathes
+        while True:
+            if len(path) == count:
+                return path
+            advanced = False
+            for index in _bits(ready >> cursors[-1] << cursors[-1]):
+                explored += 1
+                if max_states is not None and explored > max_states:
+                    raise SearchBudgetExceededError(
+                        f"Best resolution path of {count} chains not found within {max_states} search states",
+                        [chains[index] for index in _greedy_path(dependency_masks, dependents, predecessors)],
+                    )
+                _place(index)
+                needed = target - links
+                if bound >= needed and failed.get((placed, index), needed + 1) > needed:
+                    cursors[-1] = index + 1
+                    path.append(index)
+                    cursors.append(0)
+                    advanced = True
+                    break
+                _unplace(index)
+            if advanced:
+                continue
+            if not path:
+                return None
+            failed[(placed, last)] = min(failed.get((placed, last), target - links), target - links)
+            cursors.pop()
+            _unplace(path.pop())
+
+    for target in range(initial_bound, -1, -1):
+        best = _search(target)
+        if best is not None:
+            logger.debug(f"Best path found with {target} preferred links ({explored} search states)")
+            return [chains[index] for index in best]
+    return None
+
+
+def _greedy_path(dependency_masks: list[int], dependents: list[list[int]], predecessors: list[list[int]]) -> list[int]:
+    """
+    Build a valid path placing, at each step, the first ready chain that prefers to follow
+    the last one, or the first ready chain when none does.
+    """
+    count = len(dependency_masks)
+    followers: list[list[int]] = [[] for _ in range(count)]
+    for index, preds in enumerate(predecessors):
+        for other in preds:
+            followers[other].append(index)
+    path: list[int] = []
+    placed = 0
+    ready = sum(1 << index for index in range(count) if not dependency_masks[index])
+    last = -1
+    while len(path) < count:
+        preferred = [index for index in followers[last] if ready >> index & 1] if last >= 0 else []
+        last = preferred[0] if preferred else next(_bits(ready))
+        path.append(last)
+        placed |= 1 << last
+        ready &= ~(1 << last)
+        for other in dependents[last]:
+            if not dependency_masks[other] & ~placed:
+                ready |= 1 << other
+    return path
+
+
+def iter_resolution_paths_by_score(chains: list[ChainLink]):
+    """
+    Yield (score, path) for every valid resolution path, best first.
+
+    Paths come in non-increasing compute_path_score order and, among equal scores, in
+    permutation order: the order of sorting compute_all_resolution_pathes(chains) by
+    score, so the first path is the one compute_best_resolution_path returns.
+
+    Paths are found lazily by a best-first (A*) search over partial paths, ranked by
+    their links so far plus the same upper bound as compute_best_resolution_path.
+    The bound never increases along a path, so a complete path comes out of the
+    frontier only once no better or earlier one is left in it. The caller can stop
+    at any time: memory is bounded by the frontier, not by the number of paths.
+    """
+    count = len(chains)
+    if count == 0:
+        yield 0, []
+        return
+    dependency_masks = _dependency_masks(chains)
+    if dependency_masks is None:
+        return
+    links = _preference_links(chains, dependency_masks)
+    if links is None:
+        return
+    dependents, predecessors = links
+
+    # followers[j]: bitmask of the chains that would score by following chain j
+    followers = [0] * count
+    for index, preds in enumerate(predecessors):
+        for other in preds:
+            followers[other] |= 1 << index
+    initial_bound = sum(1 for mask in followers if mask)
+    initial_ready = sum(1 << index for index in range(count) if not dependency_masks[index])
+
+    # Frontier entries: (-(links + bound), path, placed, last, links, bound, ready)
+    # The path tuple breaks ties in permutation order (a prefix sorts before its extensions)
+    frontier: list[tuple[int, tuple[int, ...], int, int, int, int, int]] = [
+        (-initial_bound, (), 0, -1, 0, initial_bound, initial_ready)
+    ]
+    while frontier:
+        _, path, placed, last, path_links, bound, ready = heapq.heappop(frontier)
+        if len(path) == count:
+            yield path_links - (count - 1), [chains[index] for index in path]
+            continue
+        for index in _bits(ready):
+            # Same bookkeeping as _place() in compute_best_resolution_path, from the bitmasks
+            child_links = path_links + (last in predecessors[index])
+            child_bound = bound
+            child_placed = placed | 1 << index
+            for other in predecessors[index]:
+                if not followers[other] & ~child_placed and (other == last or not placed >> other & 1):
+                    child_bound -= 1
+            if last >= 0 and followers[last] & ~child_placed:
+                child_bound -= 1
+            child_ready = ready & ~(1 << index)
+            for other in dependents[index]:
+                if not dependency_masks[other] & ~child_placed:
+                    child_ready |= 1 << other
+            heapq.heappush(
+                frontier,
+                (
+                    -(child_links + child_bound),
+                    path + (index,),
+                    child_placed,
+                    index,
+                    child_links,
+                    child_bound,
+                    child_ready,
+                ),
+            )
 
 
 def compute_path_score(path: list[ChainLink]):
@@ -0,0 +1,88 @@
+import logging
+
+from .model import ChainLink, ExtendedNode
+
+logger = logging.getLogger(__name__)
+
+
+class ChainGraph:
+    """
+    Indexed set of chains used while building them.
+
+    Chains are kept in creation order (the order build_chains returns them in), with
+    lookup tables from a node id to the chain containing it and to the chains whose
+    head or tail it is, so finding the chains a node or a chain can join is a dict
+    lookup instead of a scan of every chain.
+    """
+
+    def __init__(self) -> None:
+        self._chains: dict[int, ChainLink] = {}  # creation sequence -> chain
+        self._sequences: dict[int, int] = {}  # id(chain) -> creation sequence
+        self._next_sequence = 0
+        self.chain_by_node_id: dict[str, ChainLink] = {}
+        self.chains_by_head: dict[str, list[ChainLink]] = {}
+        self.chains_by_tail: dict[str, list[ChainLink]] = {}
+
+    @property
+    def chains(self) -> list[ChainLink]:
+        return list(self._chains.values())
+
+    def __len__(self) -> int:
+        return len(self._chains)
+
+    def add(self, node: ExtendedNode) -> ChainLink:
+        """Create a new chain holding a single node."""
+        chain = ChainLink(children=[node], head=node, tail=node)
+        self._chains[self._next_sequence] = chain
+        self._sequences[id(chain)] = self._next_sequence
+        self._next_sequence += 1
+        self.chain_by_node_id[node.id] = chain
+        self.chains_by_head.setdefault(node.id, []).append(chain)
+        self.chains_by_tail.setdefault(node.id, []).append(chain)
+        return chain
+
+    def remove(self, chain: ChainLink) -> None:
+        """Forget a chain (after it was merged into another one)."""
+        del self._chains[self._sequences.pop(id(chain))]
+        self._unindex(self.chains_by_head, chain.head.id, chain)
+        self._unindex(self.chains_by_tail, chain.tail.id, chain)
+
+    def set_head(self, chain: ChainLink, node: ExtendedNode) -> None:
+        self._unindex(self.chains_by_head, chain.head.id, chain)
+        chain.head = node
+        self.chains_by_head.setdefault(node.id, []).append(chain)
+
+    def set_tail(self, chain: ChainLink, node: ExtendedNode) -> None:
+        self._unindex(self.chains_by_tail, chain.tail.id, chain)
+        chain.tail = node
+        self.chains_by_tail.setdefault(node.id, []).append(chain)
+
+    def append(self, chain: ChainLink, node: ExtendedNode) -> None:
+        """Add a node to a chain's children."""
+        chain.append(node)
+        self.chain_by_node_id[node.id] = chain
+
+    def extend(self, chain: ChainLink, other: ChainLink) -> None:
+        """Move the children of other into chain."""
+        chain.extend(other)
+        for node_id in other.ids:
+            self.chain_by_node_id[node_id] = chain
+
+    def candidates(self, head_id: str | None, tail_id: str | None) -> list[ChainLink]:
+        """Chains whose head is head_id or whose tail is tail_id, in creation order."""
+        found: dict[int, ChainLink] = {}
+        for chain in self.chains_by_head.get(head_id, []) if head_id is not None else []:
+            found[self._sequences[id(chain)]] = chain
+        for chain in self.chains_by_tail.get(tail_id, []) if tail_id is not None else []:
+            found[self._sequences[id(chain)]] = chain
+        return [found[sequence] for sequence in sorted(found)]
+
+    @staticmethod
+    def _unindex(table: dict[str, list[ChainLink]], key: str, chain: ChainLink) -> None:
+        chains = table[key]
+        for position, other in enumerate(chains):
+            if other is chain:
+                del chains[position]
+                break
+        if not chains:
+            del table[key]
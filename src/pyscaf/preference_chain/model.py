@@ -1,4 +1,5 @@
 import logging
+from dataclasses import dataclass, field
 
 from pydantic import BaseModel
 
@@ -15,29 +16,88 @@ class Node(BaseModel):
         return self.depends - (set([self.after]) if self.after is not None else set())
 
 
-class ExtendedNode(Node):
-    referenced_by: set[str] = set()
+@dataclass(slots=True, eq=False)
+class ExtendedNode:
+    """
+    Node as used by the chain builder: no validation, plus its reverse dependencies.
 
+    Node is the validated model of the public API; the algorithm works on these
+    lighter objects, built by extend_nodes().
+    """
+
+    id: str
+    depends: set[str] = field(default_factory=set)
+    after: str | None = None
+    referenced_by: set[str] = field(default_factory=set)
+
+    @property
+    def external_dependencies(self) -> set[str]:
+        return self.depends - {self.after} if self.after is not None else set(self.depends)
+
+
+@dataclass(slots=True, eq=False)
+class ChainLink:
+    """
+    Linear sequence of nodes, always executed together.
+
+    The aggregates (ids, depends, external_dependencies, referenced_by) are kept
+    up to date by append() and extend(), so reading them does not walk the children.
+    They are shared with the chain: callers must not mutate them.
+    """
 
-class ChainLink(BaseModel):
     children: list[ExtendedNode]
     head: ExtendedNode
     tail: ExtendedNode
 
+    _ids: list[str] = field(default_factory=list, init=False, repr=False)
+    _id_set: set[str] = field(default_factory=set, init=False, repr=False)
+    _depends: set[str] = field(default_factory=set, init=False, repr=False)
+    _external_dependencies: set[str] = field(default_factory=set, init=False, repr=False)
+    _referenced_by: set[str] = field(default_factory=set, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        children, self.children = self.children, []
+        for node in children:
+            self.append(node)
+
     @property
     def ids(self) -> list[str]:
-        return [node.id for node in self.children]
+        return self._ids
+
+    @property
+    def id_set(self) -> set[str]:
+        return self._id_set
 
     @property
     def external_dependencies(self) -> set[str]:
-        return set().union(
-            *[node.external_dependencies for node in self.children]
-        ) - set(self.ids)
+        return self._external_dependencies
 
     @property
     def depends(self) -> set[str]:
-        return set().union(*[node.depends for node in self.children]) - set(self.ids)
+        return self._depends
 
     @property
     def referenced_by(self) -> set[str]:
-        return set().union(*[node.referenced_by for node in self.children])
+        return self._referenced_by
+
+    def append(self, node: ExtendedNode) -> None:
+        """Add a node to the children and update the aggregates."""
+        self.children.append(node)
+        self._ids.append(node.id)
+        self._id_set.add(node.id)
+        self._depends.update(dep for dep in node.depends if dep not in self._id_set)
+        self._depends.discard(node.id)
+        self._external_dependencies.update(dep for dep in node.external_dependencies if dep not in self._id_set)
+        self._external_dependencies.discard(node.id)
+        self._referenced_by.update(node.referenced_by)
+
+    def extend(self, other: "ChainLink") -> None:
+        """Add the children of another chain and merge its aggregates."""
+        self.children.extend(other.children)
+        self._ids.extend(other._ids)
+        self._depends.difference_update(other._id_set)
+        self._depends.update(dep for dep in other._depends if dep not in self._id_set)
+        self._external_dependencies.difference_update(other._id_set)
+        self._external_dependencies.update(dep for dep in other._external_dependencies if dep not in self._id_set)
+        self._id_set.update(other._id_set)
+        self._referenced_by.update(other._referenced_by)
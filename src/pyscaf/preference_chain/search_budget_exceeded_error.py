@@ -0,0 +1,7 @@
+class SearchBudgetExceededError(Exception):
+    """Raised when the best resolution path search explores more states than it was allowed to."""
+
+    def __init__(self, message: str, greedy_path: list):
+        super().__init__(message)
+        # A valid path (dependencies respected), not necessarily the best one: using it is the caller's choice
+        self.greedy_path = greedy_path
@@ -0,0 +1,322 @@
+"""
+Server mode: a long-lived pyscaf generating projects on request, over a local unix socket.
+
+Spawning ``pyscaf init`` per project pays the interpreter startup, the imports, the
+action discovery and the ordering every time. ``pyscaf serve --socket PATH`` pays them
+once: the action classes and their options, the execution order, the resources and the
+compiled templates stay in memory, and each request is generated on a thread pool by
+its own ActionManager (own project path, console, command runner and journal; no
+os.chdir), as a batch project would be.
+
+The protocol is JSON lines. A client connects and writes one request per line::
+
+    {"id": "42", "project_name": "demo", "output_dir": "/srv/projects", "options": {"license": "mit"}}
+
+``project_name`` (a plain directory name) and ``options`` are validated as the rows of
+a batch manifest (see pyscaf.batch); ``id`` (generated when omitted) and ``output_dir``
+(the server's one by default) are optional. The server answers with events, one per
+line, each carrying the id of its request::
+
+    {"id": "42", "event": "accepted", "path": "/srv/projects/demo"}
+    {"id": "42", "event": "output", "line": "Creating skeleton for: CoreAction"}
+    {"id": "42", "event": "step", "phase": "skeleton", "action": "core", "status": "completed"}
+    {"id": "42", "event": "done", "success": true, "duration": 1.2, "error": null}
+
+A project fails ("success": false) when a step raised or one of its commands failed;
+"error" then names the failed steps. An invalid request gets a single "error" event
+instead. A connection may carry several requests; the server closes it once the client
+has stopped writing (shutdown(SHUT_WR)) and all its projects are done.
+"""
+
+import copy
+import io
+import itertools
+import json
+import logging
+import os
+import socket
+import socketserver
+import stat
+import threading
+import time
+from collections.abc import Callable, Iterable, Iterator, Mapping
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Any
+
+from pydantic import BaseModel
+from rich.console import Console
+
+from pyscaf.actions.cli_option_to_key import cli_option_to_key
+from pyscaf.actions.journal import StepsFailedError, describe_steps
+from pyscaf.actions.manager import ActionManager
+from pyscaf.actions.registry import get_registry
+from pyscaf.batch import check_project_name, project_options
+
+logger = logging.getLogger(__name__)
+
+# Sends one event to the client of a request
+Emit = Callable[[dict[str, Any]], None]
+
+
+class ServeRequest(BaseModel):
+    """A generation request (one line sent by a client)."""
+
+    id: str | None = None
+    project_name: str
+    output_dir: str | None = (
+        None  # Directory the project is created in (default, or base of a relative one: the server's)
+    )
+    options: dict[str, Any] = {}  # context key or option name -> value, as in a batch manifest
+
+
+class EventWriter(io.TextIOBase):
+    """Text stream turning what is written to it into "output" events, one per line (from any thread)."""
+
+    def __init__(self, emit: Emit):
+        super().__init__()
+        self._emit = emit
+        self._buffer = ""
+        self._lock = threading.Lock()
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text: str) -> int:
+        with self._lock:
+            *lines, self._buffer = (self._buffer + text).split("\n")
+            for line in lines:
+                self._emit({"event": "output", "line": line})
+        return len(text)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._buffer:
+                self._emit({"event": "output", "line": self._buffer})
+                self._buffer = ""
+        super().close()
+
+
+class ProjectServer:
+    """
+    Generates the projects of the requests on a thread pool.
+
+    Everything the projects share is computed once, when the server is created: the
+    options of the actions (to validate the requests), their classes (imported in
+    warm_up()) and the execution order.
+    """
+
+    def __init__(
+        self,
+        base_context: Mapping[str, Any],
+        order: list[str],
+        output_dir: str | Path,
+        workers: int | None = None,
+        env: Mapping[str, str] | None = None,
+    ):
+        """
+        Args:
+            base_context: Context shared by all the projects (defaults already filled)
+            order: Execution order of the actions, computed once
+            output_dir: Directory the projects are created in, unless a request gives another one
+            workers: Number of projects generated at once (defaults to the CPU count)
+            env: Environment of the commands run by the actions (defaults to a copy of os.environ)
+        """
+        registry = get_registry()
+        self.base_context = dict(base_context)
+        self.order = order
+        self.output_dir = Path(output_dir).resolve()
+        self.env = env
+        self.options = {cli_option_to_key(opt): opt for entry in registry.entries() for opt in entry.cli_options}
+        self.executor = ThreadPoolExecutor(
+            max_workers=workers or os.cpu_count() or 1, thread_name_prefix="pyscaf-serve"
+        )
+        self._ids = itertools.count(1)
+        self._active: set[Path] = set()  # paths of the projects being generated
+        self._lock = threading.Lock()
+
+    def warm_up(self) -> None:
+        """Import the actions of the execution order and create the template environment, before any request."""
+        from pyscaf.tools.templates import get_environment
+
+        registry = get_registry()
+        for action_id in self.order:
+            registry.load(action_id)
+        get_environment()
+
+    def submit(self, line: str, emit: Emit) -> Future | None:
+        """
+        Validate a request line and queue the generation of its project.
+
+        Args:
+            line: The JSON request
+            emit: Sends an event to the client (the request id is added here)
+
+        Returns:
+            The future of the generation, None if the request was rejected (an "error" event was sent)
+        """
+        request_id = None
+        try:
+            data = json.loads(line)
+            if isinstance(data, dict) and data.get("id") is not None:
+                request_id = str(data["id"])
+            request = ServeRequest.model_validate(data)
+            check_project_name(request.project_name)  # The project stays in its output directory
+            options = project_options(request.project_name, request.options, self.options)
+        except ValueError as e:
+            # Invalid JSON, request, project name or option (ValidationError and BatchError are ValueErrors)
+            emit({"id": request_id, "event": "error", "error": str(e)})
+            return None
+        request_id = request.id or str(next(self._ids))
+        # A relative output_dir is relative to the server's one
+        output_dir = self.output_dir if request.output_dir is None else (self.output_dir / request.output_dir).resolve()
+        project_path = output_dir / request.project_name
+        with self._lock:
+            if project_path in self._active:
+                emit({"id": request_id, "event": "error", "error": f"{project_path} is already being generated"})
+                return None
+            self._active.add(project_path)
+
+        context = {**copy.deepcopy(self.base_context), **options, "project_name": request.project_name}
+        emit({"id": request_id, "event": "accepted", "path": str(project_path)})
+        return self.executor.submit(
+            self._generate, project_path, context, lambda event: emit({"id": request_id, **event})
+        )
+
+    def _generate(self, project_path: Path, context: dict[str, Any], emit: Emit) -> None:
+        """
+        Generate one project, as batch.generate_project() does: errors, and the steps the
+        journal records as failed, are reported in its "done" event instead of being raised.
+        """
+        output = EventWriter(emit)
+        console = Console(file=output, width=120, force_terminal=False)
+        start = time.perf_counter()
+        error = None
+        manager = None
+        try:
+            manager = ActionManager(
+                project_path,
+                context,
+                env=self.env,
+                output=console,
+                order=self.order,
+                log=output,
+                on_step=lambda phase, action, status: emit(
+                    {"event": "step", "phase": phase, "action": action, "status": status}
+                ),
+            )
+            manager.context = manager.run_postfill_hooks(manager.context)
+            manager.create_project()
+        except StepsFailedError:
+            pass  # Reported from the journal below
+        except Exception as e:
+            logger.debug(f"Generation of {project_path} failed", exc_info=True)
+            console.print_exception()
+            error = f"{type(e).__name__}: {e}"
+        finally:
+            output.close()
+            with self._lock:
+                self._active.discard(project_path)
+        failed = manager.journal.state.failed if manager is not None else []
+        if failed:
+            steps = f"failed steps: {describe_steps(failed)}"
+            error = steps if error is None else f"{error} ({steps})"
+        emit({"event": "done", "success": error is None, "duration": time.perf_counter() - start, "error": error})
+
+    def close(self) -> None:
+        """Let the running generations finish; the queued ones are cancelled."""
+        self.executor.shutdown(wait=True, cancel_futures=True)
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """One client connection: its request lines go to the ProjectServer, their events come back."""
+
+    server: "SocketServer"
+
+    def handle(self) -> None:
+        lock = threading.Lock()
+
+        def emit(event: dict[str, Any]) -> None:
+            data = (json.dumps(event, default=str) + "\n").encode("utf-8")
+            with lock:
+                try:
+                    self.wfile.write(data)
+                except OSError:
+                    # The client went away: its projects are generated all the same
+                    pass
+
+        futures = []
+        for raw in self.rfile:
+            line = raw.decode("utf-8", errors="replace").strip()
+            if line:
+                future = self.server.projects.submit(line, emit)
+                if future is not None:
+                    futures.append(future)
+        wait(futures)
+
+
+class SocketServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """
+    Unix socket server of a ProjectServer.
+
+    The socket is only accessible to the user running the server (mode 0600): a
+    request can create files wherever that user can. It is removed when the server
+    is closed.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, socket_path: str | Path, projects: ProjectServer):
+        """
+        Raises:
+            FileExistsError: If the path is not a socket, or another server listens on it
+        """
+        self.socket_path = Path(socket_path)
+        self.projects = projects
+        _remove_stale_socket(self.socket_path)
+        # Created with the right mode, rather than chmod-ed after the bind
+        umask = os.umask(0o177)
+        try:
+            super().__init__(str(self.socket_path), _RequestHandler)
+        finally:
+            os.umask(umask)
+
+    def server_close(self) -> None:
+        super().server_close()
+        self.socket_path.unlink(missing_ok=True)
+
+
+def _remove_stale_socket(path: Path) -> None:
+    """Remove the socket a server left behind (e.g. killed), refusing to touch anything else."""
+    try:
+        mode = path.lstat().st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        raise FileExistsError(f"{path} exists and is not a socket")
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+        try:
+            probe.connect(str(path))
+        except (ConnectionRefusedError, FileNotFoundError):
+            logger.debug(f"Removing the stale socket {path}")
+            path.unlink(missing_ok=True)
+            return
+    raise FileExistsError(f"A server is already listening on {path}")
+
+
+def send_requests(socket_path: str | Path, requests: Iterable[Mapping[str, Any]]) -> Iterator[dict[str, Any]]:
+    """
+    Send requests to a pyscaf server, then yield its events until all the projects are done.
+
+    Args:
+        socket_path: Socket of the server
+        requests: The requests (see ServeRequest)
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(str(socket_path))
+        for request in requests:
+            client.sendall((json.dumps(request) + "\n").encode("utf-8"))
+        client.shutdown(socket.SHUT_WR)
+        with client.makefile("r", encoding="utf-8") as lines:
+            for line in lines:
+                yield json.loads(line)
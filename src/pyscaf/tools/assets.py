@@ -0,0 +1,53 @@
+"""
+Binary assets and template directories of the skeletons, copied file to file without being read by pyscaf.
+"""
+
+import logging
+from importlib.resources import as_file, files
+from pathlib import Path
+
+from pydantic import BaseModel
+
+from pyscaf.tools.fastcopy import copy_file, link_file
+
+logger = logging.getLogger(__name__)
+
+
+class AssetFile(BaseModel):
+    """
+    Content of a skeleton file copied as is from a file of a package.
+
+    Skeletons may map a path to an AssetFile instead of a string: the SkeletonStage
+    copies the package file into the project with copy_file() (copy_file_range, a
+    reflink on copy-on-write file systems), or hardlinks it when asked to. Its data
+    never goes through pyscaf, whatever its size or encoding.
+    """
+
+    package: str  # e.g. "pyscaf.actions.jupyter_tools"
+    path: str  # Path of the file in the package, "/"-separated
+
+    def read_bytes(self) -> bytes:
+        """The data of the file (for inspection: materialize() does not read it)."""
+        return files(self.package).joinpath(*self.path.split("/")).read_bytes()
+
+    def materialize(self, target: str | Path, link: bool = False) -> None:
+        """
+        Create a file of the project from the asset.
+
+        The file gets the mode of a new file (umask), executable if the asset is. A
+        package in a zip archive is extracted to a temporary file first.
+
+        Args:
+            target: File to create
+            link: Hardlink the file of the package instead of copying it (copied anyway
+                across file systems). The project file then IS the package file: it must
+                be replaced, never edited in place.
+
+        Raises:
+            FileExistsError: If the target exists
+        """
+        with as_file(files(self.package).joinpath(*self.path.split("/"))) as source:
+            if link:
+                link_file(source, target)
+            else:
+                copy_file(source, target, mode=False)
@@ -0,0 +1,22 @@
+import os
+from pathlib import Path
+
+
+def get_cache_dir(*parts: str) -> Path:
+    """
+    Return the pyscaf cache directory (optionally a sub-directory of it).
+
+    The location is resolved in this order:
+    - the PYSCAF_CACHE_DIR environment variable
+    - $XDG_CACHE_HOME/pyscaf
+    - ~/.cache/pyscaf
+
+    The directory is not created; callers create it when they write to it.
+    """
+    base = os.environ.get("PYSCAF_CACHE_DIR")
+    if base:
+        root = Path(base)
+    else:
+        xdg_cache = os.environ.get("XDG_CACHE_HOME")
+        root = (Path(xdg_cache) if xdg_cache else Path.home() / ".cache") / "pyscaf"
+    return root.joinpath(*parts)
@@ -0,0 +1,263 @@
+"""
+Cache of resolved project environments (uv.lock and venv), reused by the projects with the same dependencies.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import platform
+import re
+import shutil
+import sys
+import time
+from collections.abc import Iterator, Mapping
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any
+
+from pydantic import BaseModel, ValidationError
+
+from pyscaf.tools.cache_dir import get_cache_dir
+from pyscaf.tools.fastcopy import link_tree
+from pyscaf.tools.file_lock import file_lock
+
+logger = logging.getLogger(__name__)
+
+ENVIRONMENTS_DIR = "environments"
+ENTRY_FILENAME = "entry.json"
+
+# uv's lock of the venv: every copy gets its own
+_IGNORED = {".lock"}
+
+# Package of the project itself in uv.lock (an editable or virtual package at the project root)
+_PROJECT_PACKAGE = re.compile(
+    r'^\[\[package\]\]\nname = "(?P<name>[^"]+)"(?:\nversion = "(?P<version>[^"]*)")?'
+    r'\nsource = \{ (?:editable|virtual) = "\." \}',
+    re.MULTILINE,
+)
+
+
+class EnvironmentEntry(BaseModel):
+    """A cached environment: the uv.lock and the template venv of the first project that resolved it."""
+
+    key: str
+    project_name: str  # name of the project's package in uv.lock
+    prompt: str | None = None  # prompt of the template venv (its project name)
+    venv: str  # absolute path the template venv was created at, written in its scripts
+    created: float  # time.time()
+
+
+def normalize_name(name: str) -> str:
+    """Normalized package name, as written in uv.lock (PEP 503)."""
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+def _plain(value: Any) -> Any:
+    """Plain Python value of a tomlkit item (or of a plain value)."""
+    return value.unwrap() if hasattr(value, "unwrap") else value
+
+
+def dependency_key(document: Mapping[str, Any], groups: set[str]) -> str:
+    """
+    Hash of everything the resolution of a pyproject.toml depends on.
+
+    The project's name, version, authors... are left out, so that every project
+    generated with the same options gets the same key.
+
+    Args:
+        document: The pyproject.toml document (tomlkit or plain mapping)
+        groups: Dependency groups installed by uv sync
+    """
+    project = _plain(document.get("project", {}))
+    tool = _plain(document.get("tool", {}))
+    data = {
+        "requires-python": project.get("requires-python"),
+        "dependencies": project.get("dependencies", []),
+        "optional-dependencies": project.get("optional-dependencies", {}),
+        "dependency-groups": _plain(document.get("dependency-groups", {})),
+        "build-system": _plain(document.get("build-system", {})),
+        "uv": tool.get("uv", {}),
+        "groups": sorted(groups),
+        "platform": [sys.platform, platform.machine()],
+    }
+    return hashlib.sha256(json.dumps(data, sort_keys=True, default=str).encode()).hexdigest()[:32]
+
+
+def _read_prompt(venv: Path) -> str | None:
+    config = venv / "pyvenv.cfg"
+    if config.exists():
+        match = re.search(r"^prompt = (.*)$", config.read_text(encoding="utf-8"), re.MULTILINE)
+        if match:
+            return match.group(1)
+    return None
+
+
+def _written_path(venv: Path) -> str:
+    """Path of the venv as uv wrote it in its scripts (it may differ from ours, e.g. through a symlink)."""
+    activate = venv / "bin" / "activate"
+    if activate.exists():
+        match = re.search(r"^VIRTUAL_ENV='(.*)'$", activate.read_text(encoding="utf-8"), re.MULTILINE)
+        if match:
+            return match.group(1)
+    return str(venv.absolute())
+
+
+def _rewrite(path: Path, data: bytes) -> None:
+    """Replace a file by a new one (a linked file must not be edited in place: the template would change too)."""
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_bytes(data)
+    shutil.copymode(path, tmp)
+    os.replace(tmp, path)
+
+
+def relocate_venv(venv: Path, old_venv: str, old_prompt: str | None, new_prompt: str | None) -> int:
+    """
+    Point the scripts of a copied venv to their new location (and prompt).
+
+    The console scripts start with the absolute path of the venv interpreter and the
+    activation scripts set VIRTUAL_ENV; the rest of the venv is relocatable.
+
+    Returns:
+        The number of files rewritten
+    """
+    replacements = [(old_venv.encode(), str(venv).encode())]
+    prompt = None
+    if old_prompt and new_prompt and old_prompt != new_prompt:
+        prompt = re.compile(rb"(?<=[\"'x=])" + re.escape(old_prompt.encode()) + rb"(?=[\"'])")
+    scripts = venv / ("Scripts" if os.name == "nt" else "bin")
+    rewritten = 0
+    for path in sorted(scripts.iterdir()) if scripts.is_dir() else []:
+        if path.is_symlink() or not path.is_file():
+            continue
+        activation = path.name.startswith(("activate", "deactivate"))
+        with path.open("rb") as f:
+            if not activation and f.read(2) != b"#!":
+                continue  # binaries (e.g. ruff) and data files
+        data = path.read_bytes()
+        new_data = data
+        for old, new in replacements:
+            new_data = new_data.replace(old, new)
+        if prompt is not None and activation:
+            new_data = prompt.sub(new_prompt.encode(), new_data)
+        if new_data != data:
+            _rewrite(path, new_data)
+            rewritten += 1
+    config = venv / "pyvenv.cfg"
+    if prompt is not None and config.exists():
+        text = config.read_text(encoding="utf-8")
+        _rewrite(config, re.sub(r"^prompt = .*$", f"prompt = {new_prompt}", text, flags=re.MULTILINE).encode())
+        rewritten += 1
+    return rewritten
+
+
+class EnvironmentCache:
+    """
+    Resolved environments of the generated projects, keyed by their dependencies.
+
+    The first project with a given dependency_key() resolves and installs its
+    environment with uv; store() then keeps its uv.lock and hardlinks its venv into
+    the cache. The next projects restore() them: the lockfile is copied (with the
+    project's own package renamed), the venv is hardlinked from the template and its
+    scripts relocated, so their `uv sync` only installs the project itself. Population
+    is serialized per key with an inter-process lock, so the projects of a batch wait
+    for the first one instead of all resolving the same environment.
+    """
+
+    def __init__(self, root: str | Path | None = None):
+        """
+        Args:
+            root: Cache directory (defaults to the "environments" directory of the pyscaf cache)
+        """
+        self.root = Path(root) if root is not None else get_cache_dir(ENVIRONMENTS_DIR)
+
+    def path(self, key: str) -> Path:
+        return self.root / key
+
+    @contextmanager
+    def lock(self, key: str) -> Iterator[None]:
+        """Hold the (inter-process) lock of a key, to check and populate its entry."""
+        with file_lock(self.root / f"{key}.lock"):
+            yield
+
+    def entry(self, key: str) -> EnvironmentEntry | None:
+        """The complete entry of a key, if any (its metadata is written last)."""
+        try:
+            return EnvironmentEntry.model_validate_json((self.path(key) / ENTRY_FILENAME).read_bytes())
+        except (OSError, ValidationError):
+            return None
+
+    def restore(
+        self, key: str, project_path: str | Path, venv: str | Path, project_name: str, version: str | None
+    ) -> bool:
+        """
+        Give a project the cached uv.lock and a venv linked from the template.
+
+        Args:
+            key: dependency_key() of the project
+            project_path: Root of the project (it must not have a uv.lock yet)
+            venv: Venv to create (it must not exist yet)
+            project_name: Name of the project (pyproject.toml)
+            version: Version of the project (pyproject.toml)
+
+        Returns:
+            Whether the environment was restored (False: no entry, or the project already has one)
+        """
+        project_path, venv = Path(project_path), Path(venv)
+        lockfile = project_path / "uv.lock"
+        entry = self.entry(key)
+        if entry is None or venv.exists() or lockfile.exists():
+            return False
+
+        def _rename(match: re.Match) -> str:
+            package = match.group(0).replace(f'name = "{match["name"]}"', f'name = "{normalize_name(project_name)}"')
+            if match["version"] is not None and version:
+                package = package.replace(f'version = "{match["version"]}"', f'version = "{version}"')
+            return package
+
+        lock = self.path(key) / "uv.lock"
+        lockfile.write_text(_PROJECT_PACKAGE.sub(_rename, lock.read_text(encoding="utf-8"), count=1), encoding="utf-8")
+        link_tree(self.path(key) / "venv", venv, ignore=_IGNORED)
+        relocate_venv(venv, entry.venv, entry.prompt, project_name)
+        logger.debug(f"Environment {key} restored into {venv}")
+        return True
+
+    def store(self, key: str, project_path: str | Path, venv: str | Path) -> EnvironmentEntry | None:
+        """
+        Keep the uv.lock and (hardlinked) venv of a project as the entry of a key.
+
+        Returns:
+            The entry (the existing one if the key already has one), None if the project
+            has no environment to store
+        """
+        project_path, venv = Path(project_path), Path(venv)
+        existing = self.entry(key)
+        if existing is not None:
+            return existing
+        lockfile = project_path / "uv.lock"
+        if not lockfile.is_file() or not venv.is_dir():
+            return None
+        lock = lockfile.read_text(encoding="utf-8")
+        package = _PROJECT_PACKAGE.search(lock)
+        if package is None:
+            logger.debug(f"No project package in {lockfile}: environment not cached")
+            return None
+
+        # Built aside, then renamed: an entry is complete or absent
+        tmp = self.root / f".{key}.{os.getpid()}.tmp"
+        shutil.rmtree(tmp, ignore_errors=True)
+        tmp.mkdir(parents=True)
+        (tmp / "uv.lock").write_text(lock, encoding="utf-8")
+        link_tree(venv, tmp / "venv", ignore=_IGNORED)
+        entry = EnvironmentEntry(
+            key=key,
+            project_name=package["name"],
+            prompt=_read_prompt(venv),
+            venv=_written_path(venv),
+            created=time.time(),
+        )
+        (tmp / ENTRY_FILENAME).write_text(entry.model_dump_json(indent=2), encoding="utf-8")
+        shutil.rmtree(self.path(key), ignore_errors=True)  # incomplete entry
+        os.replace(tmp, self.path(key))
+        logger.debug(f"Environment of {project_path} cached as {key}")
+        return entry
@@ -0,0 +1,111 @@
+"""
+File and tree copies sharing the data with the source when the file system allows it (hardlinks, reflinks).
+"""
+
+import errno
+import logging
+import os
+import shutil
+from collections.abc import Collection
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# Errors meaning "this file cannot be hardlinked here" (other file system, no link support, too many links)
+_NO_LINK_ERRORS = {errno.EXDEV, errno.EPERM, errno.EMLINK, errno.ENOTSUP, errno.EACCES}
+
+# Errors meaning "copy_file_range cannot copy these files" (old kernel, other file system, special file)
+_NO_COPY_RANGE_ERRORS = {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.ENOTSUP, errno.EOPNOTSUPP, errno.EPERM}
+
+
+def link_file(source: str | Path, target: str | Path) -> bool:
+    """
+    Hardlink a file, or copy it (with its metadata) when it cannot be linked.
+
+    Returns:
+        Whether the file was linked (False: copied)
+    """
+    try:
+        os.link(source, target)
+        return True
+    except OSError as e:
+        if e.errno not in _NO_LINK_ERRORS:
+            raise
+    shutil.copy2(source, target)
+    return False
+
+
+def link_tree(source: str | Path, target: str | Path, ignore: Collection[str] = ()) -> int:
+    """
+    Recreate a directory tree whose files are hardlinks to the source files.
+
+    Directories are created (with the mode of the source ones), symlinks are recreated
+    as is (relative or absolute), regular files are hardlinked, or copied when the
+    target is on another file system. The files then share their data with the
+    source: rewrite a file (new file, then os.replace) instead of editing it in place.
+
+    Args:
+        source: Directory to copy
+        target: Directory to create (it must not exist)
+        ignore: Names of the files and directories not to copy, at any depth
+
+    Returns:
+        The number of files copied instead of linked
+    """
+    source, target = Path(source), Path(target)
+    copied = 0
+    for directory, dirnames, filenames in os.walk(source):
+        dirnames[:] = [name for name in dirnames if name not in ignore]
+        relative = Path(directory).relative_to(source)
+        destination = target / relative
+        destination.mkdir(parents=relative == Path("."))
+        shutil.copymode(directory, destination)
+        for name in [*dirnames, *filenames]:
+            if name in ignore:
+                continue
+            path = Path(directory, name)
+            if path.is_symlink():
+                (destination / name).symlink_to(os.readlink(path))
+            elif name in filenames and not link_file(path, destination / name):
+                copied += 1
+    if copied:
+        logger.debug(f"{copied} files of {source} copied instead of linked")
+    return copied
+
+
+def copy_file(source: str | Path, target: str | Path, mode: bool = True) -> None:
+    """
+    Copy a file (data and mode) to a new file, letting the kernel share the data blocks when it can.
+
+    The data goes through os.copy_file_range(), which copy-on-write file systems (btrfs,
+    XFS...) turn into a reflink and other ones into an in-kernel copy; a plain copy
+    finishes the job where it is not supported.
+
+    Args:
+        source: File to copy
+        target: File to create
+        mode: Whether to copy the mode of the source; otherwise the target gets the mode of
+            a new file (umask), executable where readable when the source is executable
+
+    Raises:
+        FileExistsError: If the target exists
+    """
+    with open(source, "rb", buffering=0) as src, open(target, "xb", buffering=0) as dst:
+        if hasattr(os, "copy_file_range"):
+            remaining = os.fstat(src.fileno()).st_size
+            try:
+                while remaining > 0:
+                    copied = os.copy_file_range(src.fileno(), dst.fileno(), remaining)
+                    if copied == 0:
+                        break
+                    remaining -= copied
+            except OSError as e:
+                if e.errno not in _NO_COPY_RANGE_ERRORS:
+                    raise
+        # Whatever copy_file_range did not copy (the file offsets followed it)
+        shutil.copyfileobj(src, dst)
+    if mode:
+        shutil.copymode(source, target)
+    elif os.stat(source).st_mode & 0o111:
+        current = os.stat(target).st_mode
+        os.chmod(target, current | (current & 0o444) >> 2)
@@ -0,0 +1,56 @@
+"""
+Inter-process lock on a file, to protect the shared caches of concurrent pyscaf runs.
+"""
+
+import logging
+import os
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+@contextmanager
+def file_lock(path: str | Path, shared: bool = False) -> Iterator[None]:
+    """
+    Hold an exclusive (or shared) lock on a file (created if needed) until the block ends.
+
+    The lock is taken with flock() (LockFileEx through msvcrt on Windows), so it is
+    released by the system if the process dies, and works across the processes of a
+    batch run, and across the threads of a process. It is not reentrant: do not take
+    the same lock twice in one thread.
+
+    Args:
+        path: Lock file
+        shared: Take a shared lock, held by any number of holders at once but excluding
+            the exclusive one (exclusive anyway on Windows)
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o666)
+    start = time.perf_counter()
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        else:
+            while True:
+                try:
+                    msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:  # LK_LOCK gives up after 10 attempts
+                    continue
+        waited = time.perf_counter() - start
+        if waited > 0.1:
+            logger.debug(f"Waited {waited:.1f}s for {path}")
+        yield
+    finally:
+        # Closing the descriptor releases the lock
+        os.close(fd)
@@ -1,28 +1,137 @@
+import os
+import shutil
+import tempfile
+from collections.abc import Iterable, Iterator
 from pathlib import Path
 
+from tomlkit import TOMLDocument
+from tomlkit.container import Container
+from tomlkit.items import AoT, Item, Table, Whitespace
+
+
+def _is_section_header(stripped: str) -> bool:
+    return stripped.startswith("[") and stripped.endswith("]")
+
+
+def format_toml_lines(lines: Iterable[str]) -> Iterator[str]:
+    """
+    Ensures there is exactly one empty line between each section of TOML lines, one line at a time.
+
+    Only the run of empty lines since the last written line is held back (as a count), so
+    the lines of a file object can be formatted without reading the whole file.
+
+    Args:
+        lines: Lines, with or without their line ending
+
+    Yields:
+        Formatted lines, each ending with a newline
+    """
+    empty_lines = 0
+    started = False
+    for line in lines:
+        line = line.rstrip("\r\n")
+        if line == "":
+            empty_lines += 1
+            continue
+        if _is_section_header(line.strip()):
+            # Drop the empty lines before the section, add exactly one (except for the first section)
+            if started:
+                yield "\n"
+        elif empty_lines:
+            yield "\n" * empty_lines
+        empty_lines = 0
+        started = True
+        yield line + "\n"
+    if empty_lines:
+        yield "\n" * empty_lines
+
+
+def format_toml_text(text: str) -> str:
+    """
+    Ensures there is exactly one empty line between each section of a TOML text.
+    Returns the formatted text.
+    """
+    return "".join(format_toml_lines(text.splitlines())) or "\n"
+
+
+class _DocumentFormatter:
+    """Walks a tomlkit document in output order, fixing the empty lines before each section header."""
+
+    def __init__(self):
+        # Whitespace items made only of empty lines since the last written line: (container body, index)
+        self.pending: list[tuple[list, int]] = []
+        self.started = False
+        self.last: Item | None = None  # last item written, if its line ending can be fixed
+
+    def container(self, container: Container) -> None:
+        body = container.body
+        for index, (_, item) in enumerate(body):
+            if isinstance(item, Whitespace):
+                if item.s.strip("\n") == "":
+                    self.pending.append((body, index))
+                else:
+                    self.content(None)
+            elif isinstance(item, Table):
+                if item.is_super_table():
+                    # No header of its own, but its indent is written before the first section inside it
+                    item.trivia.indent = item.trivia.indent.lstrip("\n")
+                else:
+                    self.header(item)
+                self.container(item.value)
+            elif isinstance(item, AoT):
+                for table in item.body:
+                    self.header(table)
+                    self.container(table.value)
+            else:
+                self.content(item)
+
+    def content(self, item: Item | None) -> None:
+        self.pending.clear()
+        self.started = True
+        self.last = item
+
+    def header(self, table: Table) -> None:
+        for body, index in self.pending:
+            body[index] = (None, Whitespace(""))
+        indent = table.trivia.indent.lstrip("\n")
+        if self.started:
+            # The line before may lack its newline (end of a merged file without a final newline)
+            if self.last is not None and not self.last.trivia.trail.endswith("\n"):
+                self.last.trivia.trail += "\n"
+            indent = f"\n{indent}"
+        table.trivia.indent = indent
+        self.content(table)
+
+
+def format_toml_document(document: TOMLDocument) -> TOMLDocument:
+    """
+    Ensures there is exactly one empty line between each section of a tomlkit document, in place.
+
+    The empty lines before a section live at the end of the previous table (or in the
+    header indent of the section): they are dropped and the header gets one empty line
+    instead, so that tomlkit.dumps() gives the text format_toml_text() would produce
+    (apart from the final newline), without serializing and splitting the document first.
+
+    Returns:
+        The document
+    """
+    _DocumentFormatter().container(document)
+    return document
+
 
 def format_toml(path: Path):
     """
     Ensures there is exactly one empty line between each section in the TOML file.
     The formatted content is written back to the same file.
     """
-    # Read the file content
-    lines = path.read_text(encoding="utf-8").splitlines()
-    formatted_lines = []
-
-    for i, line in enumerate(lines):
-        stripped = line.strip()
-        # Detect section header
-        if stripped.startswith("[") and stripped.endswith("]"):
-            # Remove trailing empty lines before section
-            while formatted_lines and formatted_lines[-1] == "":
-                formatted_lines.pop()
-            # Add exactly one empty line before section (except for the first section)
-            if formatted_lines:
-                formatted_lines.append("")
-            formatted_lines.append(line)
-        else:
-            formatted_lines.append(line)
-
-    # Write the formatted content back to the file
-    path.write_text("\n".join(formatted_lines) + "\n", encoding="utf-8")
+    path = Path(path)
+    # Stream the file through the formatter into a sibling file, which then replaces it
+    with (
+        open(path, encoding="utf-8") as source,
+        tempfile.NamedTemporaryFile(
+            "w", encoding="utf-8", dir=path.parent, prefix=f".{path.name}.", delete=False
+        ) as target,
+    ):
+        target.writelines(format_toml_lines(source))
+    shutil.copymode(path, target.name)
+    os.replace(target.name, path)
@@ -0,0 +1,336 @@
+"""
+Bootstrap of the git repository of a new project without the porcelain commands that walk it.
+"""
+
+import hashlib
+import logging
+import os
+import re
+import stat
+import struct
+import zlib
+from collections.abc import Mapping
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# Variables that move the repository, its index or its configuration: `git add` is used instead
+_GIT_LOCATION_VARS = (
+    "GIT_DIR",
+    "GIT_WORK_TREE",
+    "GIT_INDEX_FILE",
+    "GIT_OBJECT_DIRECTORY",
+    "GIT_CONFIG",
+    "GIT_CONFIG_GLOBAL",
+    "GIT_CONFIG_SYSTEM",
+    "GIT_CONFIG_PARAMETERS",
+    "GIT_CONFIG_COUNT",
+)
+
+# Configuration changing what `git add` stores (line endings, modes, case, includes): `git add` is used instead
+_UNSUPPORTED_CONFIG = re.compile(
+    r"^\s*(?:autocrlf|eol|attributesfile|ignorecase|filemode\s*=\s*false|symlinks\s*=\s*false|precomposeunicode)\b"
+    r"|^\s*\[\s*include",
+    re.IGNORECASE | re.MULTILINE,
+)
+# Repository layout this module writes: format version 0 (no extensions), SHA-1 objects and index
+_FORMAT_VERSION = re.compile(r"^\s*repositoryformatversion\s*=\s*(\S*)", re.IGNORECASE | re.MULTILINE)
+_EXTENSIONS = re.compile(r"^\s*\[\s*extensions\b", re.IGNORECASE | re.MULTILINE)
+_EXCLUDES_FILE = re.compile(r"^\s*excludesfile\s*=\s*(.*?)\s*$", re.IGNORECASE | re.MULTILINE)
+
+# Characters a config value is quoted or escaped for (then written by `git remote add` instead)
+_CONFIG_SPECIAL = re.compile(r'["\\;#\x00-\x1f\x7f]|^\s|\s$')
+
+INDEX_SIGNATURE = b"DIRC"
+INDEX_VERSION = 2
+
+# ctime, mtime (seconds, nanoseconds), dev, ino, mode, uid, gid, size, object id, flags
+_INDEX_ENTRY = struct.Struct(">10I20sH")
+
+
+class IgnoreRules:
+    """
+    The gitignore patterns that apply to a tree, the same way git evaluates them.
+
+    Patterns are added as the tree is walked down (global excludes file, .git/info/exclude,
+    then the .gitignore of each directory); the last matching pattern decides.
+    """
+
+    def __init__(self):
+        self._rules: list[tuple[str, re.Pattern, bool, bool, bool]] = []
+
+    def add(self, text: str, base: str = "") -> None:
+        """
+        Add the patterns of an ignore file.
+
+        Args:
+            text: Content of the file
+            base: Directory of the file, relative to the root with a trailing slash ("" for the root)
+        """
+        for line in text.splitlines():
+            if not line or line.startswith("#"):
+                continue
+            line = re.sub(r"(?<!\\)\s+$", "", line)
+            negate = line.startswith("!")
+            if negate:
+                line = line[1:]
+            directory_only = line.endswith("/")
+            line = line.rstrip("/")
+            if not line:
+                continue
+            anchored = "/" in line
+            regex = re.compile(_translate(line.lstrip("/") if anchored else line), re.DOTALL)
+            self._rules.append((base, regex, negate, directory_only, anchored))
+
+    def ignored(self, path: str, is_dir: bool) -> bool:
+        """Whether a path (relative to the root, with "/" separators) is ignored."""
+        name = path.rsplit("/", 1)[-1]
+        for base, regex, negate, directory_only, anchored in reversed(self._rules):
+            if (directory_only and not is_dir) or not path.startswith(base):
+                continue
+            if regex.fullmatch(path[len(base) :] if anchored else name):
+                return not negate
+        return False
+
+
+def _translate(pattern: str) -> str:
+    """Regular expression of a gitignore glob (wildmatch with FNM_PATHNAME)."""
+    parts: list[str] = []
+    index, length = 0, len(pattern)
+    while index < length:
+        char = pattern[index]
+        if char == "*":
+            end = index
+            while end < length and pattern[end] == "*":
+                end += 1
+            own_component = (index == 0 or pattern[index - 1] == "/") and (end == length or pattern[end] == "/")
+            if end - index >= 2 and own_component:
+                if end == length:
+                    parts.append(".*")  # trailing "/**": everything inside
+                else:
+                    parts.append("(?:.*/)?")  # "**/": any number of directories
+                    end += 1
+            else:
+                parts.append("[^/]*")
+            index = end
+            continue
+        if char == "?":
+            parts.append("[^/]")
+        elif char == "[":
+            end = index + 1
+            if end < length and pattern[end] in "!^":
+                end += 1
+            if end < length and pattern[end] == "]":
+                end += 1
+            end = pattern.find("]", end)
+            if end == -1:
+                parts.append(re.escape(char))
+            else:
+                body = pattern[index + 1 : end]
+                negated = body[:1] in ("!", "^")
+                body = body[1:] if negated else body
+                parts.append(f"[{'^' if negated else ''}{body.replace(chr(92), chr(92) * 2)}]")
+                index = end
+        elif char == "\\" and index + 1 < length:
+            index += 1
+            parts.append(re.escape(pattern[index]))
+        else:
+            parts.append(re.escape(char))
+        index += 1
+    return "".join(parts)
+
+
+def _config_dirs(env: Mapping[str, str]) -> tuple[Path, Path]:
+    """Home directory and XDG configuration directory of the git commands."""
+    home = Path(env.get("HOME") or Path.home())
+    return home, Path(env["XDG_CONFIG_HOME"]) if env.get("XDG_CONFIG_HOME") else home / ".config"
+
+
+def _base_rules(project_path: Path, env: Mapping[str, str]) -> IgnoreRules | None:
+    """
+    The patterns that apply before the .gitignore files (global excludes, .git/info/exclude).
+
+    Returns:
+        The rules, None if the configuration may make `git add` store something else
+        than the files as they are (see _UNSUPPORTED_CONFIG, attributes), or if the
+        repository is not a version 0 one (extensions such as objectformat = sha256)
+    """
+    if any(env.get(name) for name in _GIT_LOCATION_VARS):
+        return None
+    git_dir = project_path / ".git"
+    try:
+        repository_config = (git_dir / "config").read_text(encoding="utf-8")
+    except (OSError, UnicodeDecodeError):
+        return None
+    version = _FORMAT_VERSION.search(repository_config)
+    if (version is not None and version[1] != "0") or _EXTENSIONS.search(repository_config):
+        logger.debug(f"{git_dir} is not a SHA-1 repository without extensions: using git add")
+        return None
+    home, xdg = _config_dirs(env)
+    attributes = (xdg / "git" / "attributes", Path("/etc/gitattributes"), git_dir / "info" / "attributes")
+    if any(path.exists() for path in attributes):
+        return None
+
+    excludes_file = xdg / "git" / "ignore"
+    system = [] if env.get("GIT_CONFIG_NOSYSTEM") else [Path("/etc/gitconfig")]
+    for config in [*system, xdg / "git" / "config", home / ".gitconfig", git_dir / "config"]:
+        try:
+            text = config.read_text(encoding="utf-8")
+        except (OSError, UnicodeDecodeError):
+            continue
+        if _UNSUPPORTED_CONFIG.search(text):
+            logger.debug(f"{config} changes what git add stores: using git add")
+            return None
+        for match in _EXCLUDES_FILE.finditer(text):
+            value = match[1].strip('"')
+            excludes_file = home / value[2:] if value.startswith("~/") else Path(value)
+
+    rules = IgnoreRules()
+    for path in (excludes_file, git_dir / "info" / "exclude"):
+        try:
+            rules.add(path.read_text(encoding="utf-8", errors="surrogateescape"))
+        except OSError:
+            pass
+    return rules
+
+
+def _write_object(git_dir: Path, kind: bytes, data: bytes) -> bytes:
+    """Write a loose object (if missing) and return its binary id."""
+    content = kind + b" %d\0" % len(data) + data
+    digest = hashlib.sha1(content).digest()
+    hex_id = digest.hex()
+    path = git_dir / "objects" / hex_id[:2] / hex_id[2:]
+    if not path.exists():
+        path.parent.mkdir(exist_ok=True)
+        tmp = path.with_name(f".tmp-{os.getpid()}-{hex_id[2:]}")
+        tmp.write_bytes(zlib.compress(content, 1))
+        tmp.chmod(0o444)
+        os.replace(tmp, path)
+    return digest
+
+
+def stage_project(project_path: str | Path, env: Mapping[str, str] | None = None) -> int | None:
+    """
+    Write the index of a new repository with every file of the project not ignored, as `git add .` would.
+
+    The tree is walked once, in this process: ignored directories (.venv...) are not
+    entered, the blobs are written as loose objects and the index in a single write,
+    with the stat data of each file (git sees them unchanged). A `git commit` then
+    creates the initial commit from it, at any point of the creation.
+
+    Only a fresh repository (no index, no commit) with a plain configuration is staged
+    this way: with attributes (filters, line endings), includes or options changing the
+    stored files, or a nested repository, None is returned and `git add` should be used.
+
+    Args:
+        project_path: Root of the project (containing .git)
+        env: Environment of the git commands (HOME, XDG_CONFIG_HOME, GIT_* variables)
+
+    Returns:
+        The number of files staged, None if the project was not staged
+    """
+    project_path = Path(project_path)
+    env = os.environ if env is None else env
+    git_dir = project_path / ".git"
+    head = git_dir / "HEAD"
+    try:
+        ref = head.read_text(encoding="utf-8").strip()
+    except OSError:
+        return None
+    if (
+        not ref.startswith("ref: ")
+        or (git_dir / ref[5:]).exists()
+        or (git_dir / "packed-refs").exists()
+        or (git_dir / "index").exists()
+    ):
+        return None
+    rules = _base_rules(project_path, env)
+    if rules is None:
+        return None
+
+    entries: list[tuple[bytes, os.stat_result, bytes, int]] = []
+
+    def _walk(directory: Path, relative: str) -> bool:
+        names = {entry.name: entry for entry in os.scandir(directory)}
+        if ".gitattributes" in names:
+            return False
+        if ".gitignore" in names and names[".gitignore"].is_file(follow_symlinks=False):
+            rules.add(Path(names[".gitignore"].path).read_text(encoding="utf-8", errors="surrogateescape"), relative)
+        for name, entry in names.items():
+            if name == ".git":
+                if relative:
+                    return False  # nested repository: added as a gitlink by git
+                continue
+            path = relative + name
+            is_dir = entry.is_dir(follow_symlinks=False)
+            if rules.ignored(path, is_dir):
+                continue
+            if is_dir:
+                if not _walk(Path(entry.path), path + "/"):
+                    return False
+                continue
+            info = entry.stat(follow_symlinks=False)
+            if stat.S_ISLNK(info.st_mode):
+                data = os.fsencode(os.readlink(entry.path))
+                mode = 0o120000
+            elif stat.S_ISREG(info.st_mode):
+                data = Path(entry.path).read_bytes()
+                mode = 0o100755 if info.st_mode & stat.S_IXUSR else 0o100644
+            else:
+                continue  # sockets, fifos: not versioned
+            entries.append((os.fsencode(path), info, _write_object(git_dir, b"blob", data), mode))
+        return True
+
+    if not _walk(project_path, ""):
+        return None
+
+    index = bytearray(INDEX_SIGNATURE + struct.pack(">II", INDEX_VERSION, len(entries)))
+    for path, info, object_id, mode in sorted(entries, key=lambda item: item[0]):
+        index += _INDEX_ENTRY.pack(
+            int(info.st_ctime) & 0xFFFFFFFF,
+            info.st_ctime_ns % 1_000_000_000,
+            int(info.st_mtime) & 0xFFFFFFFF,
+            info.st_mtime_ns % 1_000_000_000,
+            info.st_dev & 0xFFFFFFFF,
+            info.st_ino & 0xFFFFFFFF,
+            mode,
+            info.st_uid & 0xFFFFFFFF,
+            info.st_gid & 0xFFFFFFFF,
+            info.st_size & 0xFFFFFFFF,
+            object_id,
+            min(len(path), 0xFFF),
+        )
+        # Entries are NUL-padded to a multiple of 8 bytes (at least one NUL)
+        index += path + b"\0" * (8 - (_INDEX_ENTRY.size + len(path)) % 8)
+    index += hashlib.sha1(index).digest()
+
+    # Same locking as git: the index is created by renaming index.lock
+    lock = git_dir / "index.lock"
+    try:
+        with open(lock, "xb") as f:
+            f.write(index)
+    except FileExistsError:
+        return None
+    os.replace(lock, git_dir / "index")
+    logger.debug(f"Staged {len(entries)} files in {project_path}")
+    return len(entries)
+
+
+def add_remote(project_path: str | Path, name: str, url: str) -> bool:
+    """
+    Add a remote to the configuration of a new repository, as `git remote add` writes it.
+
+    Returns:
+        Whether the remote was added (False: the URL needs quoting, or the remote
+        exists; use `git remote add`)
+    """
+    config = Path(project_path) / ".git" / "config"
+    try:
+        text = config.read_text(encoding="utf-8")
+    except OSError:
+        return False
+    if _CONFIG_SPECIAL.search(url) or not re.fullmatch(r"[\w.-]+", name) or f'[remote "{name}"]' in text:
+        return False
+    with open(config, "a", encoding="utf-8") as f:
+        f.write(f'[remote "{name}"]\n\turl = {url}\n\tfetch = +refs/heads/*:refs/remotes/{name}/*\n')
+    return True
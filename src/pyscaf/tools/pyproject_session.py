@@ -0,0 +1,106 @@
+"""
+Shared in-memory pyproject.toml document for the actions of a project.
+"""
+
+import logging
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+import tomlkit
+from tomlkit import TOMLDocument
+
+from pyscaf.tools.format_toml import format_toml_document
+from pyscaf.tools.toml_merge import deep_merge, merge_toml_documents
+from pyscaf.tools.tracing import span
+
+logger = logging.getLogger(__name__)
+
+
+class PyprojectSession:
+    """
+    pyproject.toml parsed once, edited in memory by every action, formatted and written once.
+
+    The file is read on the first access to the document (after `uv init` created it),
+    the actions merge their config.toml or edit the document in memory, and save()
+    writes it back; the ActionManager saves it at the end of the init phase. Edits go
+    through edit(), which serializes them and marks the document as modified.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self._document: TOMLDocument | None = None
+        self._dirty = False
+        self._lock = threading.RLock()
+
+    @property
+    def dirty(self) -> bool:
+        """Whether the document has changes not written to disk yet."""
+        return self._dirty
+
+    @property
+    def document(self) -> TOMLDocument:
+        """The document, read from disk on first access (empty if the file does not exist)."""
+        with self._lock:
+            if self._document is None:
+                if self.path.exists():
+                    self._document = tomlkit.parse(self.path.read_text(encoding="utf-8"))
+                else:
+                    self._document = tomlkit.document()
+                logger.debug(f"Loaded {self.path}")
+            return self._document
+
+    @contextmanager
+    def edit(self) -> Iterator[TOMLDocument]:
+        """Modify the document (one editor at a time)."""
+        with self._lock:
+            document = self.document
+            self._dirty = True
+            yield document
+
+    def merge(self, source: TOMLDocument | dict) -> None:
+        """Merge a TOML document (or table) into the document."""
+        with self.edit() as document:
+            deep_merge(source, document)
+
+    def merge_file(self, path: str | Path) -> None:
+        """Merge a TOML file into the document."""
+        path = Path(path)
+        if path.exists():
+            with self.edit() as document, span(f"merge {path.parent.name}/{path.name}", "toml", file=path):
+                merge_toml_documents([path], document)
+
+    def merge_text(self, text: str, name: str) -> None:
+        """Merge TOML text (e.g. a resource read once per process) into the document; name labels its span."""
+        with self.edit() as document, span(f"merge {name}", "toml"):
+            deep_merge(tomlkit.parse(text), document)
+
+    def save(self) -> bool:
+        """
+        Format and write the document if it was modified and differs from the file on disk.
+
+        Returns:
+            Whether the file was written
+        """
+        with self._lock:
+            if self._document is None or not self._dirty:
+                return False
+            with span(f"save {self.path.name}", "toml", file=self.path):
+                text = tomlkit.dumps(format_toml_document(self._document))
+                if not text.endswith("\n"):
+                    text += "\n"
+                self._dirty = False
+                if self.path.exists() and self.path.read_text(encoding="utf-8") == text:
+                    logger.debug(f"{self.path} is unchanged")
+                    return False
+                self.path.write_text(text, encoding="utf-8")
+            logger.debug(f"Saved {self.path}")
+            return True
+
+    def reload(self) -> None:
+        """Forget the document, so that it is read again from disk (e.g. after a command rewrote the file)."""
+        with self._lock:
+            if self._dirty:
+                raise RuntimeError(f"{self.path} has unsaved changes")
+            self._document = None
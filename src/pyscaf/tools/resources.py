@@ -0,0 +1,87 @@
+"""
+Resource files of the pyscaf packages (templates, documentation...), read once per process.
+"""
+
+import functools
+import logging
+from importlib.resources import files
+from importlib.resources.abc import Traversable
+
+logger = logging.getLogger(__name__)
+
+
+def _traversable(package: str, path: str) -> Traversable:
+    return files(package).joinpath(*path.split("/"))
+
+
+@functools.cache
+def read_resource(package: str, path: str) -> str | None:
+    """
+    Text of a resource file of a package, read through importlib.resources.
+
+    The resources are read once per process: batch and serve modes read each template
+    once, whatever the number of projects. They are found wherever the package is
+    (directory, zip archive, frozen bundle).
+
+    Args:
+        package: Name of the package (e.g. "pyscaf.actions.git")
+        path: Path of the file in the package, "/"-separated (e.g. "github/workflows/release.yml")
+
+    Returns:
+        The text of the file, None if the package has no such file
+    """
+    resource = _traversable(package, path)
+    if not resource.is_file():
+        logger.debug(f"No resource {path} in {package}")
+        return None
+    return resource.read_text(encoding="utf-8")
+
+
+@functools.cache
+def read_resource_dir(package: str, path: str, suffix: str = "") -> tuple[tuple[str, str], ...]:
+    """
+    Names and texts of the files of a resource directory, sorted by name (read once per process).
+
+    Args:
+        package: Name of the package
+        path: Path of the directory in the package, "/"-separated
+        suffix: Suffix of the files to read (e.g. ".py"), all the files by default
+
+    Returns:
+        (name, text) of each file, empty if the package has no such directory
+    """
+    directory = _traversable(package, path)
+    if not directory.is_dir():
+        return ()
+    names = sorted(item.name for item in directory.iterdir() if item.is_file() and item.name.endswith(suffix))
+    return tuple((name, directory.joinpath(name).read_text(encoding="utf-8")) for name in names)
+
+
+@functools.cache
+def list_resource_dir(package: str, path: str, suffix: str = "", recursive: bool = False) -> tuple[str, ...]:
+    """
+    Paths of the files of a resource directory, sorted, without reading them (listed once per process).
+
+    Args:
+        package: Name of the package
+        path: Path of the directory in the package, "/"-separated
+        suffix: Suffix of the files to list (e.g. ".py"), all the files by default
+        recursive: Whether to list the files of the subdirectories too (except __pycache__)
+
+    Returns:
+        "/"-separated path of each file, relative to the directory; empty if the package has no such directory
+    """
+
+    def walk(directory: Traversable, prefix: str) -> list[str]:
+        found = []
+        for item in directory.iterdir():
+            if item.is_file() and item.name.endswith(suffix):
+                found.append(prefix + item.name)
+            elif recursive and item.is_dir() and item.name != "__pycache__":
+                found.extend(walk(item, f"{prefix}{item.name}/"))
+        return found
+
+    directory = _traversable(package, path)
+    if not directory.is_dir():
+        return ()
+    return tuple(sorted(walk(directory, "")))
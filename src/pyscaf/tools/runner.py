@@ -0,0 +1,181 @@
+"""
+Shared runner of the external commands (uv, git, code...) launched while generating projects.
+"""
+
+import logging
+import os
+import signal
+import subprocess
+import threading
+import time
+from collections import deque
+from collections.abc import Mapping, Sequence
+from pathlib import Path
+from typing import IO, Any
+
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+# Exit code reported for a command killed after its timeout (as coreutils' timeout does)
+TIMEOUT_EXIT_CODE = 124
+
+# Commands running at the same time when no limit is given
+DEFAULT_COMMAND_JOBS = 4
+
+# Lines of output kept per command
+DEFAULT_OUTPUT_LINES = 200
+
+
+class CommandResult(BaseModel):
+    """Outcome of one command."""
+
+    args: list[str]
+    cwd: str | None = None
+    returncode: int
+    duration: float  # seconds, from the start of the process to its end (or kill)
+    output: list[str] = []  # last lines of stdout and stderr, when captured
+    timed_out: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return self.returncode == 0
+
+
+class CommandRunner:
+    """
+    Runs commands with a concurrency limit, timeouts and bounded output capture.
+
+    A command waits for one of the `jobs` slots before it starts, whichever thread runs
+    it (the actions of a phase run concurrently). A command still running after its
+    timeout is killed, with its children when its output is captured (it then runs in
+    its own session), and reports TIMEOUT_EXIT_CODE.
+
+    Captured output is read line by line: the last `output_lines` lines are kept in
+    the result and every line is copied to the `output` stream, if any. Every result
+    is kept in `results`, for duration accounting.
+    """
+
+    def __init__(
+        self,
+        jobs: int = DEFAULT_COMMAND_JOBS,
+        timeout: float | None = None,
+        output_lines: int = DEFAULT_OUTPUT_LINES,
+    ):
+        """
+        Args:
+            jobs: Maximum number of commands running at the same time
+            timeout: Default timeout of the commands, in seconds (None: no timeout)
+            output_lines: Number of lines of captured output kept per command
+        """
+        self.jobs = max(1, jobs)
+        self.timeout = timeout
+        self.output_lines = output_lines
+        self.results: list[CommandResult] = []
+        self._slots = threading.BoundedSemaphore(self.jobs)
+        self._lock = threading.Lock()
+
+    @property
+    def total_duration(self) -> float:
+        """Time spent in the commands run so far (overlapping commands are all counted)."""
+        with self._lock:
+            return sum(result.duration for result in self.results)
+
+    def run(
+        self,
+        args: Sequence[str],
+        cwd: str | Path | None = None,
+        env: Mapping[str, str] | None = None,
+        timeout: float | None = None,
+        stdin: Any = None,
+        output: IO[str] | None = None,
+        capture: bool = True,
+    ) -> CommandResult:
+        """
+        Run a command and wait for its result.
+
+        Args:
+            args: Command and its arguments
+            cwd: Working directory
+            env: Environment (defaults to the environment of the process)
+            timeout: Timeout in seconds, overriding the runner's default
+            stdin: Standard input of the command (as for subprocess)
+            output: Stream receiving the captured output, line by line
+            capture: Whether to read the output (otherwise it goes to the standard streams of pyscaf)
+
+        Raises:
+            FileNotFoundError: If the command is not installed
+        """
+        timeout = self.timeout if timeout is None else timeout
+        tail: deque[str] = deque(maxlen=self.output_lines)
+        with self._slots:
+            start = time.perf_counter()
+            process = subprocess.Popen(
+                list(args),
+                cwd=cwd,
+                env=env,
+                stdin=stdin,
+                stdout=subprocess.PIPE if capture else None,
+                stderr=subprocess.STDOUT if capture else None,
+                text=capture,
+                errors="replace" if capture else None,
+                # Own process group, so that a timeout also kills the children (an interactive
+                # command stays in the terminal's group)
+                start_new_session=capture and os.name == "posix",
+            )
+            reader = None
+            if capture:
+                reader = threading.Thread(target=self._read_output, args=(process.stdout, tail, output), daemon=True)
+                reader.start()
+            timed_out = False
+            try:
+                returncode = process.wait(timeout)
+            except subprocess.TimeoutExpired:
+                logger.warning(f"{' '.join(args)} still running after {timeout}s: killed")
+                self._kill(process, group=capture)
+                process.wait()
+                returncode = TIMEOUT_EXIT_CODE
+                timed_out = True
+            except BaseException:
+                # Interrupted (e.g. Ctrl+C): do not leave the command behind
+                self._kill(process, group=capture)
+                process.wait()
+                raise
+            finally:
+                if reader is not None:
+                    # A grandchild outside the group may keep the pipe open: do not wait for it forever
+                    reader.join(timeout=5)
+            duration = time.perf_counter() - start
+
+        result = CommandResult(
+            args=list(args),
+            cwd=str(cwd) if cwd is not None else None,
+            returncode=returncode,
+            duration=duration,
+            output=list(tail),
+            timed_out=timed_out,
+        )
+        with self._lock:
+            self.results.append(result)
+        logger.debug(f"{' '.join(args)} exited with {returncode} after {duration:.2f}s")
+        return result
+
+    @staticmethod
+    def _read_output(stream: IO[str], tail: deque[str], output: IO[str] | None) -> None:
+        with stream:
+            for line in stream:
+                tail.append(line.rstrip("\n"))
+                if output is not None:
+                    output.write(line)
+        if output is not None:
+            output.flush()
+
+    @staticmethod
+    def _kill(process: subprocess.Popen, group: bool) -> None:
+        try:
+            if group and os.name == "posix":
+                os.killpg(process.pid, signal.SIGKILL)
+            else:
+                process.kill()
+        except ProcessLookupError:
+            pass
@@ -0,0 +1,165 @@
+"""
+In-memory staging of the project skeleton, flushed to disk in a single pass.
+"""
+
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import IO, TYPE_CHECKING
+
+from pyscaf.tools.assets import AssetFile
+
+if TYPE_CHECKING:
+    from pyscaf.tools.templates import TemplateContent
+
+    Content = str | TemplateContent
+
+logger = logging.getLogger(__name__)
+
+
+class SkeletonStage:
+    """
+    Overlay tree collecting the skeletons of several actions before anything is written.
+
+    Adding a skeleton entry resolves it in memory, with the same semantics as writing
+    it directly: a file staged several times gets each new content appended after a
+    newline, directories are created along with the parents of every file. flush()
+    then creates each directory once and writes each file once (opened with "x"; a
+    file already on disk gets the staged content appended instead), instead of an
+    exists() check plus an open per skeleton entry.
+
+    A file content may be a TemplateContent: it is rendered when the file is written,
+    streamed into it chunk by chunk. It may also be an AssetFile, copied (or hardlinked,
+    with link_assets) from the package without being read: an asset is the whole
+    content of its file, and a file already on disk is left as is.
+    """
+
+    def __init__(self, root: str | Path, link_assets: bool = False):
+        """
+        Args:
+            root: Directory the staged paths are relative to
+            link_assets: Hardlink the AssetFile contents instead of copying them
+        """
+        self.root = Path(root)
+        self.link_assets = link_assets
+        self._files: dict[Path, list[Content | AssetFile]] = {}  # relative path -> contents, in staging order
+        self._directories: set[Path] = set()  # relative paths of the explicitly staged directories
+        self._staged: list[Path] = []  # every staged path, in staging order
+
+    def __len__(self) -> int:
+        return len(self._staged)
+
+    def add(self, path: str | Path, content: "Content | AssetFile | None") -> None:
+        """
+        Stage one skeleton entry.
+
+        Args:
+            path: Path relative to the root
+            content: None for a directory, otherwise the file content (text, template or asset)
+
+        Raises:
+            IsADirectoryError: If a file is staged where a directory was
+            FileExistsError: If a directory is staged where a file was, or an asset is
+                staged with other contents for the same file
+        """
+        path = Path(path)
+        if content is None:
+            if path in self._files:
+                raise FileExistsError(f"{path} is staged as a file")
+            self._directories.add(path)
+        else:
+            if path in self._directories or any(parent in self._files for parent in path.parents):
+                raise IsADirectoryError(f"{path} (or one of its parents) is staged as a directory")
+            staged = self._files.get(path)
+            if staged and (isinstance(content, AssetFile) or isinstance(staged[0], AssetFile)):
+                raise FileExistsError(f"{path} is staged twice, and an asset cannot be appended to")
+            self._files.setdefault(path, []).append(content)
+        self._staged.append(path)
+
+    def add_skeleton(self, skeleton: dict[Path, "Content | AssetFile | None"]) -> None:
+        """Stage all the entries of an action skeleton."""
+        for path, content in skeleton.items():
+            self.add(path, content)
+
+    def directories(self) -> list[Path]:
+        """Every directory to create (relative), parents first."""
+        directories = set(self._directories)
+        for path in [*self._files, *self._directories]:
+            directories.update(parent for parent in path.parents if parent != Path("."))
+        return sorted(directories, key=lambda path: (len(path.parts), path))
+
+    def content(self, path: str | Path) -> str | None:
+        """
+        Staged content of a file (what a new file would contain), None if it is not staged.
+
+        An asset is read for the occasion, and decoded as UTF-8 (undecodable bytes replaced).
+        """
+        contents = self._files.get(Path(path))
+        if contents is None:
+            return None
+        if isinstance(contents[0], AssetFile):
+            return contents[0].read_bytes().decode("utf-8", errors="replace")
+        return "\n".join(content if isinstance(content, str) else content.render() for content in contents)
+
+    def flush(self, jobs: int = 1) -> set[Path]:
+        """
+        Write the staged tree under the root, then empty the stage.
+
+        Args:
+            jobs: Number of threads writing the files
+
+        Returns:
+            Set of the absolute paths staged
+        """
+        for directory in self.directories():
+            try:
+                os.mkdir(self.root / directory)
+            except FileExistsError:
+                pass
+
+        files = list(self._files)
+        if jobs > 1 and len(files) > 1:
+            with ThreadPoolExecutor(max_workers=jobs, thread_name_prefix="pyscaf-flush") as executor:
+                list(executor.map(self._write, files))
+        else:
+            for path in files:
+                self._write(path)
+
+        logger.debug(f"Flushed {len(self._directories)} directories and {len(files)} files to {self.root}")
+        created = {self.root / path for path in self._staged}
+        self._files.clear()
+        self._directories.clear()
+        self._staged.clear()
+        return created
+
+    def _write(self, path: Path) -> None:
+        full_path = self.root / path
+        contents = self._files[path]
+        if isinstance(contents[0], AssetFile):
+            try:
+                contents[0].materialize(full_path, link=self.link_assets)
+            except FileExistsError:
+                logger.debug(f"{full_path} already exists, asset {contents[0].path} not copied")
+            return
+        try:
+            with open(full_path, "x") as f:
+                self._write_contents(f, self._files[path])
+        except FileExistsError:
+            # The file was already in the project: append, as a direct write would have
+            logger.debug(f"Appending content to {full_path}")
+            with open(full_path, "a") as f:
+                f.write("\n")
+                self._write_contents(f, self._files[path])
+
+    @staticmethod
+    def _write_contents(f: IO[str], contents: list["Content"]) -> None:
+        """Write the contents of a file, separated by newlines (as content() joins them)."""
+        for index, content in enumerate(contents):
+            if index:
+                f.write("\n")
+            if isinstance(content, str):
+                f.write(content)
+            else:
+                for chunk in content.stream():
+                    f.write(chunk)
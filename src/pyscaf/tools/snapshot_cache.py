@@ -0,0 +1,258 @@
+"""
+Content-addressed cache of generated project trees, restored with per-project substitutions.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import time
+from collections.abc import Iterator, Mapping
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any
+
+from pydantic import BaseModel, ValidationError
+
+from pyscaf.tools.cache_dir import get_cache_dir
+from pyscaf.tools.fastcopy import copy_file
+from pyscaf.tools.file_lock import file_lock
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOTS_DIR = "snapshots"
+ENTRY_FILENAME = "entry.json"
+TREE_DIRNAME = "tree"
+
+# Default limits of the cache (PYSCAF_SNAPSHOT_CACHE_SIZE overrides the size, in megabytes)
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+DEFAULT_MAX_ENTRIES = 100
+
+# Snapshots being built by a process that died are removed after this many seconds
+STALE_BUILD_SECONDS = 3600
+
+
+class SnapshotEntry(BaseModel):
+    """A cached tree and where its placeholders are."""
+
+    key: str
+    placeholders: dict[str, str]  # placeholder -> name of the value it stands for
+    templated: list[str] = []  # relative paths (with placeholders) of the files containing placeholders
+    files: int = 0
+    size: int = 0  # bytes
+    created: float  # time.time()
+
+
+def snapshot_key(data: Any) -> str:
+    """Hash of JSON-compatible data describing what a tree depends on."""
+    return hashlib.sha256(json.dumps(data, sort_keys=True, default=str).encode()).hexdigest()[:32]
+
+
+def _substitution(placeholders: Mapping[str, str], values: Mapping[str, str | None]):
+    """Function replacing the placeholders by their values, in bytes (longest placeholders first)."""
+    replacements = {
+        placeholder.encode(): values[name].encode()
+        for placeholder, name in placeholders.items()
+        if values.get(name) is not None
+    }
+    if not replacements:
+        return lambda data: data
+    pattern = re.compile(b"|".join(re.escape(p) for p in sorted(replacements, key=len, reverse=True)))
+    return lambda data: pattern.sub(lambda match: replacements[match.group(0)], data)
+
+
+class SnapshotCache:
+    """
+    Trees generated by the skeleton and init phases, keyed by what they depend on.
+
+    A tree is stored once, generated with placeholder values (unique strings standing
+    for the project name, the author...). restore() copies it into a new project,
+    through copy_file_range (a reflink on copy-on-write file systems), replacing the
+    placeholders in the file names and in the files that contain them. Entries are
+    evicted least recently used first once the cache exceeds its size or entry limits;
+    a restore marks its entry as used.
+    """
+
+    def __init__(
+        self,
+        root: str | Path | None = None,
+        max_bytes: int | None = None,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ):
+        """
+        Args:
+            root: Cache directory (defaults to the "snapshots" directory of the pyscaf cache)
+            max_bytes: Size limit of the cache (defaults to PYSCAF_SNAPSHOT_CACHE_SIZE megabytes, or 256 MB)
+            max_entries: Maximum number of entries
+        """
+        self.root = Path(root) if root is not None else get_cache_dir(SNAPSHOTS_DIR)
+        if max_bytes is None:
+            size = os.environ.get("PYSCAF_SNAPSHOT_CACHE_SIZE")
+            max_bytes = int(float(size) * 1024 * 1024) if size else DEFAULT_MAX_BYTES
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+
+    def path(self, key: str) -> Path:
+        return self.root / key
+
+    def build_path(self, key: str) -> Path:
+        """Fresh directory a process builds the tree of a key in (passed to store() afterwards)."""
+        path = self.root / f".build-{key}-{os.getpid()}"
+        shutil.rmtree(path, ignore_errors=True)
+        path.mkdir(parents=True)
+        return path
+
+    @contextmanager
+    def lock(self, key: str, shared: bool = False) -> Iterator[None]:
+        """
+        Hold the (inter-process) lock of a key: exclusive to build or evict its entry, shared to restore it.
+
+        Projects restoring the same entry do so concurrently; they only wait for its build.
+        """
+        with file_lock(self.root / f"{key}.lock", shared=shared):
+            yield
+
+    def entry(self, key: str) -> SnapshotEntry | None:
+        """The complete entry of a key, if any (its metadata is written last)."""
+        try:
+            return SnapshotEntry.model_validate_json((self.path(key) / ENTRY_FILENAME).read_bytes())
+        except (OSError, ValidationError):
+            return None
+
+    def store(self, key: str, tree: str | Path, placeholders: Mapping[str, str]) -> SnapshotEntry:
+        """
+        Move a generated tree into the cache.
+
+        Args:
+            key: Key of the tree
+            tree: Directory generated with the placeholder values (moved, not copied)
+            placeholders: Placeholder -> name of the value it stands for
+
+        Returns:
+            The new entry
+        """
+        tree = Path(tree)
+        tokens = [placeholder.encode() for placeholder in placeholders]
+        templated, files, size = [], 0, 0
+        for directory, _, filenames in os.walk(tree):
+            for name in filenames:
+                path = Path(directory, name)
+                if path.is_symlink():
+                    continue
+                files += 1
+                size += path.stat().st_size
+                data = path.read_bytes()
+                if any(token in data for token in tokens):
+                    templated.append(path.relative_to(tree).as_posix())
+        entry = SnapshotEntry(
+            key=key,
+            placeholders=dict(placeholders),
+            templated=sorted(templated),
+            files=files,
+            size=size,
+            created=time.time(),
+        )
+
+        # Assembled aside, then renamed: an entry is complete or absent
+        staging = self.root / f".entry-{key}-{os.getpid()}"
+        shutil.rmtree(staging, ignore_errors=True)
+        staging.mkdir(parents=True)
+        os.replace(tree, staging / TREE_DIRNAME)
+        (staging / ENTRY_FILENAME).write_text(entry.model_dump_json(indent=2), encoding="utf-8")
+        shutil.rmtree(self.path(key), ignore_errors=True)  # incomplete entry
+        os.replace(staging, self.path(key))
+        logger.debug(f"Snapshot {key} stored ({files} files, {len(templated)} with placeholders)")
+        return entry
+
+    def restore(self, key: str, target: str | Path, values: Mapping[str, str | None]) -> bool:
+        """
+        Copy the tree of a key into a directory, with the placeholders replaced by the values.
+
+        Args:
+            key: Key of the tree
+            target: Directory to fill (created if needed)
+            values: Name -> value of the placeholders (None: the tree has no such placeholder)
+
+        Returns:
+            Whether the tree was restored (False: no entry for the key)
+        """
+        entry = self.entry(key)
+        if entry is None:
+            return False
+        target = Path(target)
+        tree = self.path(key) / TREE_DIRNAME
+        substitute = _substitution(entry.placeholders, values)
+        templated = set(entry.templated)
+
+        def _target(relative: str) -> Path:
+            return target / substitute(relative.encode()).decode()
+
+        target.mkdir(parents=True, exist_ok=True)
+        for directory, dirnames, filenames in os.walk(tree):
+            relative_dir = Path(directory).relative_to(tree)
+            for name in [*dirnames, *filenames]:
+                source = Path(directory, name)
+                relative = (relative_dir / name).as_posix()
+                destination = _target(relative)
+                if source.is_symlink():
+                    destination.symlink_to(os.readlink(source))
+                elif name in dirnames:
+                    destination.mkdir()
+                    shutil.copymode(source, destination)
+                elif relative in templated:
+                    destination.write_bytes(substitute(source.read_bytes()))
+                    shutil.copymode(source, destination)
+                else:
+                    copy_file(source, destination)
+        # Last use, for the eviction
+        os.utime(self.path(key) / ENTRY_FILENAME)
+        logger.debug(f"Snapshot {key} restored into {target}")
+        return True
+
+    def evict(self, keep: str | None = None) -> list[str]:
+        """
+        Remove the least recently used entries until the cache fits its limits.
+
+        Must not be called while holding the lock of a key (the lock of each removed
+        entry is taken). Builds left by dead processes are removed too.
+
+        Args:
+            keep: Key never to evict (e.g. the one just restored)
+
+        Returns:
+            The evicted keys
+        """
+        if not self.root.is_dir():
+            return []
+        entries: list[tuple[float, SnapshotEntry]] = []
+        for path in self.root.iterdir():
+            if path.name.startswith((".build-", ".entry-")):
+                try:
+                    if time.time() - path.stat().st_mtime > STALE_BUILD_SECONDS:
+                        shutil.rmtree(path, ignore_errors=True)
+                except OSError:
+                    pass
+                continue
+            entry = self.entry(path.name) if path.is_dir() else None
+            if entry is not None:
+                entries.append(((path / ENTRY_FILENAME).stat().st_mtime, entry))
+
+        entries.sort(key=lambda item: item[0])  # least recently used first
+        size = sum(entry.size for _, entry in entries)
+        count = len(entries)
+        evicted = []
+        for _, entry in entries:
+            if size <= self.max_bytes and count <= self.max_entries:
+                break
+            if entry.key == keep:
+                continue
+            with self.lock(entry.key):
+                shutil.rmtree(self.path(entry.key), ignore_errors=True)
+            size -= entry.size
+            count -= 1
+            evicted.append(entry.key)
+        if evicted:
+            logger.debug(f"Evicted {len(evicted)} snapshots")
+        return evicted
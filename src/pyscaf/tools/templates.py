@@ -0,0 +1,85 @@
+"""
+Jinja templates of the skeletons, compiled once and rendered straight into the staged files.
+"""
+
+import logging
+import threading
+from collections.abc import Callable, Iterator
+from typing import Any
+
+from jinja2 import BaseLoader, Environment, FileSystemBytecodeCache, StrictUndefined, TemplateNotFound
+from pydantic import BaseModel
+
+from pyscaf.tools.cache_dir import get_cache_dir
+from pyscaf.tools.resources import read_resource
+
+logger = logging.getLogger(__name__)
+
+TEMPLATES_CACHE_DIR = "templates"
+
+_environment: Environment | None = None
+_environment_lock = threading.Lock()
+
+
+class ResourceLoader(BaseLoader):
+    """
+    Loads the templates from the resources of the pyscaf packages (see pyscaf.tools.resources).
+
+    A template name is "<package>:<path>", e.g. "pyscaf.actions.test:template_test_example.py.jinja".
+    """
+
+    def get_source(self, environment: Environment, template: str) -> tuple[str, str | None, Callable[[], bool]]:
+        package, _, path = template.partition(":")
+        source = read_resource(package, path) if package and path else None
+        if source is None:
+            raise TemplateNotFound(template)
+        # Resources do not change while the process runs: a compiled template is always up to date
+        return source, None, lambda: True
+
+
+def get_environment() -> Environment:
+    """
+    The Jinja environment shared by the process.
+
+    Compiled templates are kept in memory (the environment's cache) and their bytecode
+    in the pyscaf cache ("templates"), so that another process skips their compilation
+    too. Undefined variables raise (as str.format did), and the trailing newline of a
+    template is kept.
+    """
+    global _environment
+    with _environment_lock:
+        if _environment is None:
+            bytecode_cache = None
+            directory = get_cache_dir(TEMPLATES_CACHE_DIR)
+            try:
+                directory.mkdir(parents=True, exist_ok=True)
+                bytecode_cache = FileSystemBytecodeCache(str(directory))
+            except OSError as e:
+                logger.debug(f"No template bytecode cache: {e}")
+            _environment = Environment(
+                loader=ResourceLoader(),
+                bytecode_cache=bytecode_cache,
+                auto_reload=False,
+                keep_trailing_newline=True,
+                undefined=StrictUndefined,
+            )
+        return _environment
+
+
+class TemplateContent(BaseModel):
+    """
+    Content of a skeleton file rendered from a template, when the skeleton is written.
+
+    Skeletons may map a path to a TemplateContent instead of a string: the SkeletonStage
+    streams the render into the file, without building the whole text first.
+    """
+
+    name: str  # "<package>:<path>" (see ResourceLoader)
+    context: dict[str, Any] = {}
+
+    def stream(self) -> Iterator[str]:
+        """The rendered text, chunk by chunk."""
+        return get_environment().get_template(self.name).generate(self.context)
+
+    def render(self) -> str:
+        return "".join(self.stream())
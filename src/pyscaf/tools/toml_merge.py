@@ -1,49 +1,100 @@
+from collections.abc import Hashable, Sequence
 from pathlib import Path
+from typing import Any
 
 import tomlkit
+from tomlkit import TOMLDocument
 
 
-def merge_toml_files(input_path: Path, output_path: Path):
+def array_item_key(item: Any) -> Hashable:
     """
-    Merges all content from input_path TOML file into output_path TOML file.
-    Recursively merges sections and avoids duplicates by intelligently combining content.
-    Preserves and merges comments at the correct location (inline, under section, etc.).
+    Hashable key identifying an array item when merging arrays.
+
+    tomlkit items are unwrapped to plain Python values, so the same string written with
+    other quotes, or the same inline table with other spacing or key order, gets the same
+    key. Values are tagged with their type: 1, 1.0 and true are different items.
     """
-    # Read files as TOML documents (preserving comments)
-    input_doc = (
-        tomlkit.parse(input_path.read_text(encoding="utf-8"))
-        if input_path.exists()
-        else tomlkit.document()
-    )
-    output_doc = (
-        tomlkit.parse(output_path.read_text(encoding="utf-8"))
-        if output_path.exists()
-        else tomlkit.document()
-    )
-
-    def deep_merge(source, dest):
-        """
-        Recursively merge source into dest, preserving comments and structure.
-        """
-        for key in source:
-            if key in dest:
-                if isinstance(source[key], dict) and isinstance(dest[key], dict):
-                    # Both are tables, merge recursively
-                    deep_merge(source[key], dest[key])
-                elif isinstance(source[key], list) and isinstance(dest[key], list):
-                    # Both are arrays, extend with unique items
-                    for item in source[key]:
-                        if item not in dest[key]:
-                            dest[key].append(item)
-                else:
-                    # Overwrite value, preserve inline comment if present
-                    dest[key] = source[key]
+    if hasattr(item, "unwrap"):
+        item = item.unwrap()
+    if isinstance(item, dict):
+        return ("table", frozenset((key, array_item_key(value)) for key, value in item.items()))
+    if isinstance(item, list):
+        return ("array", tuple(array_item_key(value) for value in item))
+    return (type(item).__name__, item)
+
+
+def deep_merge(source, dest):
+    """
+    Recursively merge source into dest (TOML documents or tables), preserving comments and structure.
+
+    Tables are merged recursively, arrays are extended with their missing items, other
+    values of source replace those of dest.
+    """
+    for key in source:
+        if key in dest:
+            if isinstance(source[key], dict) and isinstance(dest[key], dict):
+                # Both are tables, merge recursively
+                deep_merge(source[key], dest[key])
+            elif isinstance(source[key], list) and isinstance(dest[key], list):
+                # Both are arrays, extend with unique items (looked up by hashed key, not by scanning dest)
+                target = dest[key]
+                present = {array_item_key(item) for item in target}
+                for item in source[key]:
+                    item_key = array_item_key(item)
+                    if item_key not in present:
+                        present.add(item_key)
+                        target.append(item)
             else:
-                # New key: insert with its comments
+                # Overwrite value, preserve inline comment if present
                 dest[key] = source[key]
-                # tomlkit preserves comments automatically for new keys
+        else:
+            # New key: insert with its comments
+            dest[key] = source[key]
+            # tomlkit preserves comments automatically for new keys
+
+
+def _read_document(path: Path) -> tuple[TOMLDocument, str | None]:
+    """Parse a TOML file (an empty document if it does not exist); also return its text."""
+    if not path.exists():
+        return tomlkit.document(), None
+    text = path.read_text(encoding="utf-8")
+    return tomlkit.parse(text), text
+
+
+def merge_toml_documents(inputs: Sequence[Path | TOMLDocument], output: Path | TOMLDocument) -> TOMLDocument:
+    """
+    Merge several TOML inputs, in order, into an output document or file.
+
+    Each input file is parsed once (missing files are skipped). When output is a path,
+    it is parsed once as well, and written back only if the merged document differs
+    from what is on disk.
+
+    Returns:
+        The merged output document
+    """
+    if isinstance(output, Path):
+        output_doc, original_text = _read_document(output)
+    else:
+        output_doc, original_text = output, None
+
+    for source in inputs:
+        if isinstance(source, Path):
+            if not source.exists():
+                continue
+            source = tomlkit.parse(source.read_text(encoding="utf-8"))
+        deep_merge(source, output_doc)
+
+    if isinstance(output, Path):
+        text = tomlkit.dumps(output_doc)
+        if text != original_text:
+            output.write_text(text, encoding="utf-8")
+    return output_doc
 
-    deep_merge(input_doc, output_doc)
 
-    # Write output, preserving comments
-    output_path.write_text(tomlkit.dumps(output_doc), encoding="utf-8")
+def merge_toml_files(input_path: Path, output_path: Path):
+    """
+    Merges all content from input_path TOML file into output_path TOML file.
+    Recursively merges sections and avoids duplicates by intelligently combining content.
+    Preserves and merges comments at the correct location (inline, under section, etc.).
+    """
+    merge_toml_documents([input_path], output_path)
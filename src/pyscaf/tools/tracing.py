@@ -0,0 +1,168 @@
+"""
+Lightweight timing spans, exported as a Chrome trace or summarized per step.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+from pathlib import Path
+from typing import Any
+
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+
+class Span(BaseModel):
+    """A timed step of a run (times from time.perf_counter(), in seconds)."""
+
+    name: str
+    category: str
+    start: float
+    end: float
+    thread_id: int
+    thread_name: str
+    args: dict[str, Any] = {}
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+    @classmethod
+    def measured(cls, name: str, category: str, start: float, **args: Any) -> "Span":
+        """Span of the current thread, from start to now."""
+        thread = threading.current_thread()
+        return cls(
+            name=name,
+            category=category,
+            start=start,
+            end=time.perf_counter(),
+            thread_id=thread.ident or 0,
+            thread_name=thread.name,
+            args=args,
+        )
+
+
+class SpanSummary(BaseModel):
+    """Aggregated timings of the spans sharing a category and a name."""
+
+    name: str
+    category: str
+    count: int
+    total: float
+    max: float
+
+
+class Tracer:
+    """
+    Collects the spans of a run, from any thread.
+
+    Spans are recorded with the span() context manager, or added afterwards when they
+    were measured before the tracer existed (e.g. the action discovery, which happens
+    while the command line is parsed).
+    """
+
+    def __init__(self):
+        self._spans: list[Span] = []
+        self._lock = threading.Lock()
+
+    @property
+    def spans(self) -> list[Span]:
+        """The recorded spans, by start time."""
+        with self._lock:
+            return sorted(self._spans, key=lambda span: span.start)
+
+    def add(self, span: Span) -> None:
+        with self._lock:
+            self._spans.append(span)
+
+    @contextmanager
+    def span(self, name: str, category: str = "pyscaf", **args: Any) -> Iterator[None]:
+        """Record the time spent in the block (also when it raises)."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(Span.measured(name, category, start, **args))
+
+    def summary(self) -> list[SpanSummary]:
+        """Timings per (category, name), in order of first occurrence."""
+        summaries: dict[tuple[str, str], SpanSummary] = {}
+        for span in self.spans:
+            key = (span.category, span.name)
+            if key not in summaries:
+                summaries[key] = SpanSummary(name=span.name, category=span.category, count=0, total=0.0, max=0.0)
+            summary = summaries[key]
+            summary.count += 1
+            summary.total += span.duration
+            summary.max = max(summary.max, span.duration)
+        return list(summaries.values())
+
+    def chrome_trace(self) -> dict[str, Any]:
+        """
+        The spans in Chrome trace-event format (chrome://tracing, https://ui.perfetto.dev).
+
+        Every span is a complete ("X") event, in microseconds since the first span; each
+        thread gets its name as metadata, so concurrent actions show up on their own rows.
+        """
+        spans = self.spans
+        origin = spans[0].start if spans else 0.0
+        pid = os.getpid()
+        events: list[dict[str, Any]] = []
+        threads: dict[int, str] = {}
+        for span in spans:
+            threads.setdefault(span.thread_id, span.thread_name)
+            events.append(
+                {
+                    "name": span.name,
+                    "cat": span.category,
+                    "ph": "X",
+                    "ts": round((span.start - origin) * 1e6, 3),
+                    "dur": round(span.duration * 1e6, 3),
+                    "pid": pid,
+                    "tid": span.thread_id,
+                    "args": {key: str(value) for key, value in span.args.items()},
+                }
+            )
+        for thread_id, thread_name in threads.items():
+            events.append(
+                {"name": "thread_name", "ph": "M", "pid": pid, "tid": thread_id, "args": {"name": thread_name}}
+            )
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write_chrome_trace(self, path: str | Path) -> None:
+        """Write the Chrome trace to a JSON file."""
+        Path(path).write_text(json.dumps(self.chrome_trace(), indent=1), encoding="utf-8")
+        logger.debug(f"Trace written to {path}")
+
+
+# Tracer the spans of the process go to (None: tracing disabled)
+_active: Tracer | None = None
+
+
+def get_tracer() -> Tracer | None:
+    """Return the active tracer, if any."""
+    return _active
+
+
+@contextmanager
+def tracing(tracer: Tracer | None) -> Iterator[Tracer | None]:
+    """Make a tracer the active one for the duration of the block (None disables tracing)."""
+    global _active
+    previous, _active = _active, tracer
+    try:
+        yield tracer
+    finally:
+        _active = previous
+
+
+def span(name: str, category: str = "pyscaf", **args: Any) -> AbstractContextManager[None]:
+    """Record the time spent in the block in the active tracer (nothing is measured without one)."""
+    tracer = _active
+    if tracer is None:
+        return nullcontext()
+    return tracer.span(name, category, **args)
@@ -0,0 +1,67 @@
+"""
+Unit tests for the execution context (actions run without changing the process working directory).
+"""
+
+import io
+import os
+import sys
+import threading
+from pathlib import Path
+
+from rich.console import Console
+
+from pyscaf.actions.execution import ExecutionContext
+from pyscaf.actions.manager import ActionManager
+
+WRITE_CWD = "import os, pathlib; pathlib.Path('cwd.txt').write_text(os.getcwd() + '\\n' + os.environ.get('MARK', ''))"
+
+
+def test_run_uses_project_directory(tmp_path):
+    (tmp_path / "sub").mkdir()
+    execution = ExecutionContext(tmp_path, env={"VIRTUAL_ENV": "/elsewhere", "PATH": os.environ["PATH"]})
+    cwd = os.getcwd()
+
+    assert execution.run([sys.executable, "-c", WRITE_CWD]) == 0
+    assert execution.run([sys.executable, "-c", WRITE_CWD], cwd="sub", env={"MARK": "sub"}) == 0
+
+    assert os.getcwd() == cwd
+    assert (tmp_path / "cwd.txt").read_text() == f"{tmp_path}\n"
+    assert (tmp_path / "sub" / "cwd.txt").read_text() == f"{tmp_path / 'sub'}\nsub"
+    assert "VIRTUAL_ENV" not in execution.env
+    assert "MARK" not in execution.env
+
+
+def test_actions_share_the_manager_context(tmp_path):
+    output = Console(file=io.StringIO())
+    manager = ActionManager(tmp_path / "project", {"project_name": "project"}, env={"MARK": "1"}, output=output)
+
+    for action in manager.actions:
+        assert action.execution is manager.execution
+        assert action.console is output
+    assert manager.execution.project_path == tmp_path / "project"
+    assert manager.execution.env == {"MARK": "1"}
+
+
+def test_projects_built_concurrently_in_one_process(tmp_path):
+    output = Console(file=io.StringIO())
+    cwd = os.getcwd()
+    errors = []
+
+    def _build(name: str) -> None:
+        try:
+            context = {"project_name": name, "no_install": True, "versionning": False, "author": "Jane <j@x.org>"}
+            ActionManager(tmp_path / name, context, output=output).create_project()
+        except Exception as e:  # pragma: no cover - reported by the assertion below
+            errors.append(e)
+
+    threads = [threading.Thread(target=_build, args=(name,)) for name in ("alpha", "beta")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert os.getcwd() == cwd
+    for name in ("alpha", "beta"):
+        assert Path(tmp_path / name / "src" / name / "__init__.py").exists()
+        assert f'name = "{name}"' in (tmp_path / name / "pyproject.toml").read_text()
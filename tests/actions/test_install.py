@@ -0,0 +1,112 @@
+"""
+Unit tests for the install planner (one environment sync, then the commands with the venv interpreter).
+"""
+
+import io
+import os
+import sys
+import threading
+from pathlib import Path
+
+from rich.console import Console
+
+from pyscaf.actions.execution import ExecutionContext
+from pyscaf.actions.install import InstallCommand, InstallNeeds, InstallPlanner
+from pyscaf.tools.env_cache import EnvironmentCache
+
+# Stands for uv: records its arguments, "creates" the venv (a link to the current interpreter) and the lockfile
+FAKE_UV = f"""#!{sys.executable}
+import os, sys, time
+with open("uv-calls.txt", "a") as f:
+    f.write(" ".join(sys.argv[1:]) + "\\n")
+time.sleep(0.2)
+os.makedirs(".venv/bin", exist_ok=True)
+if not os.path.exists(".venv/bin/python"):
+    os.symlink({sys.executable!r}, ".venv/bin/python")
+if not os.path.exists("uv.lock"):
+    with open("uv.lock", "w") as f:
+        f.write('[[package]]\\nname = "first"\\nversion = "0.1.0"\\nsource = {{ editable = "." }}\\n')
+"""
+
+
+def make_execution(tmp_path: Path, name: str = "project") -> ExecutionContext:
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir(exist_ok=True)
+    uv = bin_dir / "uv"
+    uv.write_text(FAKE_UV)
+    uv.chmod(0o755)
+    project = tmp_path / name
+    project.mkdir()
+    (project / "pyproject.toml").write_text(f'[project]\nname = "{name}"\nversion = "0.1.0"\n')
+    env = {"PATH": f"{bin_dir}{os.pathsep}{os.environ['PATH']}"}
+    return ExecutionContext(project, env=env, console=Console(file=io.StringIO()))
+
+
+def write_file(name: str) -> InstallCommand:
+    return InstallCommand(args=["-c", f"open({name!r}, 'w').write(__import__('sys').executable)"])
+
+
+def test_one_sync_for_all_groups_then_venv_interpreter(tmp_path):
+    execution = make_execution(tmp_path)
+    planner = InstallPlanner(execution)
+    planner.add("core", InstallNeeds(groups={"dev"}))
+    planner.add("docs", InstallNeeds(groups={"docs"}, commands=[write_file("docs.txt")]))
+    planner.add("test", InstallNeeds(groups={"test", "dev"}, commands=[write_file("test.txt")]))
+    planner.add("license", InstallNeeds())
+
+    assert planner.sync_args() == ["uv", "sync", "--group", "docs", "--group", "test"]
+    threads = [threading.Thread(target=planner.run, args=(action_id,)) for action_id in ("core", "docs", "test")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert planner.run("license") == []
+
+    project = execution.project_path
+    assert (project / "uv-calls.txt").read_text() == "sync --group docs --group test\n"
+    for name in ("docs.txt", "test.txt"):
+        assert (project / name).read_text() == str(project / ".venv" / "bin" / "python")
+
+
+def test_failed_validation_skips_the_next_commands(tmp_path):
+    execution = make_execution(tmp_path)
+    planner = InstallPlanner(execution)
+    failing = InstallCommand(args=["-c", "raise SystemExit(2)"], validation=True)
+    planner.add("test", InstallNeeds(commands=[failing, write_file("never.txt")]))
+    planner.add("tool", InstallNeeds(commands=[InstallCommand(args=["no-such-command-pyscaf"], python=False)]))
+
+    # Commands that do not use the venv do not sync it
+    assert planner.run("tool") == [127]
+    assert not (execution.project_path / "uv-calls.txt").exists()
+    assert "no-such-command-pyscaf not found" in execution.console.file.getvalue()
+
+    assert planner.run("test") == [2]
+    assert not (execution.project_path / "never.txt").exists()
+
+
+def test_optional_command_failures_are_not_tracked(tmp_path):
+    execution = make_execution(tmp_path)
+    planner = InstallPlanner(execution)
+    failing = ["-c", "raise SystemExit(2)"]
+    planner.add("best-effort", InstallNeeds(commands=[InstallCommand(args=failing, optional=True)]))
+    planner.add("required", InstallNeeds(commands=[InstallCommand(args=failing)]))
+
+    for action_id, tracked in (("best-effort", 0), ("required", 1)):
+        with execution.track_failures() as failures:
+            assert planner.run(action_id) == [2]
+        assert len(failures) == tracked, action_id
+
+
+def test_environment_restored_from_cache(tmp_path):
+    cache = EnvironmentCache(tmp_path / "cache")
+    for name in ("first", "second"):
+        planner = InstallPlanner(make_execution(tmp_path, name), cache=cache)
+        planner.add("test", InstallNeeds(groups={"test"}, commands=[write_file("test.txt")]))
+        assert planner.run("test") == [0]
+
+    second = tmp_path / "second"
+    # Restored before the sync (which only installs the project): uv did not write this lockfile
+    assert (second / "uv.lock").read_text().startswith('[[package]]\nname = "second"\n')
+    assert "Environment restored from the cache" in planner.execution.console.file.getvalue()
+    assert (second / "uv-calls.txt").read_text() == "sync --group test\n"
+    assert (second / "test.txt").read_text() == str(second / ".venv" / "bin" / "python")
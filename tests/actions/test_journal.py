@@ -0,0 +1,114 @@
+"""
+The journal of a project creation, and init --resume continuing from the failed step.
+"""
+
+import os
+
+from click.testing import CliRunner
+
+from pyscaf.actions.journal import ProjectJournal
+from pyscaf.actions.license import LicenseAction
+from pyscaf.cli import cli
+
+OPTIONS = ["--testing", "--license", "apache", "--no-install"]
+
+
+def test_journal_round_trip(tmp_path):
+    journal = ProjectJournal(tmp_path)
+    journal.start({"project_name": "demo", "jobs": 4})
+    journal.complete("init", "core", "abc", 0.5)
+    journal.fail("install", "git", ["git commit -m init (exit 128)"])
+
+    state = ProjectJournal.read(tmp_path)
+    assert state.context == {"project_name": "demo"}  # runtime keys are not journaled
+    assert state.failed[0].commands == ["git commit -m init (exit 128)"]
+
+    resumed = ProjectJournal(tmp_path)
+    assert resumed.load()
+    assert resumed.done("init", "core", "abc") and not resumed.done("init", "core", "changed")
+    assert resumed.state.failed == []
+    assert ProjectJournal.read(tmp_path / "missing") is None
+
+    # The journal directory ignores itself, and goes away with the journal
+    assert (tmp_path / ".pyscaf" / ".gitignore").read_text() == "*\n"
+    resumed.discard()
+    assert ProjectJournal.read(tmp_path) is None and not (tmp_path / ".pyscaf").exists()
+
+
+def test_resume_skips_the_completed_steps(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    calls = []
+
+    def init(self, context):
+        calls.append(context["license"])
+        if len(calls) == 1:
+            raise RuntimeError("network down")
+
+    monkeypatch.setattr(LicenseAction, "init", init, raising=False)
+    runner = CliRunner()
+    result = runner.invoke(cli, ["init", "demo", "--jobs", "1", *OPTIONS])
+    assert result.exit_code != 0
+    state = ProjectJournal.read(tmp_path / "demo")
+    assert [(step.phase, step.action, step.error) for step in state.failed] == [
+        ("init", "license", "RuntimeError: network down")
+    ]
+    assert ("init", "core") in {(step.phase, step.action) for step in state.steps}
+
+    # The options of the first run are reused: only the failed step (and the ones after it) run again
+    result = runner.invoke(cli, ["init", "demo", "--resume", "--no-install"])
+    assert result.exit_code == 0, result.output
+    assert "Skipping CoreAction (init already done)" in result.output
+    assert calls == ["apache", "apache"]
+    assert not (tmp_path / "demo" / ".pyscaf").exists()  # discarded once the creation succeeded
+    assert (tmp_path / "demo" / "pyproject.toml").read_text().count("[project]") == 1
+
+
+def test_failed_command_fails_init(tmp_path, monkeypatch):
+    """A command exiting non-zero (no exception raised) fails the step, and init with it."""
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    (bin_dir / "uv").write_text("#!/bin/sh\nexit 3\n")
+    (bin_dir / "uv").chmod(0o755)
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    monkeypatch.chdir(tmp_path)
+
+    result = CliRunner().invoke(cli, ["init", "demo", "--jobs", "1", *OPTIONS])
+    assert result.exit_code == 1, result.output
+    assert "Some steps failed: core (init)" in result.output
+    assert "Project creation complete!" not in result.output
+    state = ProjectJournal.read(tmp_path / "demo")
+    assert state.failed[0].commands[0].endswith("(exit 3)")
+
+
+def test_failed_init_skips_the_install_phase(tmp_path, monkeypatch):
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    (bin_dir / "uv").write_text("#!/bin/sh\nexit 3\n")
+    (bin_dir / "uv").chmod(0o755)
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    monkeypatch.chdir(tmp_path)
+
+    result = CliRunner().invoke(cli, ["init", "demo", "--jobs", "1", "--testing", "--license", "apache"])
+    assert result.exit_code == 1, result.output
+    assert "Skipping installation: some steps failed." in result.output
+    assert "Installing dependencies for" not in result.output
+    assert {step.phase for step in ProjectJournal.read(tmp_path / "demo").failed} == {"init"}
+
+
+def test_existing_pyproject_is_only_kept_when_resuming(tmp_path, monkeypatch):
+    """Without --resume, core runs uv init as usual, which refuses an existing pyproject.toml."""
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "demo").mkdir()
+    (tmp_path / "demo" / "pyproject.toml").write_text('[project]\nname = "other"\n')
+
+    result = CliRunner().invoke(cli, ["init", "demo", "--jobs", "1", *OPTIONS])
+    assert result.exit_code == 1, result.output
+    assert "Some steps failed: core (init)" in result.output
+    assert ProjectJournal.read(tmp_path / "demo").failed[0].commands[0].startswith("uv init")
+
+
+def test_resume_without_journal_is_a_usage_error(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    result = CliRunner().invoke(cli, ["init", "demo", "--resume"])
+    assert result.exit_code == 2
+    assert "No journal to resume from" in result.output
@@ -0,0 +1,88 @@
+"""
+Tests for the action registry and its persistent manifest.
+"""
+
+import json
+
+from pyscaf import __version__
+from pyscaf.actions import discover_actions
+from pyscaf.actions import registry as registry_module
+from pyscaf.actions.registry import ActionRegistry, get_registry
+
+EXPECTED_IDS = {"core", "git", "license", "documentation", "jupyter", "jupytertools", "test", "semanticrelease"}
+
+
+def test_scan_writes_manifest(tmp_path):
+    """A cold registry scans the actions and persists a manifest."""
+    manifest_path = tmp_path / "manifest.json"
+    registry = ActionRegistry(manifest_path=manifest_path)
+
+    entries = registry.entries()
+
+    assert {entry.id for entry in entries} == EXPECTED_IDS
+    data = json.loads(manifest_path.read_text())
+    assert data["version"] == __version__
+    assert {entry["id"] for entry in data["actions"]} == EXPECTED_IDS
+
+    git = registry.get_entry("git")
+    assert git.depends == {"core"}
+    assert git.run_preferably_after == "core"
+    assert [opt.name for opt in git.cli_options] == ["--versionning", "--remote-url", "--git-host"]
+    assert "--remote-url" in git.dynamic_options
+
+
+def test_manifest_is_read_without_scanning(tmp_path, monkeypatch):
+    """A valid manifest is used instead of importing the action modules."""
+    manifest_path = tmp_path / "manifest.json"
+    expected = ActionRegistry(manifest_path=manifest_path).entries()
+
+    def fail_scan(self):
+        raise AssertionError("actions were scanned despite a valid manifest")
+
+    monkeypatch.setattr(ActionRegistry, "_scan", fail_scan)
+    entries = ActionRegistry(manifest_path=manifest_path).entries()
+
+    assert [entry.id for entry in entries] == [entry.id for entry in expected]
+    core = next(entry for entry in entries if entry.id == "core")
+    # Callable defaults are not serialized, they stay on the class
+    assert core.cli_options[0].default is None
+    assert "--author" in core.dynamic_options
+
+
+def test_stale_manifest_is_rescanned(tmp_path):
+    """A manifest from another version or with other mtimes is ignored and rewritten."""
+    manifest_path = tmp_path / "manifest.json"
+    ActionRegistry(manifest_path=manifest_path).entries()
+
+    for field, value in [("version", "0.0.0"), ("fingerprint", {})]:
+        data = json.loads(manifest_path.read_text())
+        data[field] = value
+        data["actions"] = []
+        manifest_path.write_text(json.dumps(data))
+
+        entries = ActionRegistry(manifest_path=manifest_path).entries()
+
+        assert {entry.id for entry in entries} == EXPECTED_IDS
+        assert json.loads(manifest_path.read_text())[field] != value
+
+
+def test_load_returns_action_class(tmp_path):
+    """Entries resolve to the real action classes."""
+    registry = ActionRegistry(manifest_path=tmp_path / "manifest.json")
+
+    action_cls = registry.load("core")
+
+    assert action_cls.__name__ == "CoreAction"
+    assert callable(action_cls.cli_options[0].default)
+
+
+def test_discover_actions_uses_process_registry(tmp_path, monkeypatch):
+    """discover_actions() returns the classes cached by the process-wide registry."""
+    monkeypatch.setenv("PYSCAF_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(registry_module, "_registry", None)
+
+    assert get_registry() is get_registry()
+    first = discover_actions()
+    assert discover_actions() == first
+    assert {cls.__name__ for cls in first} >= {"CoreAction", "GitAction"}
+    assert (tmp_path / "action_manifest.json").exists()
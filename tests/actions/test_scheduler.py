@@ -0,0 +1,129 @@
+"""
+Unit tests for the phase scheduler (concurrent execution of the actions of a phase).
+"""
+
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from pyscaf.actions import Action
+from pyscaf.actions.scheduler import EXCLUSIVE, PhaseScheduler, PhaseTask
+
+
+def make_tasks(specs, log, barrier=None):
+    """specs: [(id, depends, resources)]; each task logs its start/end (and waits on barrier if given)."""
+    tasks = []
+    for task_id, depends, resources in specs:
+
+        def _run(task_id=task_id):
+            log.append(f"start {task_id}")
+            if barrier is not None and task_id in barrier[1]:
+                barrier[0].wait(timeout=5)
+            time.sleep(0.01)
+            log.append(f"end {task_id}")
+
+        tasks.append(PhaseTask(id=task_id, depends=depends, resources=resources, run=_run))
+    return tasks
+
+
+def test_predecessors():
+    log = []
+    tasks = make_tasks(
+        [
+            ("core", set(), {EXCLUSIVE}),
+            ("git", {"core"}, {".git"}),
+            ("license", {"core"}, {"LICENSE"}),
+            ("documentation", {"core"}, {"pyproject.toml"}),
+            ("semanticrelease", {"core", "git"}, {"pyproject.toml"}),
+        ],
+        log,
+    )
+
+    assert PhaseScheduler.predecessors(tasks) == [set(), {0}, {0}, {0}, {0, 1, 3}]
+
+
+def test_independent_tasks_overlap():
+    log = []
+    barrier = (threading.Barrier(3), {"git", "license", "documentation"})
+    tasks = make_tasks(
+        [
+            ("core", set(), set()),
+            ("git", {"core"}, {".git"}),
+            ("license", {"core"}, set()),
+            ("documentation", {"core"}, {"pyproject.toml"}),
+        ],
+        log,
+        barrier,
+    )
+
+    # The three tasks after core only get through the barrier if they run at the same time
+    PhaseScheduler(jobs=4).run(tasks)
+
+    assert log[:2] == ["start core", "end core"]
+    assert sorted(log[2:5]) == ["start documentation", "start git", "start license"]
+
+
+def test_shared_resources_keep_preference_order():
+    log = []
+    tasks = make_tasks(
+        [
+            ("documentation", set(), {"pyproject.toml"}),
+            ("license", set(), set()),
+            ("semanticrelease", set(), {"pyproject.toml"}),
+            ("git", set(), {EXCLUSIVE}),
+            ("test", set(), set()),
+        ],
+        log,
+    )
+
+    PhaseScheduler(jobs=4).run(tasks)
+
+    assert log.index("end documentation") < log.index("start semanticrelease")
+    assert log.index("end semanticrelease") < log.index("start git")
+    assert log.index("end license") < log.index("start git")
+    assert log.index("end git") < log.index("start test")
+
+
+def test_error_stops_the_phase():
+    log = []
+
+    def _fail():
+        log.append("start core")
+        raise RuntimeError("uv not found")
+
+    tasks = [PhaseTask(id="core", run=_fail)] + make_tasks([("git", {"core"}, set())], log)
+
+    with pytest.raises(RuntimeError, match="uv not found"):
+        PhaseScheduler(jobs=4).run(tasks)
+    assert log == ["start core"]
+
+
+def test_single_job_runs_serially_on_calling_thread():
+    threads = []
+    tasks = [
+        PhaseTask(id=task_id, run=lambda task_id=task_id: threads.append((task_id, threading.current_thread())))
+        for task_id in ("core", "license", "git")
+    ]
+
+    PhaseScheduler(jobs=1).run(tasks)
+
+    assert threads == [(task_id, threading.current_thread()) for task_id in ("core", "license", "git")]
+
+
+def test_default_action_resources():
+    class PlainAction(Action):
+        pass
+
+    class CustomInstallAction(Action):
+        def install(self, context: dict) -> None:
+            pass
+
+    plain = PlainAction(Path("."))
+    custom = CustomInstallAction(Path("."))
+
+    assert plain.resources("skeleton", {}) == set()
+    assert plain.resources("init", {}) == {"pyproject.toml"}
+    assert plain.resources("install", {}) == set()
+    assert custom.resources("install", {}) == {EXCLUSIVE}
@@ -0,0 +1,71 @@
+"""
+Projects restored from the snapshot cache are identical to generated ones.
+"""
+
+import os
+from pathlib import Path
+
+from click.testing import CliRunner
+
+from pyscaf.actions.snapshot import project_values
+from pyscaf.cli import cli
+
+OPTIONS = ["--testing", "--license", "apache", "--no-install"]
+
+
+def tree(root: Path) -> dict[str, tuple[int, bytes]]:
+    files = {}
+    for directory, dirnames, filenames in os.walk(root):
+        dirnames[:] = [name for name in dirnames if name != ".pyscaf"]  # journal of the creation
+        for name in filenames:
+            path = Path(directory, name)
+            files[path.relative_to(root).as_posix()] = (path.stat().st_mode, path.read_bytes())
+    return files
+
+
+def init(monkeypatch, directory: Path, name: str, author: str, remote: str, snapshot: bool) -> None:
+    directory.mkdir(parents=True, exist_ok=True)
+    monkeypatch.chdir(directory)
+    args = ["init", name, "--author", author, "--remote-url", remote, *OPTIONS]
+    result = CliRunner().invoke(cli, [*args, "--snapshot-cache"] if snapshot else args)
+    assert result.exit_code == 0, result.output
+
+
+def test_restored_project_matches_generated_one(tmp_path, monkeypatch):
+    monkeypatch.setenv("PYSCAF_CACHE_DIR", str(tmp_path / "cache"))
+    other = ("other", "Ada L <ada@x.org>", "https://github.com/x/other.git")
+    project = ("My_Proj", "Bob <bob@y.org>", "https://github.com/x/my-proj.git")
+    # The first project builds the snapshot, the second one is restored from it
+    init(monkeypatch, tmp_path / "first", *other, snapshot=True)
+    init(monkeypatch, tmp_path / "restored", *project, snapshot=True)
+    init(monkeypatch, tmp_path / "generated", *project, snapshot=False)
+
+    assert len(list((tmp_path / "cache" / "snapshots").glob("*/entry.json"))) == 1
+    restored = tree(tmp_path / "restored" / "My_Proj")
+    assert "src/My_Proj/__init__.py" in restored and ".git/config" in restored
+    assert restored == tree(tmp_path / "generated" / "My_Proj")
+
+
+def test_failed_snapshot_build_fails_the_project(tmp_path, monkeypatch):
+    """The steps of a failed snapshot build are not stored: the project fails on its own steps."""
+    monkeypatch.setenv("PYSCAF_CACHE_DIR", str(tmp_path / "cache"))
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    (bin_dir / "uv").write_text("#!/bin/sh\nexit 3\n")
+    (bin_dir / "uv").chmod(0o755)
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    monkeypatch.chdir(tmp_path)
+
+    result = CliRunner().invoke(cli, ["init", "demo", "--jobs", "1", "--snapshot-cache", *OPTIONS])
+    assert result.exit_code == 1, result.output
+    assert "Some steps failed: core (init)" in result.output
+    assert not list((tmp_path / "cache" / "snapshots").glob("*/entry.json"))
+    assert not list((tmp_path / "cache" / "snapshots").glob(".build-*"))
+
+
+def test_values_needing_escapes_are_not_snapshotted(tmp_path):
+    assert project_values({"project_name": "demo", "author": 'A "B" <a@b.c>'}, tmp_path) is None
+    assert project_values({"project_name": "sub/demo"}, tmp_path) is None
+    values = project_values({"project_name": "My_Proj", "author": "Ada L <ada@x.org>"}, tmp_path)
+    assert (values.curated_name, values.package_name, values.author_name) == ("My_Proj", "my-proj", "Ada L")
+    assert values.shape() == {"author_name": True, "author_email": True, "remote_url": False}
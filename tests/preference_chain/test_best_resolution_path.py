@@ -0,0 +1,139 @@
+import itertools
+import os
+import random
+import time
+
+import pytest
+
+from pyscaf.preference_chain import best_execution_order
+from pyscaf.preference_chain.chain import (
+    build_chains,
+    compute_all_resolution_pathes,
+    compute_best_resolution_path,
+    compute_path_score,
+    extend_nodes,
+)
+from pyscaf.preference_chain.dependency_loader import load_and_complete_dependencies
+from pyscaf.preference_chain.model import Node
+from pyscaf.preference_chain.search_budget_exceeded_error import SearchBudgetExceededError
+
+TEST_DATA_DIR = os.path.join(os.path.dirname(__file__), "test_data")
+
+
+def reference_best_path(chains):
+    """Former implementation: sort every valid permutation by score and keep the first one."""
+    valid_paths = []
+    for path in itertools.permutations(chains):
+        previous_ids = set()
+        for chain in path:
+            if not chain.depends.issubset(previous_ids):
+                break
+            previous_ids.update(chain.ids)
+        else:
+            valid_paths.append(list(path))
+    if not valid_paths:
+        return None
+    valid_paths.sort(key=lambda path: -compute_path_score(path))
+    return valid_paths[0]
+
+
+def random_nodes(rng: random.Random, size: int) -> list[Node]:
+    """Random DAG where each node depends on up to two earlier nodes, with an 'after' preference."""
+    ids = [f"n{i}" for i in range(size)]
+    nodes = []
+    for i, node_id in enumerate(ids):
+        depends = set(rng.sample(ids[:i], k=min(i, rng.choice([0, 1, 1, 2]))))
+        after = sorted(depends)[0] if depends else None
+        nodes.append(Node(id=node_id, depends=depends, after=after))
+    rng.shuffle(nodes)
+    return nodes
+
+
+class TestBestResolutionPath:
+    """compute_best_resolution_path must match the exhaustive search (score and tie-breaking)."""
+
+    def test_matches_exhaustive_search_on_random_graphs(self):
+        rng = random.Random(42)
+        for _ in range(300):
+            chains = build_chains(extend_nodes(random_nodes(rng, rng.randint(1, 8))))
+            if len(chains) > 7:
+                continue
+            expected = reference_best_path(chains)
+            result = compute_best_resolution_path(chains)
+            assert [chain.ids for chain in result] == [chain.ids for chain in expected]
+
+    def test_matches_exhaustive_search_on_test_data(self):
+        for filename in sorted(os.listdir(TEST_DATA_DIR)):
+            if not filename.endswith(".yaml") or "circular" in filename:
+                continue
+            chains = build_chains(extend_nodes(load_and_complete_dependencies(os.path.join(TEST_DATA_DIR, filename))))
+            expected = reference_best_path(chains)
+            result = compute_best_resolution_path(chains)
+            assert [chain.ids for chain in result] == [chain.ids for chain in expected], filename
+
+    def test_all_resolution_pathes_keeps_permutation_order(self):
+        rng = random.Random(7)
+        for _ in range(50):
+            chains = build_chains(extend_nodes(random_nodes(rng, rng.randint(1, 6))))
+            expected = [
+                list(path)
+                for path in itertools.permutations(chains)
+                if all(
+                    chain.depends.issubset({node_id for prev in path[:i] for node_id in prev.ids})
+                    for i, chain in enumerate(path)
+                )
+            ]
+            assert list(compute_all_resolution_pathes(chains)) == expected
+
+    def test_unknown_dependency_has_no_path(self):
+        chains = build_chains(extend_nodes([Node(id="A", depends={"missing"}, after="missing")]))
+        assert compute_best_resolution_path(chains) is None
+        assert list(compute_all_resolution_pathes(chains)) == []
+
+    def test_empty_chains(self):
+        assert compute_best_resolution_path([]) == []
+
+    def test_many_independent_actions(self):
+        """40 independent actions: every order has the same score, the input order wins."""
+        nodes = [Node(id=f"action{i:02d}") for i in range(40)]
+        start = time.perf_counter()
+        result = best_execution_order(nodes)
+        assert time.perf_counter() - start < 5
+        assert result == [node.id for node in nodes]
+
+    def test_many_plugins_with_preferences(self):
+        """20 roots with one plugin each: every plugin ends up right after its root."""
+        nodes = []
+        for i in range(20):
+            nodes.append(Node(id=f"root{i}"))
+            nodes.append(Node(id=f"plugin{i}", depends={f"root{i}", "root0"}, after=f"root{i}"))
+        start = time.perf_counter()
+        result = best_execution_order(nodes)
+        assert time.perf_counter() - start < 5
+        for i in range(20):
+            assert result.index(f"plugin{i}") == result.index(f"root{i}") + 1
+
+    def test_search_budget_is_explicit(self):
+        """The search is exact unless bounded; at its bound it raises, with a valid greedy path."""
+        rng = random.Random(3)
+        for _ in range(50):
+            chains = build_chains(extend_nodes(random_nodes(rng, rng.randint(2, 12))))
+            best = compute_best_resolution_path(chains)
+            # Smallest budget the search fits in: exactly that many states give the same path
+            needed = next(states for states in itertools.count() if _fits(chains, states))
+            assert compute_best_resolution_path(chains, max_states=needed) == best
+            with pytest.raises(SearchBudgetExceededError) as error:
+                compute_best_resolution_path(chains, max_states=needed - 1)
+            assert len(error.value.greedy_path) == len(chains)
+            previous_ids = set()
+            for chain in error.value.greedy_path:
+                assert chain.depends.issubset(previous_ids)
+                previous_ids.update(chain.ids)
+
+
+def _fits(chains, max_states: int) -> bool:
+    try:
+        compute_best_resolution_path(chains, max_states=max_states)
+    except SearchBudgetExceededError:
+        return False
+    return True
@@ -0,0 +1,104 @@
+import random
+import time
+
+from pyscaf.preference_chain.chain import build_chains, extend_nodes
+from pyscaf.preference_chain.graph import ChainGraph
+from pyscaf.preference_chain.model import ChainLink, ExtendedNode, Node
+
+
+def random_nodes(rng: random.Random, size: int) -> list[Node]:
+    """Random DAG where each node depends on up to three earlier nodes, with an 'after' preference."""
+    ids = [f"n{i}" for i in range(size)]
+    nodes = []
+    for i, node_id in enumerate(ids):
+        depends = set(rng.sample(ids[:i], k=min(i, rng.choice([0, 1, 1, 2, 3]))))
+        after = rng.choice(sorted(depends)) if depends else None
+        nodes.append(Node(id=node_id, depends=depends, after=after))
+    rng.shuffle(nodes)
+    return nodes
+
+
+def recomputed_aggregates(chain: ChainLink) -> tuple:
+    """Aggregates computed from the children, the way ChainLink used to compute them on every access."""
+    ids = [node.id for node in chain.children]
+    return (
+        ids,
+        set().union(*[node.depends for node in chain.children]) - set(ids),
+        set().union(*[node.external_dependencies for node in chain.children]) - set(ids),
+        set().union(*[node.referenced_by for node in chain.children]),
+    )
+
+
+class TestExtendNodes:
+    def test_builds_lightweight_copies(self):
+        nodes = [Node(id="A"), Node(id="B", depends={"A"}, after="A")]
+        extended = extend_nodes(nodes)
+
+        assert [type(node) for node in extended] == [ExtendedNode, ExtendedNode]
+        assert not hasattr(extended[0], "__dict__")  # slotted
+        assert extended[0].referenced_by == {"B"}
+        extended[1].depends.add("C")
+        assert nodes[1].depends == {"A"}
+
+
+class TestChainLinkAggregates:
+    def test_append_and_extend(self):
+        a = ExtendedNode(id="A", referenced_by={"B"})
+        b = ExtendedNode(id="B", depends={"A", "X"}, after="A", referenced_by={"C"})
+        c = ExtendedNode(id="C", depends={"B", "Y"}, after="B")
+        first = ChainLink(children=[a], head=a, tail=a)
+        first.append(b)
+        second = ChainLink(children=[c], head=c, tail=c)
+        assert second.depends == {"B", "Y"}
+
+        first.extend(second)
+
+        assert first.ids == ["A", "B", "C"]
+        assert first.depends == {"X", "Y"}
+        assert first.external_dependencies == {"X", "Y"}
+        assert first.referenced_by == {"B", "C"}
+
+    def test_aggregates_match_children_after_build(self):
+        rng = random.Random(5)
+        for _ in range(200):
+            for chain in build_chains(extend_nodes(random_nodes(rng, rng.randint(1, 30)))):
+                ids, depends, external_dependencies, referenced_by = recomputed_aggregates(chain)
+                assert chain.ids == ids
+                assert chain.depends == depends
+                assert chain.external_dependencies == external_dependencies
+                assert chain.referenced_by == referenced_by
+
+
+class TestChainGraph:
+    def test_lookup_tables_follow_chains(self):
+        rng = random.Random(11)
+        for _ in range(100):
+            graph = ChainGraph()
+            nodes = extend_nodes(random_nodes(rng, rng.randint(1, 20)))
+            for node in nodes:
+                graph.add(node)
+            for chain in graph.chains[1:]:
+                graph.set_tail(graph.chains[0], chain.tail)
+                graph.remove(chain)
+                graph.extend(graph.chains[0], chain)
+            (merged,) = graph.chains
+            assert all(graph.chain_by_node_id[node.id] is merged for node in nodes)
+            assert graph.chains_by_tail == {merged.tail.id: [merged]}
+            assert graph.chains_by_head == {merged.head.id: [merged]}
+
+    def test_candidates_keep_creation_order(self):
+        graph = ChainGraph()
+        a, b, c = (graph.add(ExtendedNode(id=node_id)) for node_id in "ABC")
+        graph.set_tail(a, ExtendedNode(id="C2"))
+        assert graph.candidates("C", "C2") == [a, c]
+        assert graph.candidates("B", None) == [b]
+        assert graph.candidates(None, None) == []
+
+    def test_build_chains_scales_linearly(self):
+        """10,000 nodes in a single 'after' chain (the chain lookups used to be quadratic)."""
+        nodes = [Node(id="n0")] + [Node(id=f"n{i}", depends={f"n{i - 1}"}, after=f"n{i - 1}") for i in range(1, 10000)]
+        start = time.perf_counter()
+        chains = build_chains(extend_nodes(nodes))
+        assert time.perf_counter() - start < 10
+        assert len(chains) == 1
+        assert chains[0].ids == [node.id for node in nodes]
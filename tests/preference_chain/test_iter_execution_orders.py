@@ -0,0 +1,73 @@
+import random
+import time
+
+import pytest
+
+from pyscaf.preference_chain import (
+    CircularDependencyError,
+    best_execution_order,
+    iter_execution_orders,
+    iter_scored_execution_orders,
+)
+from pyscaf.preference_chain.chain import (
+    build_chains,
+    compute_all_resolution_pathes,
+    compute_path_score,
+    extend_nodes,
+    iter_resolution_paths_by_score,
+)
+from pyscaf.preference_chain.model import Node
+
+from .test_best_resolution_path import random_nodes
+
+
+class TestIterExecutionOrders:
+    """iter_execution_orders must stream the sorted list of every valid path, lazily."""
+
+    def test_matches_sorted_enumeration(self):
+        rng = random.Random(13)
+        for _ in range(200):
+            chains = build_chains(extend_nodes(random_nodes(rng, rng.randint(1, 7))))
+            if len(chains) > 6:
+                continue
+            expected = sorted(compute_all_resolution_pathes(chains), key=lambda path: -compute_path_score(path))
+            result = list(iter_resolution_paths_by_score(chains))
+            assert [[chain.ids for chain in path] for _, path in result] == [
+                [chain.ids for chain in path] for path in expected
+            ]
+            assert [score for score, _ in result] == [compute_path_score(path) for path in expected]
+
+    def test_first_order_is_best_execution_order(self):
+        rng = random.Random(17)
+        for _ in range(100):
+            nodes = random_nodes(rng, rng.randint(1, 10))
+            assert next(iter_execution_orders(nodes)) == best_execution_order(nodes)
+
+    def test_top_k(self):
+        nodes = [
+            Node(id="A"),
+            Node(id="B", depends={"A"}, after="A"),
+            Node(id="C", depends={"A"}, after="A"),
+            Node(id="D", depends={"B", "C"}, after="B"),
+        ]
+
+        # A -> C and B -> D keep two 'after' preferences, A -> B -> C -> D only one
+        assert list(iter_execution_orders(nodes, k=1)) == [["A", "C", "B", "D"]]
+        assert list(iter_scored_execution_orders(nodes)) == [
+            (-1, ["A", "C", "B", "D"]),
+            (-2, ["A", "B", "C", "D"]),
+        ]
+
+    def test_early_exit_on_many_orders(self):
+        """30 independent actions have 30! orders: the first three come without enumerating them."""
+        nodes = [Node(id=f"action{i:02d}") for i in range(30)]
+        start = time.perf_counter()
+        orders = list(iter_execution_orders(nodes, k=3))
+        assert time.perf_counter() - start < 5
+        ids = [node.id for node in nodes]
+        assert orders == [ids, ids[:-2] + [ids[-1], ids[-2]], ids[:-3] + [ids[-2], ids[-3], ids[-1]]]
+
+    def test_circular_dependency(self):
+        nodes = [Node(id="A", depends={"B"}, after="B"), Node(id="B", depends={"A"}, after="A")]
+        with pytest.raises(CircularDependencyError):
+            next(iter_execution_orders(nodes))
@@ -0,0 +1,125 @@
+"""
+Tests for batch project generation (pyscaf batch).
+"""
+
+import json
+import os
+
+import pytest
+from click.testing import CliRunner
+
+from pyscaf.actions.manager import determine_action_order
+from pyscaf.actions.registry import get_registry
+from pyscaf.batch import BatchError, BatchProject, generate_project, load_manifest, run_batch
+from pyscaf.cli import cli, fill_default_context
+
+
+@pytest.fixture
+def cli_options():
+    return [opt for entry in get_registry().entries() for opt in entry.cli_options]
+
+
+def test_manifest_formats_give_the_same_projects(tmp_path, cli_options):
+    (tmp_path / "m.toml").write_text(
+        '[defaults]\nlicense = "MIT"\n\n'
+        '[[projects]]\nproject_name = "stud-a"\nversionning = false\n\n'
+        '[[projects]]\nproject_name = "stud-b"\nlicense = "apache"\nremote-url = "https://github.com/x/b.git"\n'
+    )
+    (tmp_path / "m.yaml").write_text(
+        "- {project_name: stud-a, license: mit, versionning: false}\n"
+        "- {project_name: stud-b, license: apache, --remote-url: 'https://github.com/x/b.git'}\n"
+    )
+    (tmp_path / "m.csv").write_text(
+        "project_name,license,versionning,remote_url\nstud-a,mit,no,\nstud-b,apache,,https://github.com/x/b.git\n"
+    )
+    expected = [
+        BatchProject(project_name="stud-a", options={"license": "mit", "versionning": False}),
+        BatchProject(project_name="stud-b", options={"license": "apache", "remote_url": "https://github.com/x/b.git"}),
+    ]
+
+    for name in ("m.toml", "m.yaml", "m.csv"):
+        assert load_manifest(tmp_path / name, cli_options) == expected, name
+
+
+@pytest.mark.parametrize(
+    "content, message",
+    [
+        ("project_name,colour\na,red\n", "unknown option"),
+        ("project_name\na\na\n", "duplicate project 'a'"),
+        ("project_name,license\na,gpl-9\n", "Invalid choice for 'license'"),
+        ("project_name,versionning\na,maybe\n", "Invalid boolean"),
+        ("license\nmit\n", "has no project_name"),
+        ("project_name\nsub/x\n", "invalid project_name 'sub/x'"),
+        ("project_name\n..\n", "invalid project_name '..'"),
+        ("project_name\n/tmp/x\n", "invalid project_name '/tmp/x'"),
+    ],
+)
+def test_invalid_manifests(tmp_path, cli_options, content, message):
+    manifest = tmp_path / "m.csv"
+    manifest.write_text(content)
+    with pytest.raises(BatchError, match=message):
+        load_manifest(manifest, cli_options)
+
+
+def test_batch_command_generates_every_project(tmp_path):
+    manifest = tmp_path / "m.csv"
+    manifest.write_text("project_name,license,versionning\nstud-a,mit,false\nstud-b,apache,false\nstud-c,,false\n")
+    report_path = tmp_path / "report.json"
+
+    result = CliRunner().invoke(
+        cli,
+        ["batch", str(manifest), "-o", str(tmp_path / "out"), "--no-install", "-w", "2", "--report", str(report_path)],
+    )
+
+    assert result.exit_code == 0, result.output
+    report = json.loads(report_path.read_text())
+    assert [r["project_name"] for r in report["results"]] == ["stud-a", "stud-b", "stud-c"]
+    assert report["failed"] == 0
+    assert all(r["success"] and r["duration"] > 0 for r in report["results"])
+    assert "MIT License" in (tmp_path / "out" / "stud-a" / "LICENSE").read_text()
+    assert "Apache License" in (tmp_path / "out" / "stud-b" / "LICENSE").read_text()
+    assert 'name = "stud-c"' in (tmp_path / "out" / "stud-c" / "pyproject.toml").read_text()
+    # The output of each project (and of its commands) goes to its own log
+    assert "Project creation complete!" in (tmp_path / "out" / ".pyscaf-batch" / "stud-b.log").read_text()
+
+
+def test_batch_command_rejects_invalid_manifest(tmp_path):
+    manifest = tmp_path / "m.csv"
+    manifest.write_text("project_name,colour\na,red\n")
+
+    result = CliRunner().invoke(cli, ["batch", str(manifest), "-o", str(tmp_path / "out")])
+
+    assert result.exit_code == 2
+    assert "unknown option(s) for 'a': colour" in result.output
+    assert not (tmp_path / "out").exists()
+
+
+def test_failed_command_fails_the_project(tmp_path):
+    """A command exiting non-zero raises nothing, but the project is reported as failed, with its steps."""
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    (bin_dir / "uv").write_text("#!/bin/sh\nexit 3\n")
+    (bin_dir / "uv").chmod(0o755)
+    env = {**os.environ, "PATH": f"{bin_dir}{os.pathsep}{os.environ['PATH']}"}
+    context = fill_default_context({"interactive": False, "no_install": True, "jobs": 1})
+
+    result = generate_project(
+        BatchProject(project_name="stud-a"), context, tmp_path, tmp_path, env=env, order=determine_action_order()
+    )
+
+    assert not result.success
+    assert result.error.startswith("failed steps: core (init)")
+
+
+def test_failing_project_does_not_stop_the_batch(tmp_path):
+    context = fill_default_context({"interactive": False, "no_install": True, "jobs": 1})
+    projects = [BatchProject(project_name="stud-a"), BatchProject(project_name="stud-b")]
+
+    # The log of a project that cannot be written fails that project only
+    result = generate_project(projects[0], context, tmp_path, tmp_path / "missing", order=determine_action_order())
+    assert not result.success and result.error.startswith("FileNotFoundError")
+
+    # So does a project that cannot be sent to its worker
+    report = run_batch(projects, {**context, "unpicklable": lambda: None}, determine_action_order(), tmp_path)
+    assert [result.project_name for result in report.failed] == ["stud-a", "stud-b"]
+    assert all("pickle" in result.error.lower() for result in report.failed)
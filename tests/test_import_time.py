@@ -0,0 +1,81 @@
+"""
+Import-time budget tests for the pyscaf CLI (based on `python -X importtime`).
+"""
+
+import importlib.util
+import os
+import pkgutil
+import subprocess
+import sys
+
+# Cumulative import time allowed for pyscaf.cli, in milliseconds (override for slow machines)
+IMPORT_BUDGET_MS = int(os.environ.get("PYSCAF_IMPORT_BUDGET_MS", "500"))
+
+HEAVY_MODULES = {"questionary", "tomlkit", "tomli_w"}
+# Every action lives in a sub-package of pyscaf.actions (listed without importing them)
+ACTION_MODULES = {
+    f"pyscaf.actions.{info.name}"
+    for info in pkgutil.iter_modules(importlib.util.find_spec("pyscaf.actions").submodule_search_locations)
+    if info.ispkg
+}
+
+
+def run_with_importtime(args: list[str], cache_dir) -> dict[str, int]:
+    """Run the pyscaf CLI with -X importtime and return {module: cumulative import time in us}."""
+    code = f"import sys; sys.argv = ['pyscaf'] + {args!r}; from pyscaf.cli import main; main()"
+    env = dict(os.environ, PYSCAF_CACHE_DIR=str(cache_dir))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True, env=env, timeout=60
+    )
+    assert result.returncode == 0, result.stderr
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        modules[name.strip()] = int(cumulative)
+    return modules
+
+
+def test_version_does_not_import_actions(tmp_path):
+    """`pyscaf --version` only needs click and rich."""
+    modules = run_with_importtime(["--version"], tmp_path)
+
+    assert not HEAVY_MODULES & modules.keys()
+    assert "pydantic" not in modules
+    assert "pyscaf.actions" not in modules
+
+
+def test_help_does_not_import_actions(tmp_path):
+    """`pyscaf --help` lists the commands without building the action options."""
+    modules = run_with_importtime(["--help"], tmp_path)
+
+    assert not HEAVY_MODULES & modules.keys()
+    assert "pyscaf.actions" not in modules
+
+
+def test_action_modules_are_listed():
+    """The lazy-import check covers every action package, not a hand-picked subset."""
+    assert {
+        "pyscaf.actions.core",
+        "pyscaf.actions.documentation",
+        "pyscaf.actions.jupyter_tools",
+        "pyscaf.actions.semantic-release",
+    } <= ACTION_MODULES
+
+
+def test_init_help_uses_manifest(tmp_path):
+    """With a warm manifest, `pyscaf init --help` builds its options without importing any action."""
+    run_with_importtime(["init", "--help"], tmp_path)
+    modules = run_with_importtime(["init", "--help"], tmp_path)
+
+    assert "pyscaf.actions.registry" in modules
+    assert not HEAVY_MODULES & modules.keys()
+    assert not ACTION_MODULES & modules.keys()
+
+
+def test_cli_import_budget(tmp_path):
+    """Importing pyscaf.cli stays within the import-time budget."""
+    modules = run_with_importtime(["--version"], tmp_path)
+
+    assert modules["pyscaf.cli"] / 1000 < IMPORT_BUDGET_MS
@@ -0,0 +1,95 @@
+"""
+Tests for server mode (pyscaf serve).
+"""
+
+import os
+import socket
+import threading
+
+import pytest
+
+from pyscaf.actions.manager import determine_action_order
+from pyscaf.cli import fill_default_context
+from pyscaf.serve import ProjectServer, SocketServer, send_requests
+
+
+@pytest.fixture
+def server(tmp_path):
+    context = fill_default_context({"interactive": False, "no_install": True, "jobs": 1})
+    projects = ProjectServer(context, determine_action_order(), tmp_path / "out", workers=2)
+    projects.warm_up()
+    server = SocketServer(tmp_path / "pyscaf.sock", projects)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    projects.close()
+
+
+def test_requests_stream_their_events(tmp_path, server):
+    requests = [
+        {"id": "a", "project_name": "stud-a", "options": {"license": "mit", "versionning": False}},
+        {"project_name": "stud-b", "output_dir": "other", "options": {"license": "apache", "versionning": "no"}},
+        {"id": "bad", "project_name": "stud-c", "options": {"colour": "red"}},
+        "not json",
+    ]
+    events = list(send_requests(server.socket_path, requests))
+
+    errors = [event for event in events if event["event"] == "error"]
+    assert len(errors) == 2 and "unknown option(s) for 'stud-c': colour" in errors[0]["error"]
+    done = {event["id"]: event for event in events if event["event"] == "done"}
+    assert set(done) == {"a", "1"} and all(event["success"] for event in done.values())
+    accepted = [event for event in events if event["event"] == "accepted"]
+    assert {event["path"] for event in accepted} == {
+        str(tmp_path / "out" / "stud-a"),
+        str(tmp_path / "out" / "other" / "stud-b"),
+    }
+    steps = {(event["phase"], event["action"]) for event in events if event["event"] == "step" and event["id"] == "a"}
+    assert {("skeleton", "core"), ("init", "license")} <= steps
+    assert any(event["event"] == "output" and event["line"] == "Project creation complete!" for event in events)
+
+    assert "MIT License" in (tmp_path / "out" / "stud-a" / "LICENSE").read_text()
+    assert "Apache License" in (tmp_path / "out" / "other" / "stud-b" / "LICENSE").read_text()
+    assert (server.socket_path.stat().st_mode & 0o777) == 0o600
+
+
+def test_project_names_stay_in_the_output_directory(tmp_path, server):
+    requests = [
+        {"id": str(i), "project_name": name} for i, name in enumerate(["../escaped", str(tmp_path / "abs"), ".."])
+    ]
+    events = list(send_requests(server.socket_path, requests))
+
+    assert [event["event"] for event in events] == ["error"] * 3
+    assert all("invalid project_name" in event["error"] for event in events)
+    assert not (tmp_path / "escaped").exists() and not (tmp_path / "abs").exists()
+
+
+def test_socket_path_checks(tmp_path, server):
+    with pytest.raises(FileExistsError, match="already listening"):
+        SocketServer(server.socket_path, server.projects)
+    (tmp_path / "file").write_text("")
+    with pytest.raises(FileExistsError, match="not a socket"):
+        SocketServer(tmp_path / "file", server.projects)
+
+    # The socket of a dead server is replaced
+    stale = tmp_path / "stale.sock"
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as dead:
+        dead.bind(str(stale))
+    SocketServer(stale, server.projects).server_close()
+    assert not stale.exists()
+
+
+def test_failed_commands_fail_the_request(tmp_path, server):
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    (bin_dir / "uv").write_text("#!/bin/sh\nexit 3\n")
+    (bin_dir / "uv").chmod(0o755)
+    server.projects.env = {**os.environ, "PATH": f"{bin_dir}{os.pathsep}{os.environ['PATH']}"}
+
+    events = list(send_requests(server.socket_path, [{"id": "a", "project_name": "stud-a"}]))
+
+    done = events[-1]
+    assert done["event"] == "done" and not done["success"]
+    assert done["error"].startswith("failed steps: core (init)")
+    assert {"event": "step", "id": "a", "phase": "init", "action": "core", "status": "failed"} in events
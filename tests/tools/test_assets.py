@@ -0,0 +1,70 @@
+import os
+import stat
+from pathlib import Path
+
+import pytest
+
+from pyscaf.actions.jupyter_tools import JupyterToolsAction
+from pyscaf.tools.assets import AssetFile
+from pyscaf.tools.fastcopy import copy_file
+from pyscaf.tools.resources import list_resource_dir
+from pyscaf.tools.skeleton_stage import SkeletonStage
+
+SCRIPT = AssetFile(package="pyscaf.actions.jupyter_tools", path="scripts/main.py")
+
+
+def test_materialize_copies_or_links(tmp_path):
+    source = SCRIPT.read_bytes()
+    SCRIPT.materialize(tmp_path / "copied.py")
+    assert (tmp_path / "copied.py").read_bytes() == source
+    umask = os.umask(0)
+    os.umask(umask)
+    assert stat.S_IMODE((tmp_path / "copied.py").stat().st_mode) == 0o666 & ~umask
+
+    SCRIPT.materialize(tmp_path / "linked.py", link=True)
+    assert (tmp_path / "linked.py").read_bytes() == source
+    with pytest.raises(FileExistsError):
+        SCRIPT.materialize(tmp_path / "copied.py")
+
+
+def test_copy_file_keeps_only_the_executable_bit(tmp_path):
+    source = tmp_path / "run.sh"
+    source.write_bytes(b"#!/bin/sh\n\x00\xff")
+    source.chmod(0o700)
+    copy_file(source, tmp_path / "kept.sh")
+    copy_file(source, tmp_path / "new.sh", mode=False)
+    assert stat.S_IMODE((tmp_path / "kept.sh").stat().st_mode) == 0o700
+    new_mode = stat.S_IMODE((tmp_path / "new.sh").stat().st_mode)
+    assert new_mode & stat.S_IXUSR and new_mode & 0o022 == 0
+    assert (tmp_path / "new.sh").read_bytes() == source.read_bytes()
+
+
+def test_stage_assets(tmp_path):
+    stage = SkeletonStage(tmp_path)
+    stage.add("tools/main.py", SCRIPT)
+    with pytest.raises(FileExistsError):
+        stage.add("tools/main.py", "# appended")
+    stage.add("README.md", "# Intro")
+    with pytest.raises(FileExistsError):
+        stage.add("README.md", SCRIPT)
+    assert stage.content("tools/main.py") == SCRIPT.read_bytes().decode()
+
+    (tmp_path / "tools").mkdir()
+    (tmp_path / "tools" / "main.py").write_text("# mine\n")
+    stage.flush()
+    assert (tmp_path / "tools" / "main.py").read_text() == "# mine\n"  # left as is
+
+
+def test_asset_dir_of_an_action(tmp_path):
+    action = JupyterToolsAction(tmp_path)
+    top_level = action.asset_dir("scripts", "tools", ".py", recursive=False)
+    assert Path("tools/main.py") in top_level
+    assert all(len(path.parts) == 2 for path in top_level)
+    assert "shared/exporter.py" in list_resource_dir(action.__class__.__module__, "scripts", ".py", recursive=True)
+    assert action.asset_dir("missing", "tools") == {}
+
+    stage = SkeletonStage(tmp_path, link_assets=True)
+    stage.add_skeleton(action.asset_dir("scripts", "tools", ".py"))
+    stage.flush()
+    assert (tmp_path / "tools" / "shared" / "exporter.py").is_file()
+    assert not (tmp_path / "tools" / "__pycache__").exists()
@@ -0,0 +1,100 @@
+import subprocess
+import sys
+import time
+
+import tomlkit
+
+from pyscaf.tools.env_cache import EnvironmentCache, dependency_key
+from pyscaf.tools.file_lock import file_lock
+
+LOCK = """version = 1
+requires-python = ">=3.12"
+
+[[package]]
+name = "first-project"
+version = "0.1.0"
+source = { editable = "." }
+
+[[package]]
+name = "pytest"
+version = "8.4.0"
+source = { registry = "https://pypi.org/simple" }
+"""
+
+
+def make_project(path, name="first_project"):
+    """A project as uv leaves it: uv.lock and a venv whose scripts hold its absolute path."""
+    venv = path / ".venv"
+    (venv / "bin").mkdir(parents=True)
+    (venv / "lib" / "site-packages").mkdir(parents=True)
+    (path / "uv.lock").write_text(LOCK)
+    (venv / "pyvenv.cfg").write_text(f"home = /usr/bin\nprompt = {name}\n")
+    (venv / "bin" / "activate").write_text(f"VIRTUAL_ENV='{venv}'\nVIRTUAL_ENV_PROMPT=\"{name}\"\n")
+    (venv / "bin" / "pytest").write_text(f"#!{venv}/bin/python\nimport pytest\n")
+    (venv / "bin" / "tool").write_bytes(b"\x7fELF" + str(venv).encode())
+    (venv / "bin" / "python").symlink_to(sys.executable)
+    (venv / "lib" / "site-packages" / "pytest.py").write_text("# pytest\n")
+    (venv / ".lock").write_text("")
+    return venv
+
+
+def test_store_then_restore(tmp_path):
+    cache = EnvironmentCache(tmp_path / "cache")
+    first = make_project(tmp_path / "first")
+    entry = cache.store("key", tmp_path / "first", first)
+    assert entry.project_name == "first-project" and entry.prompt == "first_project" and entry.venv == str(first)
+    assert cache.store("key", tmp_path / "first", first) == entry
+
+    second_root = tmp_path / "second"
+    second_root.mkdir()
+    second = second_root / ".venv"
+    assert cache.restore("key", second_root, second, "Second_Project", "1.0.0")
+    assert not cache.restore("key", second_root, second, "Second_Project", "1.0.0")  # already has one
+    assert not cache.restore("other", tmp_path, tmp_path / "venv", "x", None)
+
+    lock = (second_root / "uv.lock").read_text()
+    assert 'name = "second-project"\nversion = "1.0.0"\nsource = { editable = "." }' in lock
+    assert 'name = "pytest"\nversion = "8.4.0"' in lock
+    # Scripts point to the new venv (new files: the template keeps its paths)
+    assert (second / "bin" / "pytest").read_text().startswith(f"#!{second}/bin/python\n")
+    activate = (second / "bin" / "activate").read_text()
+    assert activate == f"VIRTUAL_ENV='{second}'\nVIRTUAL_ENV_PROMPT=\"Second_Project\"\n"
+    assert (second / "pyvenv.cfg").read_text() == "home = /usr/bin\nprompt = Second_Project\n"
+    assert (cache.path("key") / "venv" / "bin" / "pytest").read_text().startswith(f"#!{first}/bin/python\n")
+    # The rest is linked to the template
+    for path in ("lib/site-packages/pytest.py", "bin/tool"):
+        assert (second / path).stat().st_ino == (first / path).stat().st_ino
+    assert (second / "bin" / "python").readlink() == (first / "bin" / "python").readlink()
+    assert not (second / ".lock").exists()
+
+
+def test_dependency_key():
+    document = tomlkit.parse(
+        '[project]\nname = "a"\nversion = "0.1.0"\nauthors = [{name = "A"}]\nrequires-python = ">=3.12"\n'
+        '[dependency-groups]\ndev = ["pytest"]\n'
+    )
+    same = {"project": {"name": "b", "requires-python": ">=3.12"}, "dependency-groups": {"dev": ["pytest"]}}
+    other = {"project": {"name": "a", "requires-python": ">=3.12"}, "dependency-groups": {"dev": ["ruff"]}}
+
+    assert dependency_key(document, {"dev"}) == dependency_key(same, {"dev"})
+    assert dependency_key(document, {"dev"}) != dependency_key(other, {"dev"})
+    assert dependency_key(document, {"dev"}) != dependency_key(document, {"dev", "docs"})
+
+
+def test_lock_is_shared_between_processes(tmp_path):
+    lock = tmp_path / "key.lock"
+    holder = subprocess.Popen(
+        [
+            sys.executable,
+            "-c",
+            "import sys, time; from pyscaf.tools.file_lock import file_lock\n"
+            f"with file_lock({str(lock)!r}):\n    print('locked', flush=True); time.sleep(0.5)",
+        ],
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    assert holder.stdout.readline() == "locked\n"
+    start = time.perf_counter()
+    with file_lock(lock):
+        assert time.perf_counter() - start > 0.2
+    holder.wait()
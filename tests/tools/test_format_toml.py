@@ -0,0 +1,46 @@
+import tempfile
+from pathlib import Path
+
+import pytest
+import tomlkit
+
+from pyscaf.tools.format_toml import format_toml, format_toml_document, format_toml_text
+from pyscaf.tools.toml_merge import deep_merge
+
+ACTIONS_DIR = Path(__file__).parents[2] / "src" / "pyscaf" / "actions"
+
+SAMPLES = [
+    '# top\n[project]\nname = "x"\ndeps = [\n  "a",\n]\n\n\n[tool.ruff]\nline-length = 1\n'
+    "# pytest settings\n[tool.pytest.ini_options]\nx = 1 # c\n\n  [[tool.aot]]\na=1\n[[tool.aot]]\na=2\n[other]\n\n",
+    "\n\n[a]\nx=1\n\n\n\n[b]\n",
+    "\n\nx=1\n[a]\n",
+    "a=1\n\n\n",
+    "[a]\n[a.b]\n\n[c]\ny=[\n\n1,\n\n]\n",
+    '[a]\nx = ""',
+]
+
+
+@pytest.mark.parametrize("text", SAMPLES)
+def test_document_formatting_matches_text_formatting(text):
+    expected = format_toml_text(text)
+    assert format_toml_text(expected) == expected
+    assert tomlkit.dumps(format_toml_document(tomlkit.parse(text))).rstrip("\n") == expected.rstrip("\n")
+
+
+def test_merged_action_configs():
+    """Formats the way pyproject.toml is built: configs merged, some without a final newline."""
+    document = tomlkit.parse('[project]\nname = "demo"\n')
+    for config in sorted(ACTIONS_DIR.glob("*/config.toml")):
+        deep_merge(tomlkit.parse(config.read_text()), document)
+    assert tomlkit.dumps(format_toml_document(document)) == format_toml_text(tomlkit.dumps(document))
+
+
+def test_format_file():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = Path(tmpdir) / "pyproject.toml"
+        path.write_text(SAMPLES[0])
+        path.chmod(0o644)
+        format_toml(path)
+        assert path.read_text() == format_toml_text(SAMPLES[0])
+        assert path.stat().st_mode & 0o777 == 0o644
+        assert [p.name for p in Path(tmpdir).iterdir()] == ["pyproject.toml"]
@@ -0,0 +1,86 @@
+import os
+import subprocess
+
+from pyscaf.tools.git_bootstrap import IgnoreRules, add_remote, stage_project
+
+ENV = {**os.environ, "GIT_CONFIG_NOSYSTEM": "1", "HOME": "/nonexistent", "XDG_CONFIG_HOME": "/nonexistent"}
+
+
+def git(path, *args):
+    return subprocess.run(["git", *args], cwd=path, env=ENV, check=True, capture_output=True, text=True).stdout
+
+
+def make_project(path, *init_args):
+    for directory in (".venv/lib", "src/demo/__pycache__", "sub/deep", "notes"):
+        (path / directory).mkdir(parents=True)
+    files = {
+        ".gitignore": "**/__pycache__/\n*.log\n.venv\n",
+        ".venv/lib/site.py": "",
+        "src/demo/__init__.py": "",
+        "src/demo/__pycache__/x.pyc": "",
+        "sub/.gitignore": "*.tmp\n!keep.tmp\n/anchored\ndeep/\n",
+        "sub/a.tmp": "",
+        "sub/keep.tmp": "",
+        "sub/anchored": "",
+        "sub/deep/f": "",
+        "notes/with space.md": "é\n",
+        "app.log": "",
+        "run.sh": "#!/bin/sh\n",
+    }
+    for name, content in files.items():
+        (path / name).write_text(content)
+    (path / "run.sh").chmod(0o755)
+    (path / "notes" / "link").symlink_to("../run.sh")
+    git(path, "init", "-q", *init_args)
+    return path
+
+
+def test_stage_project_matches_git_add(tmp_path):
+    expected = make_project(tmp_path / "expected")
+    staged = make_project(tmp_path / "staged")
+    git(expected, "add", ".")
+
+    assert stage_project(staged, ENV) == 7
+    assert git(staged, "ls-files", "-s") == git(expected, "ls-files", "-s")
+    assert "sub/keep.tmp" in git(staged, "ls-files") and "sub/a.tmp" not in git(staged, "ls-files")
+    assert git(staged, "diff", "--name-only") == ""  # the stat data in the index is up to date
+    # Only a fresh repository is staged
+    assert stage_project(staged, ENV) is None
+
+
+def test_attributes_fall_back_to_git_add(tmp_path):
+    project = make_project(tmp_path / "project")
+    (project / "sub" / ".gitattributes").write_text("*.md text eol=crlf\n")
+    assert stage_project(project, ENV) is None
+    assert stage_project(make_project(tmp_path / "other"), {**ENV, "GIT_DIR": "elsewhere"}) is None
+
+
+def test_sha256_repository_falls_back_to_git_add(tmp_path):
+    project = make_project(tmp_path / "project", "--object-format=sha256")
+    assert stage_project(project, ENV) is None
+    # What GitAction.install does then: the commit is valid
+    git(project, "add", ".")
+    git(project, "-c", "user.name=t", "-c", "user.email=t@t", "commit", "-q", "-m", "init")
+    git(project, "fsck")
+
+
+def test_ignore_rules():
+    rules = IgnoreRules()
+    rules.add("/build/\ndocs/**/*.html\n*.py[cod]\n\\#notes\n", "")
+    assert rules.ignored("build", is_dir=True) and not rules.ignored("src/build", is_dir=True)
+    assert not rules.ignored("build", is_dir=False)
+    assert rules.ignored("docs/a/b/index.html", is_dir=False) and rules.ignored("docs/index.html", is_dir=False)
+    assert rules.ignored("pkg/mod.pyc", is_dir=False) and not rules.ignored("pkg/mod.py", is_dir=False)
+    assert rules.ignored("#notes", is_dir=False)
+
+
+def test_add_remote_writes_what_git_remote_add_writes(tmp_path):
+    expected, written = tmp_path / "expected", tmp_path / "written"
+    for path in (expected, written):
+        git(tmp_path, "init", "-q", path.name)
+    git(expected, "remote", "add", "origin", "https://github.com/x/demo.git")
+
+    assert add_remote(written, "origin", "https://github.com/x/demo.git")
+    assert (written / ".git" / "config").read_bytes() == (expected / ".git" / "config").read_bytes()
+    assert not add_remote(written, "origin", "https://github.com/x/other.git")  # already there
+    assert not add_remote(written, "upstream", "path with # comment")
@@ -0,0 +1,53 @@
+import tempfile
+from pathlib import Path
+
+import pytest
+import tomli
+
+from pyscaf.tools.pyproject_session import PyprojectSession
+
+
+def test_merges_stay_in_memory_until_save():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        pyproject = Path(tmpdir) / "pyproject.toml"
+        pyproject.write_text('[project]\nname = "demo"\ndependencies = ["click"]\n')
+        first = Path(tmpdir) / "first.toml"
+        first.write_text('[project]\ndependencies = ["click", "rich"]\n\n\n\n[tool.ruff]\nline-length = 120\n')
+        second = Path(tmpdir) / "second.toml"
+        second.write_text('# pytest settings\n[tool.pytest.ini_options]\ntestpaths = ["tests"] # keep\n')
+
+        session = PyprojectSession(pyproject)
+        session.merge_file(first)
+        session.merge_text(second.read_text(), "second.toml")
+        session.merge_file(Path(tmpdir) / "missing.toml")
+
+        assert pyproject.read_text() == '[project]\nname = "demo"\ndependencies = ["click"]\n'
+        assert session.dirty
+        assert session.save()
+        assert not session.dirty
+        assert not session.save()  # nothing new to write
+
+        text = pyproject.read_text()
+        assert tomli.loads(text) == {
+            "project": {"name": "demo", "dependencies": ["click", "rich"]},
+            "tool": {"ruff": {"line-length": 120}, "pytest": {"ini_options": {"testpaths": ["tests"]}}},
+        }
+        # tomlkit keeps the comments, the formatting leaves one empty line between sections
+        assert "# keep" in text
+        assert "\n\n\n" not in text
+
+
+def test_edit_and_reload():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        pyproject = Path(tmpdir) / "pyproject.toml"
+        session = PyprojectSession(pyproject)
+
+        with session.edit() as document:
+            document["project"] = {"name": "created"}
+        with pytest.raises(RuntimeError, match="unsaved changes"):
+            session.reload()
+        session.save()
+
+        pyproject.write_text('[project]\nname = "rewritten"\n')
+        session.reload()
+        assert session.document["project"]["name"] == "rewritten"
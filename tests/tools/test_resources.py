@@ -0,0 +1,40 @@
+import sys
+import zipfile
+
+from pyscaf.actions.license import LicenseAction
+from pyscaf.tools.resources import read_resource, read_resource_dir
+
+
+def test_resources_are_read_once():
+    read_resource.cache_clear()
+    text = read_resource("pyscaf.actions.git", "template.gitignore")
+    assert ".venv" in text
+    assert read_resource("pyscaf.actions.git", "template.gitignore") is text
+    assert read_resource.cache_info().hits == 1
+    assert read_resource("pyscaf.actions.git", "missing.txt") is None
+
+    workflows = read_resource_dir("pyscaf.actions.semantic-release", "github/workflows", ".yml")
+    assert workflows and all(name.endswith(".yml") for name, _ in workflows)
+    assert read_resource_dir("pyscaf.actions.git", "missing") == ()
+
+
+def test_resources_of_an_action(tmp_path):
+    action = LicenseAction(tmp_path)
+    assert "Apache License" in action.resource("template_Apache-2.0.txt")
+    assert action.resource("template_Unknown.txt") is None
+
+
+def test_resources_in_a_zip_archive(tmp_path, monkeypatch):
+    archive = tmp_path / "bundle.zip"
+    with zipfile.ZipFile(archive, "w") as bundle:
+        bundle.writestr("zipped_templates/__init__.py", "")
+        bundle.writestr("zipped_templates/README.md", "# Zipped\n")
+        bundle.writestr("zipped_templates/scripts/b.py", "b = 2\n")
+        bundle.writestr("zipped_templates/scripts/a.py", "a = 1\n")
+        bundle.writestr("zipped_templates/scripts/notes.txt", "")
+    monkeypatch.syspath_prepend(str(archive))
+    try:
+        assert read_resource("zipped_templates", "README.md") == "# Zipped\n"
+        assert read_resource_dir("zipped_templates", "scripts", ".py") == (("a.py", "a = 1\n"), ("b.py", "b = 2\n"))
+    finally:
+        sys.modules.pop("zipped_templates", None)
@@ -0,0 +1,65 @@
+import io
+import sys
+import threading
+import time
+
+from pyscaf.actions.execution import ExecutionContext
+from pyscaf.tools.runner import TIMEOUT_EXIT_CODE, CommandRunner
+
+PYTHON = sys.executable
+
+
+def test_timeout_kills_the_command_and_its_children():
+    runner = CommandRunner(timeout=0.5)
+    # The child sleeps in a grandchild process, which must not keep the runner waiting
+    command = (
+        "import subprocess, sys; print('started', flush=True); "
+        "subprocess.run([sys.executable, '-c', 'import time; time.sleep(30)'])"
+    )
+
+    start = time.perf_counter()
+    result = runner.run([PYTHON, "-c", command])
+
+    assert time.perf_counter() - start < 10
+    assert result.timed_out and result.returncode == TIMEOUT_EXIT_CODE
+    assert result.output == ["started"]
+    assert runner.run([PYTHON, "-c", "pass"], timeout=30).returncode == 0
+
+
+def test_output_is_bounded_and_copied():
+    runner = CommandRunner(output_lines=3)
+    log = io.StringIO()
+
+    result = runner.run([PYTHON, "-c", "for i in range(1000): print(i)"], output=log)
+
+    assert result.ok
+    assert result.output == ["997", "998", "999"]
+    assert log.getvalue() == "".join(f"{i}\n" for i in range(1000))
+    assert runner.results == [result] and runner.total_duration == result.duration > 0
+
+
+def test_concurrency_limit():
+    runner = CommandRunner(jobs=2)
+    command = "import time; print(time.time()); time.sleep(0.3); print(time.time())"
+    results = []
+
+    threads = [threading.Thread(target=lambda: results.append(runner.run([PYTHON, "-c", command]))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    spans = [tuple(float(line) for line in result.output) for result in results]
+
+    assert len(spans) == 4
+    for start, _ in spans:
+        assert sum(1 for other_start, other_end in spans if other_start <= start < other_end) <= 2
+
+
+def test_execution_context_reports_timeouts(tmp_path):
+    log = io.StringIO()
+    execution = ExecutionContext(tmp_path, log=log, runner=CommandRunner(timeout=0.3))
+
+    assert execution.run([PYTHON, "-c", "print('hello')"]) == 0
+    assert execution.run([PYTHON, "-c", "import time; time.sleep(30)"]) == TIMEOUT_EXIT_CODE
+    assert log.getvalue() == "hello\n"
+    assert len(execution.runner.results) == 2
@@ -0,0 +1,94 @@
+import builtins
+import os
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from pyscaf.tools import skeleton_stage
+from pyscaf.tools.skeleton_stage import SkeletonStage
+
+SKELETONS = [
+    {Path("README.md"): "# core", Path("src/pkg/__init__.py"): "", Path(".vscode"): None},
+    {Path(".gitignore"): "*.pyc", Path("README.md"): "## git"},
+    {Path("tests"): None, Path("tests/__init__.py"): "", Path(".gitignore"): ".pytest_cache/", Path("README.md"): "x"},
+]
+
+
+def write_directly(root: Path, skeleton: dict) -> None:
+    """How the skeletons used to be written, one entry at a time."""
+    for path, content in skeleton.items():
+        full_path = root / path
+        full_path.parent.mkdir(parents=True, exist_ok=True)
+        if content is None:
+            full_path.mkdir(exist_ok=True)
+        elif full_path.exists():
+            with open(full_path, "a") as f:
+                f.write("\n" + content)
+        else:
+            full_path.write_text(content)
+
+
+def snapshot(root: Path) -> dict:
+    return {path.relative_to(root): path.read_text() if path.is_file() else None for path in sorted(root.rglob("*"))}
+
+
+@pytest.mark.parametrize("jobs", [1, 4])
+def test_flush_matches_direct_writes(jobs):
+    with tempfile.TemporaryDirectory() as tmpdir:
+        direct, staged = Path(tmpdir) / "direct", Path(tmpdir) / "staged"
+        for root in (direct, staged):
+            root.mkdir()
+            (root / "README.md").write_text("existing")  # already in the project before the skeletons
+        for skeleton in SKELETONS:
+            write_directly(direct, skeleton)
+
+        stage = SkeletonStage(staged)
+        for skeleton in SKELETONS:
+            stage.add_skeleton(skeleton)
+        created = stage.flush(jobs=jobs)
+
+        assert snapshot(staged) == snapshot(direct)
+        assert created == {staged / path for skeleton in SKELETONS for path in skeleton}
+        assert len(stage) == 0
+
+
+def test_each_file_and_directory_written_once(monkeypatch):
+    opened, made = [], []
+    real_open, real_mkdir = builtins.open, os.mkdir
+
+    def counting_open(path, mode="r", *args):
+        opened.append(path)
+        return real_open(path, mode, *args)
+
+    def counting_mkdir(path, *args):
+        made.append(path)
+        real_mkdir(path, *args)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        stage = SkeletonStage(root)
+        for skeleton in SKELETONS:
+            stage.add_skeleton(skeleton)
+        with monkeypatch.context() as patch:
+            patch.setattr(skeleton_stage, "open", counting_open, raising=False)
+            patch.setattr(skeleton_stage.os, "mkdir", counting_mkdir)
+            stage.flush()
+
+        assert sorted(opened) == sorted(
+            root / path for path in ["README.md", "src/pkg/__init__.py", ".gitignore", "tests/__init__.py"]
+        )
+        assert made == [root / path for path in [".vscode", "src", "tests", "src/pkg"]]
+        assert (root / "README.md").read_text() == "# core\n## git\nx"
+
+
+def test_file_and_directory_conflicts():
+    stage = SkeletonStage(".")
+    stage.add("docs", None)
+    stage.add("notes.md", "")
+    with pytest.raises(IsADirectoryError):
+        stage.add("docs", "text")
+    with pytest.raises(IsADirectoryError):
+        stage.add("notes.md/child.md", "text")
+    with pytest.raises(FileExistsError):
+        stage.add("notes.md", None)
@@ -0,0 +1,87 @@
+import os
+import threading
+import time
+
+from pyscaf.tools.fastcopy import copy_file
+from pyscaf.tools.snapshot_cache import SnapshotCache
+
+PLACEHOLDERS = {"Demo-Name": "project_name", "Demo_Name": "curated_name", "/build/Demo-Name": "project_path"}
+
+
+def make_tree(path, size=0):
+    (path / "src" / "Demo_Name").mkdir(parents=True)
+    (path / "README.md").write_text("# Demo-Name\n")
+    (path / "src" / "Demo_Name" / "__init__.py").write_text('"""Demo-Name package."""\n')
+    (path / "config").write_text("path = /build/Demo-Name/src\n")
+    (path / "data.bin").write_bytes(b"\0" * size)
+    (path / "hook.sample").write_text("#!/bin/sh\n")
+    (path / "hook.sample").chmod(0o755)
+    (path / "link").symlink_to("README.md")
+    return path
+
+
+def test_store_then_restore_with_substitutions(tmp_path):
+    cache = SnapshotCache(tmp_path / "cache")
+    entry = cache.store("key", make_tree(tmp_path / "build"), PLACEHOLDERS)
+    assert not (tmp_path / "build").exists()  # moved into the cache
+    assert entry.templated == ["README.md", "config", "src/Demo_Name/__init__.py"]
+    assert entry.files == 5 and cache.entry("key") == entry
+
+    values = {"project_name": "my-proj", "curated_name": "my_proj", "project_path": "/home/me/my-proj"}
+    target = tmp_path / "my-proj"
+    assert cache.restore("key", target, values)
+    assert not cache.restore("missing", tmp_path / "other", values)
+
+    assert (target / "README.md").read_text() == "# my-proj\n"
+    assert (target / "src" / "my_proj" / "__init__.py").read_text() == '"""my-proj package."""\n'
+    # The longest placeholder wins
+    assert (target / "config").read_text() == "path = /home/me/my-proj/src\n"
+    assert (target / "data.bin").read_bytes() == b""
+    assert os.access(target / "hook.sample", os.X_OK)
+    assert os.readlink(target / "link") == "README.md"
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = SnapshotCache(tmp_path / "cache", max_bytes=2500, max_entries=10)
+    for index, key in enumerate(("a", "b", "c")):
+        cache.store(key, make_tree(tmp_path / key, size=1000), PLACEHOLDERS)
+        os.utime(cache.path(key) / "entry.json", (time.time() - 100 + index, time.time() - 100 + index))
+    cache.restore("a", tmp_path / "project", {})  # "a" becomes the most recently used
+
+    assert cache.evict() == ["b"]
+    assert [key for key in "abc" if cache.entry(key)] == ["a", "c"]
+
+    cache.max_entries = 0
+    assert cache.evict(keep="c") == ["a"]
+    assert cache.entry("c") is not None
+
+
+def test_restores_share_the_lock_of_their_key(tmp_path):
+    cache = SnapshotCache(tmp_path / "cache")
+    cache.store("key", make_tree(tmp_path / "build"), PLACEHOLDERS)
+    events = []
+
+    def _take(shared):
+        with cache.lock("key", shared=shared):
+            events.append("shared" if shared else "exclusive")
+
+    with cache.lock("key", shared=True):
+        restore = threading.Thread(target=_take, args=(True,))
+        restore.start()
+        restore.join(timeout=5)
+        assert events == ["shared"]  # not blocked by the other restore
+        evict = threading.Thread(target=_take, args=(False,))
+        evict.start()
+        time.sleep(0.2)
+        assert events == ["shared"]  # blocked until the restores are done
+    evict.join(timeout=5)
+    assert events == ["shared", "exclusive"]
+
+
+def test_copy_file(tmp_path):
+    source = tmp_path / "source"
+    source.write_bytes(os.urandom(300_000))
+    source.chmod(0o640)
+    copy_file(source, tmp_path / "copy")
+    assert (tmp_path / "copy").read_bytes() == source.read_bytes()
+    assert (tmp_path / "copy").stat().st_mode == source.stat().st_mode
@@ -0,0 +1,43 @@
+import pytest
+from jinja2 import TemplateNotFound, UndefinedError
+
+from pyscaf.tools import templates
+from pyscaf.tools.skeleton_stage import SkeletonStage
+from pyscaf.tools.templates import TemplateContent, get_environment
+
+TEST_EXAMPLE = "pyscaf.actions.test:template_test_example.py.jinja"
+
+
+def test_render_and_stream():
+    content = TemplateContent(name=TEST_EXAMPLE, context={"project_name": "my-proj", "curated_project_name": "my_proj"})
+    text = content.render()
+    assert text.startswith('"""\nTest module for my-proj.\n"""') and "from my_proj import __version__" in text
+    assert text.endswith('return "test_data"\n')  # trailing newline kept
+    assert "".join(content.stream()) == text
+    # Compiled once per process
+    assert get_environment().get_template(TEST_EXAMPLE) is get_environment().get_template(TEST_EXAMPLE)
+
+    with pytest.raises(UndefinedError):
+        TemplateContent(name=TEST_EXAMPLE, context={"project_name": "demo"}).render()
+    with pytest.raises(TemplateNotFound):
+        TemplateContent(name="pyscaf.actions.test:missing.jinja").render()
+
+
+def test_bytecode_is_cached_across_processes(tmp_path, monkeypatch):
+    monkeypatch.setenv("PYSCAF_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(templates, "_environment", None)
+    get_environment().get_template(TEST_EXAMPLE)
+    assert len(list((tmp_path / "templates").iterdir())) == 1
+
+
+def test_stage_streams_templates(tmp_path):
+    context = {"project_name": "demo", "jupyter_doc": "Doc."}
+    readme = TemplateContent(name="pyscaf.actions.jupyter:template_notebooks_README.md.jinja", context=context)
+    stage = SkeletonStage(tmp_path)
+    stage.add("README.md", "# Intro")
+    stage.add("README.md", readme)
+    expected = stage.content("README.md")
+    assert expected == "# Intro\n" + readme.render()
+
+    stage.flush()
+    assert (tmp_path / "README.md").read_text() == expected
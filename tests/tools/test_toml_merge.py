@@ -1,9 +1,12 @@
+import os
 import tempfile
 from pathlib import Path
 
 import tomli
+import tomlkit
 
-from pyscaf.tools.toml_merge import merge_toml_files
+from pyscaf.tools import toml_merge
+from pyscaf.tools.toml_merge import array_item_key, merge_toml_documents, merge_toml_files
 
 
 def write_toml(path, data):
@@ -76,3 +79,69 @@ def test_no_overwrite_unrelated():
         result = read_toml(dst)
         assert result["x"] == 1
         assert result["y"] == 2
+
+
+def test_array_items_compared_by_value():
+    source = tomlkit.parse(
+        'deps = [\'click\', "rich", { name = \'a\', extras = [\'x\'] }, 1]\nselect = ["E", "F", "I"]\n'
+    )
+    dest = tomlkit.parse('deps = ["click", {extras = ["x"], name = "a"}, 1.0, true]\nselect = ["E", "W"]\n')
+    merge_toml_documents([source], dest)
+    assert dest.unwrap() == {
+        "deps": ["click", {"extras": ["x"], "name": "a"}, 1.0, True, "rich", 1],
+        "select": ["E", "W", "F", "I"],
+    }
+
+
+def test_multiple_inputs_and_unchanged_output():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        first = Path(tmpdir) / "first.toml"
+        dst = Path(tmpdir) / "dst.toml"
+        write_toml(first, {"a": [1, 2], "tool": {"x": 1}})
+        write_toml(dst, {"a": [2]})
+        second = tomlkit.parse("a = [3]\n[tool]\ny = 2\n")
+        merge_toml_documents([first, Path(tmpdir) / "missing.toml", second], dst)
+        assert read_toml(dst) == {"a": [2, 1, 3], "tool": {"x": 1, "y": 2}}
+
+        # Merging the same inputs again gives the same document: the file is not rewritten
+        os.utime(dst, (0, 0))
+        merge_toml_documents([first, second], dst)
+        assert dst.stat().st_mtime == 0
+
+
+def test_array_items_of_other_types_are_kept():
+    """1, 1.0, true and "1" are equal in Python, not in TOML: none of them dedupes another."""
+    dest = tomlkit.parse("values = [1]\n")
+    merge_toml_documents([tomlkit.parse('values = [1, 1.0, true, "1", 2.0, 2]\n')], dest)
+    values = dest.unwrap()["values"]
+    assert [(type(value), value) for value in values] == [
+        (int, 1),
+        (float, 1.0),
+        (bool, True),
+        (str, "1"),
+        (float, 2.0),
+        (int, 2),
+    ]
+
+
+def test_large_array_merge(monkeypatch):
+    count = 2000
+    existing = [f"package-{i}>=1.0" for i in range(count)]
+    incoming = [f"package-{i}>=1.0" for i in range(count // 2, count + count // 2)]
+    calls = []
+
+    def counting_key(item):
+        calls.append(item)
+        return array_item_key(item)
+
+    monkeypatch.setattr(toml_merge, "array_item_key", counting_key)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        src = Path(tmpdir) / "src.toml"
+        dst = Path(tmpdir) / "dst.toml"
+        write_toml(src, {"project": {"dependencies": incoming}})
+        write_toml(dst, {"project": {"dependencies": existing}})
+        merge_toml_files(src, dst)
+        dependencies = read_toml(dst)["project"]["dependencies"]
+        assert dependencies == existing + incoming[count // 2 :]
+        # Linear: one key per item of each array, looked up in a set (no scan of dest per item)
+        assert len(calls) == 2 * count
@@ -0,0 +1,53 @@
+import json
+import threading
+
+from click.testing import CliRunner
+
+from pyscaf.cli import cli
+from pyscaf.tools.tracing import Tracer, get_tracer, span, tracing
+
+
+def test_spans_from_several_threads():
+    def step(index):
+        with span("step", "init", index=index):
+            pass
+
+    tracer = Tracer()
+    with tracing(tracer), span("outer", "phase"):
+        step(0)
+        for index in (1, 2):
+            thread = threading.Thread(target=step, args=(index,), name=f"worker-{index}")
+            thread.start()
+            thread.join()
+    assert get_tracer() is None
+    with span("ignored"):  # no active tracer: nothing is recorded
+        pass
+
+    assert [(s.name, s.args) for s in tracer.spans] == [("outer", {}), *(("step", {"index": i}) for i in range(3))]
+    summary = {(s.category, s.name): s for s in tracer.summary()}
+    assert summary["init", "step"].count == 3
+    assert summary["phase", "outer"].total >= summary["init", "step"].total
+
+    trace = tracer.chrome_trace()
+    complete = [event for event in trace["traceEvents"] if event["ph"] == "X"]
+    assert complete[0]["ts"] == 0 and complete[0]["name"] == "outer"
+    assert complete[1]["args"] == {"index": "0"}
+    assert all(event["dur"] >= 0 for event in complete)
+    thread_names = [event["args"]["name"] for event in trace["traceEvents"] if event["ph"] == "M"]
+    # Each thread gets a row (a finished thread's ident may be reused by the next one)
+    assert thread_names[0] == "MainThread" and set(thread_names[1:]) <= {"worker-1", "worker-2"}
+    assert len(thread_names) >= 2
+
+
+def test_init_writes_trace_and_timings(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    options = ["--author", "A <a@x.org>", "--no-versionning", "--testing", "--license", "mit", "--no-install"]
+
+    result = CliRunner().invoke(cli, ["init", "demo", *options, "--trace", "trace.json", "--timings"])
+
+    assert result.exit_code == 0, result.output
+    assert "pyscaf timings" in result.output
+    events = json.loads((tmp_path / "trace.json").read_text())["traceEvents"]
+    names = {(event.get("cat"), event["name"]) for event in events}
+    assert {("cli", "pyscaf init"), ("manager", "ordering"), ("phase", "skeleton"), ("phase", "init")} <= names
+    assert {("init", "core"), ("subprocess", "uv init"), ("toml", "merge test/config.toml")} <= names